@@ -2,7 +2,7 @@ from sqlalchemy.orm import Session
 
 from app.models.permission import Role, Permission
 from app.models.user import User, VerificationStatus
-from app.models.wallet import Wallet
+from app.utils.wallet import get_or_create_wallet
 
 ADMIN_ROLE = "admin"
 ADMIN_PERMISSIONS = [
@@ -59,7 +59,5 @@ def bootstrap_admin(db: Session, phone_number: str, force: bool = False) -> None
             user.verification_status = VerificationStatus.verified
         db.commit()
 
-    wallet = db.query(Wallet).filter(Wallet.user_id == user.id).first()
-    if not wallet:
-        db.add(Wallet(user_id=user.id))
-        db.commit()
+    get_or_create_wallet(db, user.id)
+    db.commit()
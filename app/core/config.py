@@ -13,5 +13,12 @@ class Settings(BaseSettings):
     MEDIA_BASE_URL: str = "/media"
     BOOTSTRAP_ADMIN_PHONE: str | None = None
     BOOTSTRAP_ADMIN_FORCE: bool = False
+    TASK_FEED_CACHE_TTL_SECONDS: float = 5.0
+    TASK_FEED_POLL_SECONDS: float = 2.0
+    TASK_SYNC_SKEW_SECONDS: float = 30.0
+    TASK_ARCHIVE_AFTER_DAYS: int = 90
+    TASK_EXPIRE_GRACE_MINUTES: int = 60
+    TASK_OVERDUE_GRACE_MINUTES: int = 30
+    TASK_SWEEP_INTERVAL_SECONDS: float = 0
 
 settings = Settings()
@@ -1,13 +1,24 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-from app.models import business, location, media, otp, task, task_meta, user, wallet, kyc
+from app.models import business, location, media, otp, task, task_archive, task_meta, user, wallet, kyc
+
+def dialect_insert(db: Session, entity):
+    """
+    ``INSERT`` construct for the session's database dialect, which exposes
+    ``on_conflict_do_nothing``/``on_conflict_do_update`` on PostgreSQL and SQLite.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(entity)
+    return postgresql.insert(entity)
+
 
 def get_db():
     db = SessionLocal()
@@ -1,13 +1,35 @@
+import asyncio
+import contextlib
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
+from app.db import SessionLocal
 from app.routers import admin, auth, business, permission, task, user, wallet
+from app.utils.task_feed import run_task_feed_watcher
+from app.utils.task_sla import run_task_sweeper
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    background = []
+    if settings.TASK_FEED_POLL_SECONDS > 0:
+        background.append(asyncio.create_task(run_task_feed_watcher(SessionLocal, settings.TASK_FEED_POLL_SECONDS)))
+    if settings.TASK_SWEEP_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(run_task_sweeper(SessionLocal, settings.TASK_SWEEP_INTERVAL_SECONDS)))
+    yield
+    for task in background:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
 
 app = FastAPI(
     title="Logistics Task Marketplace",
     description="API for a task-based logistics platform.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Float, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, Column, Integer, String, DateTime, event, func, ForeignKey, Float, Enum, Index, UniqueConstraint, text
+from sqlalchemy.orm import relationship, validates
 from app.db import Base
 from app.models.task_meta import task_tag_link, TaskKind
+from app.utils.geo import geo_cell
+from app.utils.helpers import normalize_search_text
 import enum
 
 class TaskStatus(enum.Enum):
@@ -20,8 +22,43 @@ class StepStatus(enum.Enum):
     failed = "failed"
     canceled = "canceled"
 
+OPEN_TASK_PREDICATE = "status = 'issued' AND assigned_user_id IS NULL AND accepted_at IS NULL"
+
+# Every column added to Task or TaskStep also needs adding to tasks_archive or
+# task_steps_archive (app/models/task_archive.py) in the same migration, or the
+# archiver drops it.
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_status_geo_cell", "status", "geo_cell"),
+        # The open-task feed (GET /tasks/), paged by id.
+        Index(
+            "ix_tasks_open_id",
+            "id",
+            postgresql_where=text(OPEN_TASK_PREDICATE),
+            sqlite_where=text(OPEN_TASK_PREDICATE),
+        ),
+        # A runner's own tasks (GET /tasks/me, /tasks/me/ongoing).
+        Index("ix_tasks_assigned_user_id_status", "assigned_user_id", "status"),
+        # Admin task list: the default created_at sort, alone or after an equality filter.
+        Index("ix_tasks_created_at", "created_at"),
+        Index("ix_tasks_status_created_at", "status", "created_at"),
+        Index("ix_tasks_business_id_created_at", "business_id", "created_at"),
+        Index("ix_tasks_task_kind_id_created_at", "task_kind_id", "created_at"),
+        Index("ix_tasks_start_datetime", "start_datetime"),
+        # A runner's change feed (GET /tasks/me/changes).
+        Index("ix_tasks_assigned_user_id_updated_at", "assigned_user_id", "updated_at"),
+        # Finished tasks by age, for the archiver.
+        Index("ix_tasks_status_updated_at", "status", "updated_at"),
+        # The SLA sweeper: open tasks past their start, in-progress tasks past their due time.
+        Index(
+            "ix_tasks_open_start_datetime",
+            "start_datetime",
+            postgresql_where=text(OPEN_TASK_PREDICATE),
+            sqlite_where=text(OPEN_TASK_PREDICATE),
+        ),
+        Index("ix_tasks_status_due_at", "status", "due_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -36,8 +73,10 @@ class Task(Base):
     start_datetime = Column(DateTime(timezone=True))
     status = Column(Enum(TaskStatus), default=TaskStatus.issued)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     accepted_at = Column(DateTime(timezone=True), nullable=True)
+    # accepted_at + estimated_time, set on accept so overdue tasks can be found by range.
+    due_at = Column(DateTime(timezone=True), nullable=True)
     done_at = Column(DateTime(timezone=True), nullable=True)
     approved_at = Column(DateTime(timezone=True), nullable=True)
     start_location_country_id = Column(Integer, ForeignKey("countries.id"))
@@ -46,6 +85,9 @@ class Task(Base):
     address = Column(String)
     lat = Column(Float)
     lng = Column(Float)
+    geo_cell = Column(Integer, nullable=True)
+    # Normalized "title\ndescription" that the full-text index is built from.
+    search_text = Column(String, nullable=True)
 
     business = relationship("Business")
     assigned_user = relationship("User", foreign_keys=[assigned_user_id])
@@ -55,8 +97,29 @@ class Task(Base):
     kind = relationship("TaskKind", back_populates="tasks")
     tags = relationship("TaskTag", secondary=task_tag_link, back_populates="tasks")
 
+    @validates("lat", "lng")
+    def _sync_geo_cell(self, key, value):
+        lat = value if key == "lat" else self.lat
+        lng = value if key == "lng" else self.lng
+        self.geo_cell = geo_cell(lat, lng)
+        return value
+
+    @validates("title", "description")
+    def _sync_search_text(self, key, value):
+        title = value if key == "title" else self.title
+        description = value if key == "description" else self.description
+        self.search_text = task_search_text(title, description)
+        return value
+
+
+def task_search_text(title, description) -> str:
+    return f"{normalize_search_text(title)}\n{normalize_search_text(description)}"
+
 class TaskStep(Base):
     __tablename__ = "task_steps"
+    __table_args__ = (
+        Index("ix_task_steps_task_id_updated_at", "task_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("tasks.id"))
@@ -70,7 +133,125 @@ class TaskStep(Base):
     status = Column(Enum(StepStatus), default=StepStatus.pending)
     order = Column(Integer)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     done_at = Column(DateTime(timezone=True), nullable=True)
+    # Bumped in SQL on every update; clients send it back to detect conflicting edits.
+    # Not a mapper version_id_col, so concurrent writers never fail with StaleDataError.
+    version = Column(Integer, nullable=False, server_default="1", onupdate=text("version + 1"))
 
     task = relationship("Task", back_populates="steps")
+
+
+class SlaBreachKind(enum.Enum):
+    expired = "expired"
+    overdue = "overdue"
+
+
+class TaskSlaBreach(Base):
+    """
+    A task that missed its schedule, found by the SLA sweeper. ``expired`` tasks were
+    never accepted before their start and have been canceled; ``overdue`` tasks are still
+    in progress past their due time until ``resolved_at`` is set.
+    """
+    __tablename__ = "task_sla_breaches"
+    __table_args__ = (
+        UniqueConstraint("task_id", "kind", name="uq_task_sla_breaches_task_id_kind"),
+        Index("ix_task_sla_breaches_detected_at", "detected_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Not a foreign key: the task may have moved to tasks_archive.
+    task_id = Column(Integer, nullable=False)
+    kind = Column(Enum(SlaBreachKind), nullable=False)
+    assigned_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    due_at = Column(DateTime(timezone=True), nullable=True)
+    detected_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class TaskTombstone(Base):
+    """
+    A task or step that disappeared from a runner's task list, kept so the runner's
+    change feed can report the removal. ``step_id`` is null when the whole task went.
+    """
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index("ix_task_tombstones_user_id_removed_at", "user_id", "removed_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    task_id = Column(Integer, nullable=False)
+    step_id = Column(Integer, nullable=True)
+    removed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# Full-text search over the normalized title and description in ``search_text``.
+# PostgreSQL keeps a generated tsvector column with a GIN index; SQLite (used by the
+# tests) keeps an FTS5 table in sync with triggers. Neither is mapped on the model; see
+# app/utils/task_search.py.
+TASK_SEARCH_DDL = {
+    "postgresql": [
+        """
+        ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', split_part(coalesce(search_text, ''), E'\\n', 1)), 'A')
+            || setweight(to_tsvector('simple', split_part(coalesce(search_text, ''), E'\\n', 2)), 'B')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS task_search USING fts5(title, description, content='')",
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_search_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_search (rowid, title, description) VALUES (
+                new.id,
+                substr(new.search_text, 1, instr(new.search_text, char(10)) - 1),
+                substr(new.search_text, instr(new.search_text, char(10)) + 1)
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_search_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO task_search (task_search, rowid, title, description) VALUES (
+                'delete',
+                old.id,
+                substr(old.search_text, 1, instr(old.search_text, char(10)) - 1),
+                substr(old.search_text, instr(old.search_text, char(10)) + 1)
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_search_update AFTER UPDATE OF search_text ON tasks BEGIN
+            INSERT INTO task_search (task_search, rowid, title, description) VALUES (
+                'delete',
+                old.id,
+                substr(old.search_text, 1, instr(old.search_text, char(10)) - 1),
+                substr(old.search_text, instr(old.search_text, char(10)) + 1)
+            );
+            INSERT INTO task_search (rowid, title, description) VALUES (
+                new.id,
+                substr(new.search_text, 1, instr(new.search_text, char(10)) - 1),
+                substr(new.search_text, instr(new.search_text, char(10)) + 1)
+            );
+        END
+        """,
+    ],
+}
+
+for _dialect, _statements in TASK_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Task.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Task.__table__, "after_drop", DDL("DROP TABLE IF EXISTS task_search").execute_if(dialect="sqlite"))
+
+
+class TaskFeedState(Base):
+    """
+    Single row whose ``version`` is bumped by changes to many open tasks at once, such as
+    imports and the SLA sweeper. Every API process polls it and resets its open-task feed
+    cache and streams when it moves, so changes made by scripts reach them too.
+    """
+    __tablename__ = "task_feed_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, server_default="0")
@@ -0,0 +1,95 @@
+from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, Table, func
+from sqlalchemy.orm import relationship
+
+from app.db import Base
+from app.models.task import StepStatus, TaskStatus
+
+# Finished tasks older than TASK_ARCHIVE_AFTER_DAYS are moved out of ``tasks``,
+# ``task_steps`` and ``task_tag_link`` into these tables by app/utils/task_archive.py.
+# The columns are declared here rather than copied from the live tables, because the
+# archive schema only changes through its own migrations: a column added to ``tasks`` or
+# ``task_steps`` is left behind by the archiver until it is added here and to the
+# archive table in a migration. References to other live tasks point at the archive.
+
+tasks_archive = Table(
+    "tasks_archive",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String),
+    Column("description", String),
+    Column("business_id", Integer, ForeignKey("businesses.id")),
+    Column("assigned_user_id", Integer, ForeignKey("users.id"), nullable=True),
+    Column("category_id", Integer, ForeignKey("task_categories.id")),
+    Column("task_kind_id", Integer, ForeignKey("task_kinds.id"), nullable=True),
+    Column("created_by_admin_id", Integer, ForeignKey("users.id"), nullable=True),
+    Column("price", Float),
+    Column("estimated_time", Integer),
+    Column("start_datetime", DateTime(timezone=True)),
+    Column("status", Enum(TaskStatus)),
+    Column("created_at", DateTime(timezone=True)),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Column("accepted_at", DateTime(timezone=True), nullable=True),
+    Column("due_at", DateTime(timezone=True), nullable=True),
+    Column("done_at", DateTime(timezone=True), nullable=True),
+    Column("approved_at", DateTime(timezone=True), nullable=True),
+    Column("start_location_country_id", Integer, ForeignKey("countries.id")),
+    Column("start_location_province_id", Integer, ForeignKey("provinces.id")),
+    Column("start_location_city_id", Integer, ForeignKey("cities.id")),
+    Column("address", String),
+    Column("lat", Float),
+    Column("lng", Float),
+    Column("geo_cell", Integer, nullable=True),
+    Column("search_text", String, nullable=True),
+    Column("archived_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Index("ix_tasks_archive_created_at", "created_at"),
+    Index("ix_tasks_archive_status_created_at", "status", "created_at"),
+    Index("ix_tasks_archive_business_id_created_at", "business_id", "created_at"),
+    Index("ix_tasks_archive_assigned_user_id_status", "assigned_user_id", "status"),
+)
+
+task_steps_archive = Table(
+    "task_steps_archive",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("task_id", Integer, ForeignKey("tasks_archive.id")),
+    Column("title", String),
+    Column("description", String, nullable=True),
+    Column("address", String),
+    Column("lat", Float),
+    Column("lng", Float),
+    Column("estimated_time", Integer),
+    Column("start_time", DateTime(timezone=True)),
+    Column("status", Enum(StepStatus)),
+    Column("order", Integer),
+    Column("created_at", DateTime(timezone=True)),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+    Column("done_at", DateTime(timezone=True), nullable=True),
+    Column("version", Integer, nullable=False),
+    Index("ix_task_steps_archive_task_id", "task_id"),
+)
+
+task_tag_link_archive = Table(
+    "task_tag_link_archive",
+    Base.metadata,
+    Column("task_id", Integer, ForeignKey("tasks_archive.id"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("task_tags.id"), primary_key=True),
+)
+
+
+class ArchivedTaskStep(Base):
+    __table__ = task_steps_archive
+
+    task = relationship("ArchivedTask", back_populates="steps")
+
+
+class ArchivedTask(Base):
+    """Read-only mapping of an archived task, shaped like ``Task`` for the admin schemas."""
+    __table__ = tasks_archive
+
+    business = relationship("Business")
+    assigned_user = relationship("User", foreign_keys=[tasks_archive.c.assigned_user_id])
+    created_by_admin = relationship("User", foreign_keys=[tasks_archive.c.created_by_admin_id])
+    steps = relationship("ArchivedTaskStep", back_populates="task")
+    category = relationship("TaskCategory")
+    kind = relationship("TaskKind")
+    tags = relationship("TaskTag", secondary=task_tag_link_archive, viewonly=True)
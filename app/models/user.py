@@ -1,10 +1,11 @@
 from pathlib import Path
 import enum
-from sqlalchemy import Column, Integer, String, DateTime, func, Date, Enum, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, func, Date, Enum, ForeignKey, Index
+from sqlalchemy.orm import relationship, validates
 
 from app.core.config import settings
 from app.db import Base
+from app.utils.helpers import normalize_digits, normalize_search_text
 
 class VerificationStatus(enum.Enum):
     unverified = "unverified"
@@ -14,10 +15,15 @@ class VerificationStatus(enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_search_name", "search_name", postgresql_ops={"search_name": "text_pattern_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, nullable=True)
     last_name = Column(String, nullable=True)
+    # Normalized "first last" used for admin name search.
+    search_name = Column(String, nullable=True)
     phone_number = Column(String, unique=True, index=True, nullable=False)
     birthdate = Column(Date, nullable=True)
     sex = Column(String, nullable=True)
@@ -44,6 +50,17 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    @validates("first_name", "last_name")
+    def _sync_search_name(self, key, value):
+        first_name = value if key == "first_name" else self.first_name
+        last_name = value if key == "last_name" else self.last_name
+        self.search_name = normalize_search_text(f"{first_name or ''} {last_name or ''}")
+        return value
+
+    @validates("phone_number", "national_id", "shaba_number")
+    def _normalize_digits(self, key, value):
+        return normalize_digits(value)
+
     def _media_url(self, path: str | None) -> str | None:
         if not path:
             return None
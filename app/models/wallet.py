@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, func, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, func, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db import Base
 import enum
@@ -18,12 +18,17 @@ class TransactionStatus(enum.Enum):
     paid = "paid"
     denied = "denied"
 
+class RollupBucket(enum.Enum):
+    pending = "pending"
+    settled = "settled"
+    void = "void"
+
 class Wallet(Base):
     __tablename__ = "wallets"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
-    balance = Column(Float, default=0.0)
+    balance = Column(Float, default=0.0, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -32,15 +37,56 @@ class Wallet(Base):
 
 class WalletTransaction(Base):
     __tablename__ = "wallet_transactions"
+    __table_args__ = (
+        Index("ix_wallet_transactions_wallet_id_id", "wallet_id", "id"),
+        Index("ix_wallet_transactions_wallet_id_created_at_id", "wallet_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     wallet_id = Column(Integer, ForeignKey("wallets.id"))
     type = Column(Enum(TransactionType))
     amount = Column(Float)
     status = Column(Enum(TransactionStatus))
-    related_task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
+    # Not a foreign key: the task may have moved to tasks_archive.
+    related_task_id = Column(Integer, nullable=True)
     description = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     wallet = relationship("Wallet", back_populates="transactions")
-    related_task = relationship("Task")
+    related_task = relationship("Task", primaryjoin="foreign(WalletTransaction.related_task_id) == Task.id", viewonly=True)
+
+
+class WalletBalanceCheckpoint(Base):
+    """Balance of a wallet covering every transaction up to ``last_transaction_id``."""
+
+    __tablename__ = "wallet_balance_checkpoints"
+    __table_args__ = (
+        Index("ix_wallet_balance_checkpoints_wallet_id_last_transaction_id", "wallet_id", "last_transaction_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    wallet_id = Column(Integer, ForeignKey("wallets.id"), nullable=False)
+    balance = Column(Float, nullable=False)
+    last_transaction_id = Column(Integer, nullable=False)
+    transaction_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    wallet = relationship("Wallet")
+
+
+class WalletDailyRollup(Base):
+    """Per-wallet daily totals by transaction type and status bucket, kept in sync on write."""
+
+    __tablename__ = "wallet_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("wallet_id", "day", "type", "bucket", name="uq_wallet_daily_rollups_wallet_day_type_bucket"),
+        Index("ix_wallet_daily_rollups_day", "day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    wallet_id = Column(Integer, ForeignKey("wallets.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    type = Column(Enum(TransactionType), nullable=False)
+    bucket = Column(Enum(RollupBucket), nullable=False)
+    amount = Column(Float, nullable=False, default=0.0, server_default="0")
+    transaction_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy import or_
 from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional
@@ -10,15 +11,50 @@ from app.utils.media import MediaManager
 from app.models.kyc import KycAttempt
 from app.utils.deps import get_current_user, user_has_permission
 from app.schemas.task import AdminTask, Task as TaskSchema, TaskCreate, TaskStepCreate, TaskStepUpdate, TaskUpdate, TaskKind as TaskKindSchema, TaskKindCreate
-from app.models.task import Task, TaskStep, TaskStatus, StepStatus
+from app.schemas.task import TaskBulkApproveItem, TaskBulkApproveRequest, TaskBulkApproveResult, TaskFacets, TaskImportFormat, TaskImportResult
+from app.schemas.task import TaskSlaBreach as TaskSlaBreachSchema
+from app.models.task import SlaBreachKind, Task, TaskSlaBreach, TaskStep, TaskStatus, StepStatus
 from app.models.task_meta import TaskKind
+from app.models.task_archive import ArchivedTask
 from app.models.wallet import Wallet, WalletTransaction, TransactionType, TransactionStatus
-from app.schemas.wallet import WalletAdminSummary, WalletTransaction as WalletTransactionSchema
-from app.routers.wallet import get_or_create_wallet
-from app.utils.wallet import refresh_wallet_balance
-from datetime import datetime, timezone
+from app.schemas.wallet import (
+    BankReconciliationResult,
+    EarningsGranularity,
+    EarningsReport,
+    PayoutAction,
+    WalletAdminSummary,
+    WalletBalanceCheck,
+    WalletCheckoutBulkItem,
+    WalletCheckoutBulkRequest,
+    WalletCheckoutBulkResult,
+    WalletTransaction as WalletTransactionSchema,
+)
+from app.utils.wallet import (
+    PAYOUT_TRANSITIONS,
+    compute_wallet_balance,
+    get_or_create_wallet,
+    get_or_create_wallets,
+    latest_checkpoint,
+    record_transaction,
+    record_transactions,
+    set_transaction_status,
+    transition_payouts,
+)
+import io
+from collections import defaultdict
+from datetime import date, datetime, timezone
 from app.schemas.otp import OTPAdminLookup, OTPAdminLookupResponse
 from app.utils.otp import get_valid_otp
+from app.utils.bank import reconcile_bank_statement, stream_payout_csv, stream_payout_fixed_width
+from app.utils.earnings import earnings_report
+from app.utils.task_feed import publish_task_change, publish_task_removed
+from app.utils.task_import import import_tasks
+from app.utils.task_search import apply_task_search, search_text_filter
+from app.utils.task_archive import ARCHIVED_STATUSES
+from app.utils.task_sync import record_task_removed
+from app.utils.task_facets import approximate_task_facets, count_task_facets
+from app.utils.helpers import normalize_phone_number, normalize_search_text
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_after, keyset_order, parse_cursor_datetime
 
 router = APIRouter()
 media_manager = MediaManager()
@@ -83,11 +119,29 @@ def lookup_otp(query: OTPAdminLookup = Depends(), db: Session = Depends(get_db),
     }
 
 @router.get("/users", response_model=List[UserSchema], summary="Get all users")
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin_user)):
+def read_users(
+    skip: int = 0,
+    limit: int = 100,
+    search: Optional[str] = Query(None, description="Phone number, national id, or the start of a name"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
     """
     Retrieves a list of all users. Only accessible by admin users.
+    ``search`` ignores Arabic/Persian letter and digit variants: a number is matched
+    exactly against phone number and national id, anything else as a name prefix.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    query = db.query(User)
+    term = normalize_search_text(search)
+    if term:
+        compact = "".join(term.split())
+        if compact.lstrip("+").isdigit():
+            query = query.filter(
+                or_(User.phone_number == normalize_phone_number(compact), User.national_id == compact)
+            )
+        else:
+            query = query.filter(User.search_name.startswith(term, autoescape=True))
+    users = query.order_by(User.id).offset(skip).limit(limit).all()
     return users
 
 
@@ -202,97 +256,315 @@ def create_task(task: TaskCreate, db: Session = Depends(get_db), current_user: U
         db.add(db_step)
     db.commit()
     db.refresh(db_task)
+    publish_task_change(db_task, created=True)
     return db_task
 
+@router.post(
+    "/tasks/import",
+    response_model=TaskImportResult,
+    summary="Bulk import tasks with their steps from NDJSON or CSV",
+    dependencies=[Depends(user_has_permission("create_task"))],
+)
+def import_task_file(
+    file: UploadFile = File(..., description="One TaskCreate object per line (NDJSON), or CSV with a JSON 'steps' column"),
+    file_format: Optional[TaskImportFormat] = Query(None, alias="format", description="File format; inferred from the file name when omitted"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Stream an uploaded task file and create its tasks in batches. Records are validated
+    like ``POST /admin/tasks``; invalid ones are reported by line and skipped. A file that
+    is not UTF-8 is rejected with a 400; batches committed before the bad bytes are kept.
+    """
+    if file_format is None:
+        file_format = TaskImportFormat.csv if (file.filename or "").lower().endswith(".csv") else TaskImportFormat.ndjson
+
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        summary = import_tasks(db, lines, file_format, created_by_admin_id=current_user.id)
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="File is not valid UTF-8")
+    finally:
+        lines.detach()
+    return TaskImportResult(**summary)
+
+class TaskListFilters:
+    """Filter parameters shared by the admin task list and its facet counts."""
+
+    def __init__(
+        self,
+        status: Optional[List[TaskStatus]] = Query(None, description="Filter by task status"),
+        business_id: Optional[int] = Query(None, description="Filter by business id"),
+        assigned_user_id: Optional[int] = Query(None, description="Filter by assigned user id"),
+        task_kind_id: Optional[int] = Query(None, description="Filter by task kind id"),
+        category_id: Optional[int] = Query(None, description="Filter by task category id"),
+        search: Optional[str] = Query(None, description="Search by title or description"),
+        start_from: Optional[datetime] = Query(None, description="Return tasks starting on or after this datetime"),
+        start_to: Optional[datetime] = Query(None, description="Return tasks starting on or before this datetime"),
+        include_archived: Optional[bool] = Query(
+            None,
+            description="Include archived tasks; by default they are included whenever the status filter allows approved, canceled or rejected tasks",
+        ),
+    ):
+        self.status = status
+        self.business_id = business_id
+        self.assigned_user_id = assigned_user_id
+        self.task_kind_id = task_kind_id
+        self.category_id = category_id
+        self.search = search
+        self.start_from = start_from
+        self.start_to = start_to
+        self.include_archived = include_archived
+
+    @property
+    def is_empty(self) -> bool:
+        return not any(value not in (None, []) for name, value in vars(self).items() if name != "include_archived")
+
+    @property
+    def entities(self) -> list:
+        """The live task table, plus the archive when the filters can match archived tasks."""
+        if self.include_archived is None:
+            include_archived = not self.status or any(status in ARCHIVED_STATUSES for status in self.status)
+        else:
+            include_archived = self.include_archived
+        return [Task, ArchivedTask] if include_archived else [Task]
+
+
+def _apply_task_filters(db: Session, query, filters: TaskListFilters, entity=Task):
+    """
+    Apply the task list filters to a query over ``Task`` or ``ArchivedTask``; returns the
+    query and the relevance ordering, if any. The archive has no full-text index, so its
+    search is an unranked scan of ``search_text``.
+    """
+    if filters.status:
+        query = query.filter(entity.status.in_(filters.status))
+    if filters.business_id is not None:
+        query = query.filter(entity.business_id == filters.business_id)
+    if filters.assigned_user_id is not None:
+        query = query.filter(entity.assigned_user_id == filters.assigned_user_id)
+    if filters.task_kind_id is not None:
+        query = query.filter(entity.task_kind_id == filters.task_kind_id)
+    if filters.category_id is not None:
+        query = query.filter(entity.category_id == filters.category_id)
+    if filters.start_from is not None:
+        query = query.filter(entity.start_datetime >= filters.start_from)
+    if filters.start_to is not None:
+        query = query.filter(entity.start_datetime <= filters.start_to)
+    relevance = None
+    if filters.search:
+        if entity is Task:
+            query, relevance = apply_task_search(db, query, filters.search)
+        else:
+            query = query.filter(search_text_filter(entity.search_text, filters.search))
+    return query, relevance
+
+
+def _admin_task_query(db: Session, entity):
+    return db.query(entity).options(
+        joinedload(entity.assigned_user),
+        joinedload(entity.business),
+        joinedload(entity.category),
+        joinedload(entity.kind),
+        joinedload(entity.created_by_admin),
+        selectinload(entity.tags),
+        selectinload(entity.steps),
+    )
+
+@router.get("/tasks/facets", response_model=TaskFacets, summary="Count tasks per status, business, kind and category")
+def list_task_facets(
+    filters: TaskListFilters = Depends(),
+    approximate: bool = Query(False, description="Serve unfiltered counts from table statistics when available"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Counts of the tasks matching the same filters as ``GET /admin/tasks``, grouped by
+    status, business, kind and category, computed in one aggregate query. With
+    ``approximate`` and no filters, counts come from PostgreSQL's planner statistics
+    instead of scanning the table; they are as fresh as the last ``ANALYZE``. Archived
+    tasks are counted under the same rule as in the list.
+    """
+    entities = filters.entities
+    if approximate and filters.is_empty:
+        facets = approximate_task_facets(db, [entity.__table__.name for entity in entities])
+        if facets is not None:
+            return facets
+    queries = [_apply_task_filters(db, db.query(entity), filters, entity)[0] for entity in entities]
+    return count_task_facets(db, *queries)
+
+@router.get("/tasks/sla-breaches", response_model=List[TaskSlaBreachSchema], summary="List tasks that missed their schedule")
+def list_task_sla_breaches(
+    kind: Optional[SlaBreachKind] = None,
+    unresolved: bool = Query(False, description="Only breaches whose task is still overdue"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Breaches recorded by the SLA sweeper, newest first: ``expired`` tasks were canceled
+    because nobody accepted them in time, ``overdue`` tasks ran past their due time.
+    """
+    query = db.query(TaskSlaBreach)
+    if kind is not None:
+        query = query.filter(TaskSlaBreach.kind == kind)
+    if unresolved:
+        query = query.filter(TaskSlaBreach.resolved_at.is_(None))
+    return query.order_by(TaskSlaBreach.detected_at.desc(), TaskSlaBreach.id.desc()).offset(skip).limit(limit).all()
+
 @router.get("/tasks", response_model=List[AdminTask], summary="List tasks with filters, sorting, and detailed relations")
 def list_tasks(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    status: Optional[List[TaskStatus]] = Query(None, description="Filter by task status"),
-    business_id: Optional[int] = Query(None, description="Filter by business id"),
-    assigned_user_id: Optional[int] = Query(None, description="Filter by assigned user id"),
-    task_kind_id: Optional[int] = Query(None, description="Filter by task kind id"),
-    category_id: Optional[int] = Query(None, description="Filter by task category id"),
-    search: Optional[str] = Query(None, description="Search by title or description"),
-    start_from: Optional[datetime] = Query(None, description="Return tasks starting on or after this datetime"),
-    start_to: Optional[datetime] = Query(None, description="Return tasks starting on or before this datetime"),
-    sort_by: str = Query("created_at", description="Sort by one of: created_at, start_datetime, price, status, updated_at, accepted_at, done_at, approved_at"),
+    cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    filters: TaskListFilters = Depends(),
+    sort_by: Optional[str] = Query(None, description="Sort by one of: relevance, created_at, start_datetime, price, status, updated_at, accepted_at, done_at, approved_at. Defaults to relevance when searching, otherwise created_at"),
     sort_order: str = Query("desc", description="Sort order: asc or desc"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user),
 ):
     """
     Retrieves tasks for admin users with filtering and sorting support, including related entities.
+    ``search`` uses the full-text index and matches every word as a prefix.
+    When a full page is returned the ``X-Next-Cursor`` response header holds a cursor for
+    the next page with the same filters and sort. Cursors continue after the last row's
+    sort value and id instead of counting rows, so deep pages cost the same as the first.
+    ``skip`` is ignored when a cursor is given; relevance sorting only supports ``skip``.
+    Archived tasks are merged in whenever the filters can match them (see
+    ``include_archived``); relevance sorting ranks live tasks and lists archived matches
+    after them.
     """
     allowed_sort_fields = {
-        "created_at": Task.created_at,
-        "start_datetime": Task.start_datetime,
-        "price": Task.price,
-        "status": Task.status,
-        "updated_at": Task.updated_at,
-        "accepted_at": Task.accepted_at,
-        "done_at": Task.done_at,
-        "approved_at": Task.approved_at,
+        "created_at",
+        "start_datetime",
+        "price",
+        "status",
+        "updated_at",
+        "accepted_at",
+        "done_at",
+        "approved_at",
     }
 
-    sort_field = allowed_sort_fields.get(sort_by)
-    if not sort_field:
+    search = filters.search
+    if sort_by is None:
+        sort_by = "relevance" if search else "created_at"
+    if sort_by not in allowed_sort_fields and sort_by != "relevance":
         raise HTTPException(status_code=400, detail="Invalid sort field")
 
     sort_order_normalized = sort_order.lower()
     if sort_order_normalized not in {"asc", "desc"}:
         raise HTTPException(status_code=400, detail="Invalid sort order")
 
-    query = (
-        db.query(Task)
-        .options(
-            joinedload(Task.assigned_user),
-            joinedload(Task.business),
-            joinedload(Task.category),
-            joinedload(Task.kind),
-            joinedload(Task.created_by_admin),
-            selectinload(Task.tags),
-            selectinload(Task.steps),
-        )
-    )
-
-    if status:
-        query = query.filter(Task.status.in_(status))
-    if business_id is not None:
-        query = query.filter(Task.business_id == business_id)
-    if assigned_user_id is not None:
-        query = query.filter(Task.assigned_user_id == assigned_user_id)
-    if task_kind_id is not None:
-        query = query.filter(Task.task_kind_id == task_kind_id)
-    if category_id is not None:
-        query = query.filter(Task.category_id == category_id)
-    if start_from is not None:
-        query = query.filter(Task.start_datetime >= start_from)
-    if start_to is not None:
-        query = query.filter(Task.start_datetime <= start_to)
-    if search:
-        normalized_search = f"%{search.strip()}%"
-        query = query.filter(or_(Task.title.ilike(normalized_search), Task.description.ilike(normalized_search)))
-
-    order_by_clause = sort_field.desc() if sort_order_normalized == "desc" else sort_field.asc()
-
-    tasks = query.order_by(order_by_clause).offset(skip).limit(limit).all()
+    if sort_by == "relevance":
+        if not search:
+            raise HTTPException(status_code=400, detail="Relevance sort requires a search")
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported for relevance sort")
+        query, relevance = _apply_task_filters(db, _admin_task_query(db, Task), filters)
+        order_by_clauses = [relevance] if relevance is not None else []
+        order_by_clauses.append(Task.id.desc())
+        query = query.order_by(*order_by_clauses)
+        tasks = query.offset(skip).limit(limit).all()
+        if len(tasks) == limit or ArchivedTask not in filters.entities:
+            return tasks
+        # The archive cannot be ranked; its matches follow the live ones, newest first.
+        live_count = skip + len(tasks) if tasks else _apply_task_filters(db, db.query(Task.id), filters)[0].count()
+        archived, _ = _apply_task_filters(db, _admin_task_query(db, ArchivedTask), filters, ArchivedTask)
+        archived = archived.order_by(ArchivedTask.id.desc()).offset(max(skip - live_count, 0))
+        return tasks + archived.limit(limit - len(tasks)).all()
+
+    descending = sort_order_normalized == "desc"
+    after = None
+    if cursor:
+        cursor_sort_by, value, last_id = decode_cursor(cursor, 3)
+        if cursor_sort_by != sort_by or not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (_parse_task_sort_value(sort_by, value), last_id)
+
+    entities = filters.entities
+    if len(entities) == 1:
+        (entity,) = entities
+        query = _sorted_task_query(db, _admin_task_query(db, entity), entity, filters, sort_by, after, descending)
+        if after is None:
+            query = query.offset(skip)
+        tasks = query.limit(limit).all()
+    else:
+        # Each table returns the sort keys of its own first rows; only the merged page is
+        # loaded with its relations.
+        fetch = limit if after is not None else skip + limit
+        keys = []
+        for entity in entities:
+            column = getattr(entity, sort_by)
+            query = _sorted_task_query(db, db.query(entity.id, column), entity, filters, sort_by, after, descending)
+            keys.extend((entity, task_id, value) for task_id, value in query.limit(fetch))
+        keys.sort(key=lambda key: _task_sort_key(db, key[2], key[1]), reverse=descending)
+        keys = keys[:limit] if after is not None else keys[skip:skip + limit]
+        tasks = _load_admin_tasks(db, [(entity, task_id) for entity, task_id, _ in keys])
+
+    if tasks and len(tasks) == limit:
+        last = tasks[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort_by, getattr(last, sort_by), last.id)
     return tasks
 
+
+def _sorted_task_query(db: Session, query, entity, filters: TaskListFilters, sort_by: str, after, descending: bool):
+    query, _ = _apply_task_filters(db, query, filters, entity)
+    column = getattr(entity, sort_by)
+    if after is not None:
+        query = query.filter(keyset_after(column, entity.id, *after, descending))
+    return query.order_by(*keyset_order(column, entity.id, descending))
+
+
+def _load_admin_tasks(db: Session, keys: list) -> list:
+    """Load ``(entity, id)`` pairs with their relations, in the given order."""
+    loaded = {}
+    for entity in {entity for entity, _ in keys}:
+        ids = [task_id for key_entity, task_id in keys if key_entity is entity]
+        for task in _admin_task_query(db, entity).filter(entity.id.in_(ids)).all():
+            loaded[(entity, task.id)] = task
+    return [loaded[key] for key in keys]
+
+
+def _task_sort_key(db: Session, value, task_id: int) -> tuple:
+    """Python equivalent of :func:`keyset_order` for merging live and archived pages."""
+    if isinstance(value, TaskStatus):
+        # PostgreSQL sorts enums in declaration order, SQLite by the stored name.
+        value = list(TaskStatus).index(value) if db.get_bind().dialect.name == "postgresql" else value.name
+    return (value is None, value, task_id)
+
+
+def _parse_task_sort_value(sort_by: str, value):
+    if value is None:
+        return None
+    if sort_by == "status":
+        try:
+            return TaskStatus(value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    if sort_by == "price":
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return value
+    return parse_cursor_datetime(value)
+
 @router.get("/tasks/{task_id}", response_model=TaskSchema, summary="Get task details with assigned user info")
 def get_task(task_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin_user)):
     """
-    Retrieves a specific task along with assigned user details and task steps.
+    Retrieves a specific task along with assigned user details and task steps, looking in
+    the archive when it is no longer live.
     """
-    db_task = (
-        db.query(Task)
-        .options(joinedload(Task.assigned_user), joinedload(Task.steps))
-        .filter(Task.id == task_id)
-        .first()
-    )
-    if db_task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-    return db_task
+    for entity in (Task, ArchivedTask):
+        db_task = (
+            db.query(entity)
+            .options(joinedload(entity.assigned_user), joinedload(entity.steps))
+            .filter(entity.id == task_id)
+            .first()
+        )
+        if db_task is not None:
+            return db_task
+    raise HTTPException(status_code=404, detail="Task not found")
 
 @router.patch("/tasks/{task_id}", response_model=TaskSchema, summary="Update a task")
 def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin_user)):
@@ -306,6 +578,7 @@ def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db), c
         setattr(db_task, field, value)
     db.commit()
     db.refresh(db_task)
+    publish_task_change(db_task)
     return db_task
 
 
@@ -319,8 +592,10 @@ def delete_task(task_id: int, db: Session = Depends(get_db), current_user: User
         raise HTTPException(status_code=404, detail="Task not found")
 
     db.query(TaskStep).filter(TaskStep.task_id == task_id).delete(synchronize_session=False)
+    record_task_removed(db, db_task)
     db.delete(db_task)
     db.commit()
+    publish_task_removed(task_id)
     return Response(status_code=204)
 
 
@@ -337,6 +612,7 @@ def add_task_step(task_id: int, step: TaskStepCreate, db: Session = Depends(get_
     db.add(db_step)
     db.commit()
     db.refresh(db_task)
+    publish_task_change(db_task)
     return db_task
 
 
@@ -361,6 +637,7 @@ def update_task_step(task_id: int, step_id: int, step: TaskStepUpdate, db: Sessi
 
     db.commit()
     db.refresh(db_task)
+    publish_task_change(db_task)
     return db_task
 
 
@@ -373,16 +650,134 @@ def delete_task_step(task_id: int, step_id: int, db: Session = Depends(get_db),
     if db_step is None:
         raise HTTPException(status_code=404, detail="Step not found")
 
+    task = db.query(Task).filter(Task.id == task_id).first()
+    if task is not None:
+        record_task_removed(db, task, step_id=db_step.id)
     db.delete(db_step)
     db.commit()
+    if task is not None:
+        publish_task_change(task)
     return Response(status_code=204)
 
+@router.post("/tasks/bulk-approve", response_model=TaskBulkApproveResult, summary="Approve many completed tasks at once")
+def bulk_approve_tasks(payload: TaskBulkApproveRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin_user)):
+    """
+    Approve the given done tasks, or every done task matching the filters, and credit
+    their earnings in a single database transaction. Tasks are locked with
+    ``FOR UPDATE SKIP LOCKED``, already credited tasks are found with one query, earnings
+    are inserted in one batch and each affected wallet is updated once. The response
+    reports the outcome of every requested id.
+    """
+
+    query = (
+        db.query(Task)
+        .filter(Task.status == TaskStatus.done, Task.assigned_user_id.isnot(None))
+        .order_by(Task.id)
+    )
+    if payload.task_ids:
+        query = query.filter(Task.id.in_(payload.task_ids))
+    else:
+        if payload.business_id is not None:
+            query = query.filter(Task.business_id == payload.business_id)
+        if payload.assigned_user_id is not None:
+            query = query.filter(Task.assigned_user_id == payload.assigned_user_id)
+        if payload.done_after is not None:
+            query = query.filter(Task.done_at >= payload.done_after)
+        if payload.done_before is not None:
+            query = query.filter(Task.done_at < payload.done_before)
+        query = query.limit(payload.limit)
+
+    tasks = query.with_for_update(skip_locked=True).all()
+
+    credited_task_ids = set()
+    if tasks:
+        credited_task_ids = {
+            task_id
+            for (task_id,) in db.query(WalletTransaction.related_task_id)
+            .filter(
+                WalletTransaction.related_task_id.in_([task.id for task in tasks]),
+                WalletTransaction.type == TransactionType.earning,
+                WalletTransaction.status == TransactionStatus.confirmed,
+            )
+            .distinct()
+            .all()
+        }
+
+    results = []
+    approvable = []
+    for task in tasks:
+        if task.id in credited_task_ids:
+            results.append(
+                TaskBulkApproveItem(task_id=task.id, success=False, status=task.status, detail="Task earning already processed")
+            )
+        else:
+            approvable.append(task)
+
+    wallet_ids = get_or_create_wallets(db, [task.assigned_user_id for task in approvable])
+    transactions = record_transactions(
+        db,
+        [
+            WalletTransaction(
+                wallet_id=wallet_ids[task.assigned_user_id],
+                type=TransactionType.earning,
+                amount=task.price,
+                status=TransactionStatus.confirmed,
+                related_task_id=task.id,
+                description=f"Earning from task #{task.id}",
+            )
+            for task in approvable
+        ],
+    )
+
+    approved_ids = [task.id for task in approvable]
+    if approved_ids:
+        db.query(Task).filter(Task.id.in_(approved_ids)).update(
+            {Task.status: TaskStatus.approved, Task.approved_at: datetime.now(timezone.utc)},
+            synchronize_session=False,
+        )
+    results.extend(
+        TaskBulkApproveItem(task_id=task_id, success=True, status=TaskStatus.approved, transaction_id=transaction.id)
+        for task_id, transaction in zip(approved_ids, transactions)
+    )
+    total_amount = sum(transaction.amount or 0.0 for transaction in transactions)
+    locked = {task.id for task in tasks}
+    db.commit()
+
+    missing_ids = [task_id for task_id in dict.fromkeys(payload.task_ids or []) if task_id not in locked]
+    if missing_ids:
+        found = {
+            row.id: row
+            for row in db.query(Task.id, Task.status, Task.assigned_user_id).filter(Task.id.in_(missing_ids)).all()
+        }
+        for task_id in missing_ids:
+            row = found.get(task_id)
+            if row is None:
+                detail = "Task not found"
+            elif row.status != TaskStatus.done:
+                detail = "Task is not marked as done"
+            elif row.assigned_user_id is None:
+                detail = "Task has no assigned user"
+            else:
+                detail = "Task is locked by another operation"
+            results.append(
+                TaskBulkApproveItem(task_id=task_id, success=False, status=row.status if row else None, detail=detail)
+            )
+
+    return TaskBulkApproveResult(
+        processed=len(approved_ids),
+        failed=len(results) - len(approved_ids),
+        total_amount=total_amount,
+        results=results,
+    )
+
 @router.post("/tasks/{task_id}/approve", response_model=TaskSchema, summary="Approve a completed task")
 def approve_task(task_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin_user)):
     """
     Approves a completed task and credits the user's wallet. Only accessible by admin users.
+    The task row is locked while it is checked and credited, so a concurrent single or
+    bulk approval of the same task cannot credit it twice.
     """
-    db_task = db.query(Task).filter(Task.id == task_id).first()
+    db_task = db.query(Task).filter(Task.id == task_id).with_for_update().first()
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
@@ -416,50 +811,123 @@ def approve_task(task_id: int, db: Session = Depends(get_db), current_user: User
         related_task_id=db_task.id,
         description=f"Earning from task #{db_task.id}"
     )
-    db.add(transaction)
+    record_transaction(db, transaction)
 
     db_task.status = TaskStatus.approved
     db_task.approved_at = datetime.now(timezone.utc)
 
-    db.flush()
-    refresh_wallet_balance(db, wallet, commit=False)
     db.commit()
 
     db.refresh(db_task)
-    db.refresh(wallet)
 
     return db_task
 
 
 # Wallet cashout management
 
+ACTIVE_CASHOUT_STATUSES = (TransactionStatus.in_progress, TransactionStatus.sent_to_bank)
+
 
 @router.get("/wallets", response_model=List[WalletAdminSummary], summary="List wallets with cashout info")
 def list_wallets(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin_user)):
-    """Return wallets along with balances and active cashout requests."""
-
-    wallets = db.query(Wallet).offset(skip).limit(limit).all()
-
-    summaries: List[WalletAdminSummary] = []
-    for wallet in wallets:
-        refresh_wallet_balance(db, wallet, commit=False)
-        active_cashouts = [
-            tx
-            for tx in wallet.transactions
-            if tx.type == TransactionType.payout
-            and tx.status in {TransactionStatus.in_progress, TransactionStatus.sent_to_bank}
-        ]
-        summaries.append(
-            WalletAdminSummary(
-                id=wallet.id,
-                user_id=wallet.user_id,
-                balance=wallet.balance,
-                shaba_number=wallet.user.shaba_number if wallet.user else None,
-                active_cashouts=active_cashouts,
+    """
+    Return wallets along with balances and active cashout requests. The page is served
+    by one query for wallets and SHABA numbers plus one batched query for the active
+    cashouts of every wallet on the page, regardless of page size.
+    """
+
+    rows = (
+        db.query(Wallet.id, Wallet.user_id, Wallet.balance, User.shaba_number)
+        .outerjoin(User, User.id == Wallet.user_id)
+        .order_by(Wallet.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+    active_cashouts: dict[int, List[WalletTransaction]] = defaultdict(list)
+    wallet_ids = [row.id for row in rows]
+    if wallet_ids:
+        cashouts = (
+            db.query(WalletTransaction)
+            .filter(
+                WalletTransaction.wallet_id.in_(wallet_ids),
+                WalletTransaction.type == TransactionType.payout,
+                WalletTransaction.status.in_(ACTIVE_CASHOUT_STATUSES),
             )
+            .order_by(WalletTransaction.id)
+            .all()
+        )
+        for transaction in cashouts:
+            active_cashouts[transaction.wallet_id].append(transaction)
+
+    return [
+        WalletAdminSummary(
+            id=row.id,
+            user_id=row.user_id,
+            balance=row.balance or 0.0,
+            shaba_number=row.shaba_number,
+            active_cashouts=active_cashouts[row.id],
         )
+        for row in rows
+    ]
+
 
-    return summaries
+@router.post("/wallets/{wallet_id}/verify-balance", response_model=WalletBalanceCheck, summary="Verify a wallet balance against its ledger")
+def verify_wallet_balance(
+    wallet_id: int,
+    repair: bool = False,
+    full: bool = Query(False, description="Scan the whole ledger instead of starting from the latest checkpoint"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Recompute a wallet balance from its latest checkpoint and newer transactions and
+    compare it with the incrementally maintained balance. Pass ``repair=true`` to
+    overwrite a drifted balance.
+    """
+
+    # Locked only for a repair, so balance changes committing while the ledger is summed
+    # wait instead of being overwritten.
+    wallet_query = db.query(Wallet).filter(Wallet.id == wallet_id)
+    wallet = (wallet_query.with_for_update() if repair else wallet_query).first()
+    if wallet is None:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+
+    checkpoint = None if full else latest_checkpoint(db, wallet.id)
+    stored_balance = wallet.balance or 0.0
+    ledger_balance = compute_wallet_balance(db, wallet.id, use_checkpoint=not full)
+    drift = round(stored_balance - ledger_balance, 6)
+
+    repaired = False
+    if repair and drift:
+        wallet.balance = ledger_balance
+        db.commit()
+        repaired = True
+
+    return WalletBalanceCheck(
+        wallet_id=wallet.id,
+        stored_balance=stored_balance,
+        ledger_balance=ledger_balance,
+        drift=drift,
+        repaired=repaired,
+        checkpoint_transaction_id=checkpoint.last_transaction_id if checkpoint else None,
+    )
+
+
+@router.get("/wallets/earnings", response_model=EarningsReport, summary="Platform earnings and payout totals")
+def platform_earnings(
+    granularity: EarningsGranularity = EarningsGranularity.day,
+    date_from: Optional[date] = Query(None, description="First day of the report (UTC); defaults to 30 days before date_to"),
+    date_to: Optional[date] = Query(None, description="Last day of the report (UTC); defaults to today"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Platform-wide earnings and payout totals per day, week or month, summed from the daily
+    wallet rollups.
+    """
+    return earnings_report(db, granularity, date_from, date_to)
 
 
 @router.get("/wallets/checkout-requests", response_model=List[WalletTransactionSchema], summary="List wallet checkout requests")
@@ -482,6 +950,149 @@ def list_checkout_requests(skip: int = 0, limit: int = 100, db: Session = Depend
     )
 
 
+@router.get("/wallets/payouts/export", summary="Export payouts sent to the bank as a bank batch file")
+def export_bank_payouts(
+    file_format: str = Query("csv", alias="format", pattern="^(csv|fixed_width)$", description="csv or fixed_width"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Stream every payout in ``sent_to_bank`` status with the beneficiary SHABA number as a
+    bank transfer file. Rows are read from a server-side cursor and written out as they
+    arrive, so large payout runs are never loaded into memory at once.
+    """
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    if file_format == "fixed_width":
+        content = stream_payout_fixed_width(db)
+        media_type = "text/plain"
+        filename = f"payouts-{stamp}.txt"
+    else:
+        content = stream_payout_csv(db)
+        media_type = "text/csv"
+        filename = f"payouts-{stamp}.csv"
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post(
+    "/wallets/payouts/reconcile",
+    response_model=BankReconciliationResult,
+    summary="Reconcile a bank statement against payouts sent to the bank",
+)
+def reconcile_bank_payouts(
+    file: UploadFile = File(..., description="CSV with reference, amount, shaba_number and status columns"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Stream an uploaded bank statement and settle the payouts it confirms. Each line is
+    matched to a ``sent_to_bank`` payout by the reference from the export file, then
+    checked against the amount and SHABA number. Matching payouts are marked ``paid``
+    (or ``denied`` for failed transfers) in batches; unmatched lines are reported.
+    """
+
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        summary = reconcile_bank_statement(db, lines)
+    finally:
+        lines.detach()
+    return BankReconciliationResult(**summary)
+
+
+@router.post(
+    "/wallets/checkout-requests/bulk/{action}",
+    response_model=WalletCheckoutBulkResult,
+    summary="Approve, complete or deny many wallet checkout requests at once",
+)
+def bulk_update_checkout_requests(
+    action: PayoutAction,
+    payload: WalletCheckoutBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """
+    Apply a payout transition to the given transaction ids, or to every eligible payout
+    matching the date filters, in a single database transaction. Rows are locked with
+    ``FOR UPDATE SKIP LOCKED`` so concurrent runs never wait on or double-process the same
+    payout, and each affected wallet balance is updated once. The response reports the
+    outcome of every requested id.
+    """
+
+    from_statuses, to_status = PAYOUT_TRANSITIONS[action.value]
+
+    query = (
+        db.query(WalletTransaction)
+        .filter(
+            WalletTransaction.type == TransactionType.payout,
+            WalletTransaction.status.in_(from_statuses),
+        )
+        .order_by(WalletTransaction.id)
+    )
+    if payload.transaction_ids:
+        query = query.filter(WalletTransaction.id.in_(payload.transaction_ids))
+    else:
+        if payload.created_after is not None:
+            query = query.filter(WalletTransaction.created_at >= payload.created_after)
+        if payload.created_before is not None:
+            query = query.filter(WalletTransaction.created_at < payload.created_before)
+        query = query.limit(payload.limit)
+
+    transactions = query.with_for_update(skip_locked=True).all()
+    processed_ids = [transaction.id for transaction in transactions]
+
+    transition_payouts(db, transactions, to_status)
+    db.commit()
+
+    results = [
+        WalletCheckoutBulkItem(transaction_id=transaction_id, success=True, status=to_status)
+        for transaction_id in processed_ids
+    ]
+
+    processed = set(processed_ids)
+    missing_ids = [
+        transaction_id
+        for transaction_id in dict.fromkeys(payload.transaction_ids or [])
+        if transaction_id not in processed
+    ]
+    if missing_ids:
+        found = {
+            row.id: row
+            for row in db.query(WalletTransaction.id, WalletTransaction.type, WalletTransaction.status)
+            .filter(WalletTransaction.id.in_(missing_ids))
+            .all()
+        }
+        for transaction_id in missing_ids:
+            row = found.get(transaction_id)
+            if row is None:
+                detail = "Checkout request not found"
+            elif row.type != TransactionType.payout:
+                detail = "Transaction is not a payout request"
+            elif row.status not in from_statuses:
+                detail = f"Transaction is not eligible to {action.value}"
+            else:
+                detail = "Transaction is locked by another operation"
+            results.append(
+                WalletCheckoutBulkItem(
+                    transaction_id=transaction_id,
+                    success=False,
+                    status=row.status if row else None,
+                    detail=detail,
+                )
+            )
+
+    return WalletCheckoutBulkResult(
+        action=action,
+        processed=len(processed_ids),
+        failed=len(results) - len(processed_ids),
+        results=results,
+    )
+
+
 @router.post(
     "/wallets/checkout-requests/{transaction_id}/approve",
     response_model=WalletTransactionSchema,
@@ -495,6 +1106,7 @@ def approve_checkout_request(transaction_id: int, db: Session = Depends(get_db),
     transaction = (
         db.query(WalletTransaction)
         .filter(WalletTransaction.id == transaction_id)
+        .with_for_update()
         .first()
     )
 
@@ -507,16 +1119,9 @@ def approve_checkout_request(transaction_id: int, db: Session = Depends(get_db),
     if transaction.status != TransactionStatus.requested:
         raise HTTPException(status_code=400, detail="Transaction is not awaiting approval")
 
-    wallet = transaction.wallet or get_or_create_wallet(db, transaction.wallet_id)
-    refresh_wallet_balance(db, wallet)
-
-    transaction.status = TransactionStatus.sent_to_bank
-
-    db.flush()
-    refresh_wallet_balance(db, wallet, commit=False)
+    set_transaction_status(db, transaction, TransactionStatus.sent_to_bank)
     db.commit()
     db.refresh(transaction)
-    db.refresh(wallet)
 
     return transaction
 
@@ -532,6 +1137,7 @@ def complete_checkout_request(transaction_id: int, db: Session = Depends(get_db)
     transaction = (
         db.query(WalletTransaction)
         .filter(WalletTransaction.id == transaction_id)
+        .with_for_update()
         .first()
     )
 
@@ -544,15 +1150,9 @@ def complete_checkout_request(transaction_id: int, db: Session = Depends(get_db)
     if transaction.status != TransactionStatus.sent_to_bank:
         raise HTTPException(status_code=400, detail="Transaction is not awaiting bank confirmation")
 
-    transaction.status = TransactionStatus.paid
-
-    wallet = transaction.wallet or get_or_create_wallet(db, transaction.wallet_id)
-
-    db.flush()
-    refresh_wallet_balance(db, wallet, commit=False)
+    set_transaction_status(db, transaction, TransactionStatus.paid)
     db.commit()
     db.refresh(transaction)
-    db.refresh(wallet)
 
     return transaction
 
@@ -568,6 +1168,7 @@ def deny_checkout_request(transaction_id: int, db: Session = Depends(get_db), cu
     transaction = (
         db.query(WalletTransaction)
         .filter(WalletTransaction.id == transaction_id)
+        .with_for_update()
         .first()
     )
 
@@ -580,13 +1181,8 @@ def deny_checkout_request(transaction_id: int, db: Session = Depends(get_db), cu
     if transaction.status not in {TransactionStatus.requested, TransactionStatus.sent_to_bank}:
         raise HTTPException(status_code=400, detail="Transaction is not eligible for denial")
 
-    transaction.status = TransactionStatus.denied
-    wallet = transaction.wallet or get_or_create_wallet(db, transaction.wallet_id)
-
-    db.flush()
-    refresh_wallet_balance(db, wallet, commit=False)
+    set_transaction_status(db, transaction, TransactionStatus.denied)
     db.commit()
     db.refresh(transaction)
-    db.refresh(wallet)
 
     return transaction
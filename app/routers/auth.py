@@ -11,6 +11,7 @@ from app.utils.otp import (
 )
 from app.utils.token import create_access_token
 from app.utils.deps import get_current_user
+from app.utils.wallet import get_or_create_wallet
 
 router = APIRouter()
 
@@ -57,6 +58,8 @@ def verify_otp(otp_verify: OTPVerify, db: Session = Depends(get_db)):
     if not user:
         user = User(phone_number=otp_verify.phone_number)
         db.add(user)
+        db.flush()
+        get_or_create_wallet(db, user.id)
         db.commit()
         db.refresh(user)
 
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_, update
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import List, Optional
+import heapq
 from app.db import get_db
-from app.schemas.task import Task as TaskSchema, TaskCreate, TaskUpdate, TaskStepUpdate
+from app.schemas.task import NearbyTask, Task as TaskSchema, TaskChanges, TaskCreate, TaskUpdate, TaskStepUpdate
+from app.schemas.task import TaskStepBatchItem, TaskStepBatchRequest, TaskStepBatchResult, TaskStepBatchStatus
 from app.models.task import Task, TaskStep, TaskStatus, StepStatus
 from app.models.user import User, VerificationStatus
-from app.utils.deps import get_current_user
+from app.utils.deps import get_current_user, get_read_only_db
+from app.utils.geo import geo_cell_ranges, haversine_km
+from app.utils.task_feed import open_task_page, publish_task_removed, stream_task_feed, task_feed_broker
+from app.utils.task_sla import task_due_at
+from app.utils.task_sync import task_changes
 from datetime import datetime, timezone
 
 router = APIRouter()
 
+MAX_NEARBY_RADIUS_KM = 50.0
+
 USER_TASK_STATUS_FILTERS = {
     "all": None,
     "pending": [TaskStatus.issued],
@@ -25,20 +36,93 @@ USER_TASK_STATUS_FILTERS = {
 def read_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """
     Retrieves a list of all available tasks that have not been accepted or assigned.
+    Serialized pages are cached in process and invalidated whenever a task changes.
     """
-    tasks = (
-        db.query(Task)
-        .options(joinedload(Task.steps))
+    return Response(content=open_task_page(db, skip, limit), media_type="application/json")
+
+
+@router.get("/stream", summary="Stream open task changes (Server-Sent Events)")
+async def stream_tasks(request: Request, limit: int = Query(100, ge=1, le=500), db: Session = Depends(get_db)):
+    """
+    Opens a Server-Sent Events stream. The first ``snapshot`` event holds the first
+    ``limit`` open tasks, as returned by ``GET /tasks/``. After that only changes are
+    sent: ``task.created`` and ``task.updated`` with the task, ``task.removed`` with its
+    id once it is accepted or otherwise leaves the feed, and ``feed.reset`` when the
+    client should reload the feed (after bulk changes, or if it fell behind).
+    """
+    def read_snapshot() -> bytes:
+        try:
+            return open_task_page(db, 0, limit)
+        finally:
+            # Give the connection back to the pool; the stream itself never queries.
+            db.close()
+
+    # Subscribe before reading the snapshot so no change can slip in between.
+    subscriber = task_feed_broker.subscribe()
+    try:
+        snapshot = await run_in_threadpool(read_snapshot)
+    except Exception:
+        task_feed_broker.unsubscribe(subscriber)
+        raise
+    return StreamingResponse(
+        stream_task_feed(subscriber, snapshot, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/nearby", response_model=List[NearbyTask], summary="Get open tasks near a location")
+def read_nearby_tasks(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5.0, gt=0, le=MAX_NEARBY_RADIUS_KM),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    """
+    Retrieves open tasks within ``radius_km`` of the given location, nearest first. Candidates
+    come from a range scan over the indexed ``geo_cell`` grid column covering the search
+    circle; exact distances are then computed for those rows only.
+    """
+    cell_filter = or_(*[Task.geo_cell.between(first, last) for first, last in geo_cell_ranges(lat, lng, radius_km)])
+    candidates = (
+        db.query(Task.id, Task.lat, Task.lng)
         .filter(
             Task.status == TaskStatus.issued,
+            cell_filter,
             Task.assigned_user_id.is_(None),
             Task.accepted_at.is_(None),
         )
-        .offset(skip)
-        .limit(limit)
         .all()
     )
-    return tasks
+
+    nearest = heapq.nsmallest(
+        limit,
+        (
+            (distance, task_id)
+            for distance, task_id in (
+                (haversine_km(lat, lng, task_lat, task_lng), task_id)
+                for task_id, task_lat, task_lng in candidates
+            )
+            if distance <= radius_km
+        ),
+    )
+    if not nearest:
+        return []
+
+    tasks = {
+        task.id: task
+        for task in db.query(Task)
+        .options(joinedload(Task.steps))
+        .filter(Task.id.in_([task_id for _, task_id in nearest]))
+        .all()
+    }
+    results = []
+    for distance, task_id in nearest:
+        task = tasks[task_id]
+        task.distance_km = round(distance, 3)
+        results.append(task)
+    return results
 
 
 @router.get("/me", response_model=List[TaskSchema], summary="Get current user's tasks")
@@ -89,6 +173,90 @@ def read_ongoing_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(ge
     )
     return tasks
 
+@router.get("/me/changes", response_model=TaskChanges, summary="Sync the current user's tasks")
+def read_my_task_changes(
+    since: Optional[str] = Query(None, description="sync_token from the previous response; omit for a full sync"),
+    db: Session = Depends(get_read_only_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Returns the current user's tasks and steps that changed since ``since``, and the ids
+    of tasks and steps that were removed. Steps are listed separately only when their
+    task did not change itself. Store ``sync_token`` and pass it on the next call; without
+    it every task is returned with ``full`` set, and the client should replace its copy.
+    """
+    return task_changes(db, current_user.id, since)
+
+@router.post("/me/steps/batch", response_model=TaskStepBatchResult, summary="Apply queued step updates")
+def update_my_task_steps(payload: TaskStepBatchRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Applies an ordered list of step updates across the current user's tasks in one
+    transaction, for clients replaying changes queued while offline. A change that
+    carries a ``version`` is skipped as a conflict when the step has been modified since
+    that version was read; ``version`` is compared with the step as it was before this
+    request, so several queued changes to one step can share it. Every change gets a
+    result, and the affected tasks are returned once with their final steps.
+    """
+    task_ids = {change.task_id for change in payload.changes}
+    step_ids = {change.step_id for change in payload.changes}
+    owned_task_ids = {
+        task_id
+        for (task_id,) in db.query(Task.id).filter(Task.id.in_(task_ids), Task.assigned_user_id == current_user.id)
+    }
+    steps = {
+        step.id: step
+        for step in db.query(TaskStep)
+        .filter(TaskStep.id.in_(step_ids), TaskStep.task_id.in_(owned_task_ids))
+        .order_by(TaskStep.id)
+        .with_for_update()
+    }
+    versions = {step_id: step.version for step_id, step in steps.items()}
+
+    results = []
+    for change in payload.changes:
+        db_step = steps.get(change.step_id)
+        if db_step is None or db_step.task_id != change.task_id:
+            results.append(
+                TaskStepBatchItem(
+                    task_id=change.task_id,
+                    step_id=change.step_id,
+                    status=TaskStepBatchStatus.not_found,
+                    detail="Step not found or task not assigned to user",
+                )
+            )
+            continue
+        if change.version is not None and change.version != versions[change.step_id]:
+            results.append(
+                TaskStepBatchItem(
+                    task_id=change.task_id,
+                    step_id=change.step_id,
+                    status=TaskStepBatchStatus.conflict,
+                    version=versions[change.step_id],
+                    detail="Step was modified since this version",
+                )
+            )
+            continue
+        for field, value in change.update.dict(exclude_unset=True).items():
+            setattr(db_step, field, value)
+        if db_step.status == StepStatus.done and db_step.done_at is None:
+            db_step.done_at = datetime.now(timezone.utc)
+        results.append(TaskStepBatchItem(task_id=change.task_id, step_id=change.step_id, status=TaskStepBatchStatus.applied))
+
+    db.commit()
+
+    # Reloading the tasks with their steps also refreshes the steps' committed versions.
+    tasks = (
+        db.query(Task)
+        .options(joinedload(Task.steps))
+        .filter(Task.id.in_(owned_task_ids))
+        .order_by(Task.id)
+        .all()
+    )
+    for result in results:
+        if result.status == TaskStepBatchStatus.applied:
+            result.version = steps[result.step_id].version
+    return TaskStepBatchResult(results=results, tasks=tasks)
+
 @router.get("/{task_id}", response_model=TaskSchema, summary="Get a specific task")
 def read_task(task_id: int, db: Session = Depends(get_db)):
     """
@@ -102,23 +270,40 @@ def read_task(task_id: int, db: Session = Depends(get_db)):
 @router.post("/{task_id}/accept", response_model=TaskSchema, summary="Accept a task")
 def accept_task(task_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """
-    Accepts a task.
+    Accepts a task. The availability check and the assignment are a single conditional
+    ``UPDATE ... RETURNING``, so when many runners accept the same task at once exactly
+    one wins and every other request gets a 409 without waiting on the winner.
     """
     if current_user.verification_status != VerificationStatus.verified:
         raise HTTPException(status_code=403, detail="User is not verified")
 
-    db_task = db.query(Task).filter(Task.id == task_id).first()
-    if db_task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if db_task.status != TaskStatus.issued or db_task.assigned_user_id is not None:
-        raise HTTPException(status_code=400, detail="Task cannot be accepted")
+    accepted_at = datetime.now(timezone.utc)
+    accepted_id = db.execute(
+        update(Task)
+        .where(
+            Task.id == task_id,
+            Task.status == TaskStatus.issued,
+            Task.assigned_user_id.is_(None),
+        )
+        .values(
+            assigned_user_id=current_user.id,
+            status=TaskStatus.in_progress,
+            accepted_at=accepted_at,
+            due_at=task_due_at(db, accepted_at),
+        )
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+
+    if accepted_id is None:
+        db.rollback()
+        if db.query(Task.id).filter(Task.id == task_id).first() is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        raise HTTPException(status_code=409, detail="Task is no longer available")
 
-    db_task.assigned_user_id = current_user.id
-    db_task.status = TaskStatus.in_progress
-    db_task.accepted_at = datetime.now(timezone.utc)
     db.commit()
-    db.refresh(db_task)
-    return db_task
+    publish_task_removed(accepted_id)
+    return db.query(Task).options(joinedload(Task.steps)).filter(Task.id == accepted_id).one()
 
 @router.post("/{task_id}/complete", response_model=TaskSchema, summary="Complete a task")
 def complete_task(task_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
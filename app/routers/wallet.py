@@ -1,56 +1,113 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
 from app.db import get_db
-from sqlalchemy.exc import IntegrityError
 
 from app.schemas.wallet import Wallet as WalletSchema
-from app.schemas.wallet import WalletCheckoutRequest, WalletTransaction as WalletTransactionSchema
+from app.schemas.wallet import EarningsGranularity, EarningsReport, WalletCheckoutRequest, WalletTransaction as WalletTransactionSchema
 from app.models.wallet import Wallet
 from app.models.user import User
-from app.utils.deps import get_current_user
-from app.utils.wallet import refresh_wallet_balance
+from app.utils.deps import get_current_user, get_read_only_db
+from app.utils.earnings import earnings_report
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, parse_cursor_datetime
+from app.utils.wallet import get_or_create_wallet, reserve_payout
 
 router = APIRouter()
 
-def get_or_create_wallet(db: Session, user_id: int) -> Wallet:
+def get_user_wallet(db: Session, user_id: int) -> Wallet:
     wallet = db.query(Wallet).filter(Wallet.user_id == user_id).first()
-    if not wallet:
-        wallet = Wallet(user_id=user_id)
-        db.add(wallet)
-        try:
-            db.commit()
-        except IntegrityError:
-            db.rollback()
-            wallet = db.query(Wallet).filter(Wallet.user_id == user_id).one()
-        else:
-            db.refresh(wallet)
+    if wallet is None:
+        raise HTTPException(status_code=404, detail="Wallet not found")
     return wallet
 
 from app.models.wallet import TransactionStatus, TransactionType, WalletTransaction
-from typing import List
+from typing import List, Optional
 
 @router.get("/me", response_model=WalletSchema, summary="Get current user's wallet")
-def read_user_wallet(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def read_user_wallet(db: Session = Depends(get_read_only_db), current_user: User = Depends(get_current_user)):
     """
-    Retrieves the wallet of the currently authenticated user.
+    Retrieves the wallet of the currently authenticated user. Runs as a read-only
+    transaction; wallets are created together with their users. The stored balance is
+    returned without reading the ledger; transactions are paged through
+    ``/wallet/me/transactions``.
     """
-    wallet = get_or_create_wallet(db, current_user.id)
-    refresh_wallet_balance(db, wallet)
+    wallet = get_user_wallet(db, current_user.id)
     wallet.shaba_number = current_user.shaba_number
     return wallet
 
 @router.get("/me/transactions", response_model=List[WalletTransactionSchema], summary="Get current user's wallet transactions")
-def read_user_wallet_transactions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def read_user_wallet_transactions(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    transaction_type: Optional[List[TransactionType]] = Query(None, alias="type", description="Filter by transaction type"),
+    status: Optional[List[TransactionStatus]] = Query(None, description="Filter by transaction status"),
+    created_from: Optional[datetime] = Query(None, description="Return transactions created on or after this datetime"),
+    created_to: Optional[datetime] = Query(None, description="Return transactions created before this datetime"),
+    db: Session = Depends(get_read_only_db),
+    current_user: User = Depends(get_current_user),
+):
     """
-    Retrieves the wallet transactions of the currently authenticated user.
+    Retrieves the wallet transactions of the currently authenticated user, newest first.
+    When a full page is returned the ``X-Next-Cursor`` response header holds a cursor for
+    the next page; passing it back keeps deep pages as fast as the first one and is not
+    affected by new transactions arriving in between. ``skip`` is ignored when a cursor
+    is given.
     """
-    wallet = get_or_create_wallet(db, current_user.id)
-    refresh_wallet_balance(db, wallet)
-    transactions = db.query(WalletTransaction).filter(WalletTransaction.wallet_id == wallet.id).offset(skip).limit(limit).all()
+    wallet = get_user_wallet(db, current_user.id)
+
+    query = db.query(WalletTransaction).filter(WalletTransaction.wallet_id == wallet.id)
+    if transaction_type:
+        query = query.filter(WalletTransaction.type.in_(transaction_type))
+    if status:
+        query = query.filter(WalletTransaction.status.in_(status))
+    if created_from is not None:
+        query = query.filter(WalletTransaction.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(WalletTransaction.created_at < created_to)
+
+    if cursor:
+        created_at, transaction_id = decode_cursor(cursor, 2)
+        created_at = parse_cursor_datetime(created_at)
+        if created_at is None or isinstance(transaction_id, bool) or not isinstance(transaction_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(
+            tuple_(WalletTransaction.created_at, WalletTransaction.id)
+            < tuple_(created_at, transaction_id)
+        )
+    elif skip:
+        query = query.offset(skip)
+
+    transactions = (
+        query.order_by(WalletTransaction.created_at.desc(), WalletTransaction.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+    if len(transactions) == limit:
+        last = transactions[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
     return transactions
 
 
+@router.get("/me/earnings", response_model=EarningsReport, summary="Get current user's earnings chart")
+def read_user_earnings(
+    granularity: EarningsGranularity = EarningsGranularity.day,
+    date_from: Optional[date] = Query(None, description="First day of the chart (UTC); defaults to 30 days before date_to"),
+    date_to: Optional[date] = Query(None, description="Last day of the chart (UTC); defaults to today"),
+    db: Session = Depends(get_read_only_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Earnings, adjustments and payouts of the current user per day, week or month, served
+    from the daily wallet rollups.
+    """
+    wallet = get_user_wallet(db, current_user.id)
+    return earnings_report(db, granularity, date_from, date_to, wallet_id=wallet.id)
+
+
 @router.post("/me/checkout", response_model=WalletTransactionSchema, summary="Request a wallet checkout")
 def request_wallet_checkout(
     payload: WalletCheckoutRequest,
@@ -64,23 +121,18 @@ def request_wallet_checkout(
     """
 
     wallet = get_or_create_wallet(db, current_user.id)
-    refresh_wallet_balance(db, wallet)
 
-    if payload.amount > wallet.balance:
-        raise HTTPException(status_code=400, detail="Insufficient available balance for checkout request")
-
-    transaction = WalletTransaction(
-        wallet_id=wallet.id,
-        type=TransactionType.payout,
-        amount=payload.amount,
-        status=TransactionStatus.requested,
+    transaction = reserve_payout(
+        db,
+        wallet.id,
+        payload.amount,
         description=payload.description or "Wallet checkout request",
     )
+    if transaction is None:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Insufficient available balance for checkout request")
 
-    db.add(transaction)
     db.commit()
     db.refresh(transaction)
 
-    refresh_wallet_balance(db, wallet)
-
     return transaction
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Union
 from datetime import datetime
-from app.models.task import TaskStatus, StepStatus
+import enum
+from app.models.task import SlaBreachKind, TaskStatus, StepStatus
 from app.schemas.user import User as UserSchema
 from app.schemas.business import Business as BusinessSchema
 
@@ -66,6 +67,7 @@ class TaskStep(TaskStepBase):
     task_id: int
     status: StepStatus
     done_at: Optional[datetime] = None
+    version: int = 1
 
     class Config:
         from_attributes = True
@@ -109,6 +111,7 @@ class Task(TaskBase):
     steps: List[TaskStep] = Field(default_factory=list)
     kind: Optional[TaskKind] = None
     accepted_at: Optional[datetime] = None
+    due_at: Optional[datetime] = None
     done_at: Optional[datetime] = None
     approved_at: Optional[datetime] = None
     created_by_admin_id: Optional[int] = None
@@ -127,3 +130,125 @@ class AdminTask(Task):
     category: Optional[TaskCategory] = None
     tags: List[TaskTag] = Field(default_factory=list)
     created_by_admin: Optional[UserSchema] = None
+
+
+class NearbyTask(Task):
+    distance_km: float
+
+
+class TaskBulkApproveRequest(BaseModel):
+    task_ids: Optional[List[int]] = Field(None, max_length=10000)
+    business_id: Optional[int] = None
+    assigned_user_id: Optional[int] = None
+    done_after: Optional[datetime] = None
+    done_before: Optional[datetime] = None
+    limit: int = Field(1000, gt=0, le=10000)
+
+    @model_validator(mode="after")
+    def require_selection(self):
+        # An empty body must not approve every done task.
+        filters = (self.business_id, self.assigned_user_id, self.done_after, self.done_before)
+        if self.task_ids is None and all(value is None for value in filters):
+            raise ValueError("Provide task_ids or at least one of business_id, assigned_user_id, done_after, done_before")
+        if self.task_ids is not None and not self.task_ids:
+            raise ValueError("task_ids must not be empty")
+        return self
+
+
+class TaskBulkApproveItem(BaseModel):
+    task_id: int
+    success: bool
+    status: Optional[TaskStatus] = None
+    transaction_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class TaskBulkApproveResult(BaseModel):
+    processed: int
+    failed: int
+    total_amount: float = 0.0
+    results: List[TaskBulkApproveItem] = Field(default_factory=list)
+
+
+class TaskImportFormat(str, enum.Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class TaskImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class TaskImportResult(BaseModel):
+    lines: int
+    imported: int
+    steps: int
+    failed: int
+    errors: List[TaskImportError] = Field(default_factory=list)
+
+
+class TaskFacetCount(BaseModel):
+    value: Optional[Union[TaskStatus, int]] = None
+    count: int
+
+
+class TaskFacets(BaseModel):
+    total: int
+    approximate: bool = False
+    status: List[TaskFacetCount] = Field(default_factory=list)
+    business_id: List[TaskFacetCount] = Field(default_factory=list)
+    task_kind_id: List[TaskFacetCount] = Field(default_factory=list)
+    category_id: List[TaskFacetCount] = Field(default_factory=list)
+
+
+class TaskChanges(BaseModel):
+    tasks: List[Task] = Field(default_factory=list)
+    steps: List[TaskStep] = Field(default_factory=list)
+    removed_task_ids: List[int] = Field(default_factory=list)
+    removed_step_ids: List[int] = Field(default_factory=list)
+    sync_token: str
+    full: bool = False
+
+
+class TaskStepBatchChange(BaseModel):
+    task_id: int
+    step_id: int
+    version: Optional[int] = Field(None, description="Step version the change was made against; omit to skip the conflict check")
+    update: TaskStepUpdate
+
+
+class TaskStepBatchRequest(BaseModel):
+    changes: List[TaskStepBatchChange] = Field(..., min_length=1, max_length=500)
+
+
+class TaskStepBatchStatus(str, enum.Enum):
+    applied = "applied"
+    conflict = "conflict"
+    not_found = "not_found"
+
+
+class TaskStepBatchItem(BaseModel):
+    task_id: int
+    step_id: int
+    status: TaskStepBatchStatus
+    version: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class TaskStepBatchResult(BaseModel):
+    results: List[TaskStepBatchItem] = Field(default_factory=list)
+    tasks: List[Task] = Field(default_factory=list)
+
+
+class TaskSlaBreach(BaseModel):
+    id: int
+    task_id: int
+    kind: SlaBreachKind
+    assigned_user_id: Optional[int] = None
+    due_at: Optional[datetime] = None
+    detected_at: datetime
+    resolved_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,8 +1,10 @@
 from pydantic import BaseModel
 from pydantic import Field
 from pydantic import ConfigDict
+from pydantic import model_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
+import enum
 from app.models.wallet import TransactionType, TransactionStatus
 
 class WalletTransactionBase(BaseModel):
@@ -29,7 +31,6 @@ class WalletBase(BaseModel):
 class Wallet(WalletBase):
     id: int
     user_id: int
-    transactions: List[WalletTransaction] = []
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -45,3 +46,88 @@ class WalletAdminSummary(WalletBase):
     active_cashouts: List[WalletTransaction] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class WalletBalanceCheck(BaseModel):
+    wallet_id: int
+    stored_balance: float
+    ledger_balance: float
+    drift: float
+    repaired: bool = False
+    checkpoint_transaction_id: Optional[int] = None
+
+
+class PayoutAction(str, enum.Enum):
+    approve = "approve"
+    complete = "complete"
+    deny = "deny"
+
+
+class WalletCheckoutBulkRequest(BaseModel):
+    transaction_ids: Optional[List[int]] = Field(None, max_length=10000)
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    limit: int = Field(1000, gt=0, le=10000)
+
+    @model_validator(mode="after")
+    def require_selection(self):
+        # An empty body must not select every pending payout.
+        if self.transaction_ids is None and self.created_after is None and self.created_before is None:
+            raise ValueError("Provide transaction_ids or a created_after/created_before filter")
+        if self.transaction_ids is not None and not self.transaction_ids:
+            raise ValueError("transaction_ids must not be empty")
+        return self
+
+
+class WalletCheckoutBulkItem(BaseModel):
+    transaction_id: int
+    success: bool
+    status: Optional[TransactionStatus] = None
+    detail: Optional[str] = None
+
+
+class WalletCheckoutBulkResult(BaseModel):
+    action: PayoutAction
+    processed: int
+    failed: int
+    results: List[WalletCheckoutBulkItem] = []
+
+
+class BankStatementMismatch(BaseModel):
+    line: int
+    reference: Optional[str] = None
+    reason: str
+
+
+class BankReconciliationResult(BaseModel):
+    lines: int
+    paid: int
+    denied: int
+    unmatched_count: int
+    unmatched: List[BankStatementMismatch] = []
+
+
+class EarningsGranularity(str, enum.Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class EarningsTotals(BaseModel):
+    earnings: float = 0.0
+    adjustments: float = 0.0
+    pending_payouts: float = 0.0
+    paid_out: float = 0.0
+    transaction_count: int = 0
+
+
+class EarningsPeriod(EarningsTotals):
+    period_start: date
+
+
+class EarningsReport(BaseModel):
+    granularity: EarningsGranularity
+    date_from: date
+    date_to: date
+    totals: EarningsTotals
+    periods: List[EarningsPeriod] = []
@@ -0,0 +1,236 @@
+import csv
+import io
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.wallet import Wallet, WalletTransaction, TransactionStatus, TransactionType
+from app.utils.wallet import transition_payouts
+
+
+EXPORT_BATCH_SIZE = 1000
+STATEMENT_BATCH_SIZE = 1000
+MAX_REPORTED_UNMATCHED = 1000
+
+# Statement line statuses mapped to the payout status they settle to.
+STATEMENT_STATUSES = {
+    "paid": TransactionStatus.paid,
+    "success": TransactionStatus.paid,
+    "done": TransactionStatus.paid,
+    "failed": TransactionStatus.denied,
+    "rejected": TransactionStatus.denied,
+    "returned": TransactionStatus.denied,
+}
+
+CSV_COLUMNS = ["reference", "shaba_number", "amount", "first_name", "last_name", "requested_at"]
+
+# Fixed-width detail record: record type, reference, SHABA, amount, beneficiary name.
+FIXED_WIDTH_REFERENCE = 12
+FIXED_WIDTH_SHABA = 26
+FIXED_WIDTH_AMOUNT = 15
+FIXED_WIDTH_NAME = 40
+
+
+def payout_reference(transaction_id: int) -> str:
+    """Reference printed on bank files; bank statements echo it back for reconciliation."""
+    return str(transaction_id).zfill(FIXED_WIDTH_REFERENCE)
+
+
+def payout_amount(amount: float | None) -> int:
+    return int(round(amount or 0))
+
+
+def iter_bank_payouts(db: Session, batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Stream every payout waiting at the bank together with the beneficiary SHABA number.
+    Rows are fetched through a server-side cursor ``batch_size`` at a time, so memory use
+    does not grow with the size of the payout run.
+    """
+    query = (
+        select(
+            WalletTransaction.id,
+            WalletTransaction.amount,
+            WalletTransaction.created_at,
+            User.shaba_number,
+            User.first_name,
+            User.last_name,
+        )
+        .join(Wallet, Wallet.id == WalletTransaction.wallet_id)
+        .join(User, User.id == Wallet.user_id)
+        .where(
+            WalletTransaction.type == TransactionType.payout,
+            WalletTransaction.status == TransactionStatus.sent_to_bank,
+        )
+        .order_by(WalletTransaction.id)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.execute(query)
+
+
+def _chunked_lines(lines: Iterable[str], lines_per_chunk: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= lines_per_chunk:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def _csv_lines(rows) -> Iterator[str]:
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    def flush() -> str:
+        value = output.getvalue()
+        output.seek(0)
+        output.truncate(0)
+        return value
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+    for row in rows:
+        writer.writerow([
+            payout_reference(row.id),
+            row.shaba_number or "",
+            payout_amount(row.amount),
+            row.first_name or "",
+            row.last_name or "",
+            row.created_at.isoformat() if row.created_at else "",
+        ])
+        yield flush()
+
+
+def _fixed_width_lines(rows, generated_at: datetime) -> Iterator[str]:
+    yield f"H{generated_at.strftime('%Y%m%d%H%M%S')}\n"
+    count = 0
+    total = 0
+    for row in rows:
+        amount = payout_amount(row.amount)
+        name = " ".join(part for part in [row.first_name, row.last_name] if part)
+        yield (
+            "D"
+            + payout_reference(row.id)
+            + (row.shaba_number or "").ljust(FIXED_WIDTH_SHABA)[:FIXED_WIDTH_SHABA]
+            + str(amount).zfill(FIXED_WIDTH_AMOUNT)
+            + name.ljust(FIXED_WIDTH_NAME)[:FIXED_WIDTH_NAME]
+            + "\n"
+        )
+        count += 1
+        total += amount
+    yield f"T{str(count).zfill(10)}{str(total).zfill(18)}\n"
+
+
+def stream_payout_csv(db: Session) -> Iterator[str]:
+    return _chunked_lines(_csv_lines(iter_bank_payouts(db)))
+
+
+def stream_payout_fixed_width(db: Session, generated_at: datetime | None = None) -> Iterator[str]:
+    """
+    Fixed-width bank batch: an ``H`` header with the generation time, one ``D`` record
+    per payout and a ``T`` trailer with the record count and total amount.
+    """
+    generated_at = generated_at or datetime.now(timezone.utc)
+    return _chunked_lines(_fixed_width_lines(iter_bank_payouts(db), generated_at))
+
+
+def _normalize_shaba(value: str | None) -> str:
+    return "".join((value or "").split()).upper()
+
+
+def _parse_statement_line(record: dict) -> tuple[int, int, str, TransactionStatus]:
+    reference = int((record.get("reference") or "").strip())
+    amount = payout_amount(float((record.get("amount") or "").strip()))
+    status = STATEMENT_STATUSES[(record.get("status") or "paid").strip().lower()]
+    return reference, amount, _normalize_shaba(record.get("shaba_number")), status
+
+
+def _reconcile_batch(db: Session, batch: list[tuple[int, dict]], seen: set[int], summary: dict) -> None:
+    parsed = []
+    for line_number, record in batch:
+        try:
+            parsed.append((line_number, *_parse_statement_line(record)))
+        except (KeyError, TypeError, ValueError):
+            _report_unmatched(summary, line_number, record.get("reference"), "Malformed statement line")
+
+    references = [reference for _, reference, _, _, _ in parsed]
+    rows = {}
+    if references:
+        rows = {
+            transaction.id: (transaction, shaba_number)
+            for transaction, shaba_number in db.query(WalletTransaction, User.shaba_number)
+            .join(Wallet, Wallet.id == WalletTransaction.wallet_id)
+            .join(User, User.id == Wallet.user_id)
+            .filter(WalletTransaction.id.in_(references))
+            .with_for_update(of=WalletTransaction, skip_locked=True)
+            .all()
+        }
+
+    settled: dict[TransactionStatus, list[WalletTransaction]] = {
+        TransactionStatus.paid: [],
+        TransactionStatus.denied: [],
+    }
+    for line_number, reference, amount, shaba_number, status in parsed:
+        if reference in seen:
+            _report_unmatched(summary, line_number, reference, "Duplicate reference in statement")
+            continue
+        seen.add(reference)
+
+        row = rows.get(reference)
+        if row is None:
+            _report_unmatched(summary, line_number, reference, "No payout found for reference, or it is locked by another operation")
+            continue
+        transaction, expected_shaba = row
+        if transaction.type != TransactionType.payout or transaction.status != TransactionStatus.sent_to_bank:
+            _report_unmatched(summary, line_number, reference, "Payout is not awaiting bank confirmation")
+        elif payout_amount(transaction.amount) != amount:
+            _report_unmatched(summary, line_number, reference, "Amount does not match payout")
+        elif _normalize_shaba(expected_shaba) != shaba_number:
+            _report_unmatched(summary, line_number, reference, "SHABA number does not match payout")
+        else:
+            settled[status].append(transaction)
+
+    for status, transactions in settled.items():
+        if transactions:
+            transition_payouts(db, transactions, status)
+    db.commit()
+
+    summary["paid"] += len(settled[TransactionStatus.paid])
+    summary["denied"] += len(settled[TransactionStatus.denied])
+
+
+def _report_unmatched(summary: dict, line_number: int, reference, reason: str) -> None:
+    summary["unmatched_count"] += 1
+    if len(summary["unmatched"]) < MAX_REPORTED_UNMATCHED:
+        summary["unmatched"].append({
+            "line": line_number,
+            "reference": str(reference) if reference is not None else None,
+            "reason": reason,
+        })
+
+
+def reconcile_bank_statement(db: Session, lines: Iterable[str], batch_size: int = STATEMENT_BATCH_SIZE) -> dict:
+    """
+    Match a CSV bank statement (``reference,amount,shaba_number,status``) against payouts
+    sent to the bank. Lines are read as a stream and settled ``batch_size`` at a time:
+    matching payouts are looked up by primary key, locked, moved to ``paid`` or ``denied``
+    in batched updates, and committed per batch. Lines that do not match are reported.
+    """
+    summary = {"lines": 0, "paid": 0, "denied": 0, "unmatched_count": 0, "unmatched": []}
+    seen: set[int] = set()
+    batch: list[tuple[int, dict]] = []
+
+    for line_number, record in enumerate(csv.DictReader(lines), start=2):
+        summary["lines"] += 1
+        batch.append((line_number, record))
+        if len(batch) >= batch_size:
+            _reconcile_batch(db, batch, seen, summary)
+            batch = []
+    if batch:
+        _reconcile_batch(db, batch, seen, summary)
+
+    return summary
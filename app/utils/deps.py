@@ -33,6 +33,16 @@ def get_current_user(token: str = Depends(api_key_header), db: Session = Depends
         raise credentials_exception
     return user
 
+def get_read_only_db(db: Session = Depends(get_db)):
+    """
+    Session for endpoints that never write. On PostgreSQL the transaction is opened
+    ``READ ONLY``, so the request can be served by a replica and never commits.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection(execution_options={"postgresql_readonly": True})
+    yield db
+
+
 def user_has_permission(required_permission: str):
     def _user_has_permission(current_user: User = Depends(get_current_user)):
         if not current_user.role:
@@ -0,0 +1,99 @@
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.wallet import RollupBucket, TransactionType, WalletDailyRollup
+from app.schemas.wallet import EarningsGranularity
+
+DEFAULT_REPORT_DAYS = 30
+MAX_REPORT_DAYS = 731
+
+# Weeks start on Saturday, matching the local calendar.
+WEEK_START_WEEKDAY = 5
+
+
+def period_start(day: date, granularity: EarningsGranularity) -> date:
+    if granularity == EarningsGranularity.week:
+        return day - timedelta(days=(day.weekday() - WEEK_START_WEEKDAY) % 7)
+    if granularity == EarningsGranularity.month:
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(start: date, granularity: EarningsGranularity) -> date:
+    if granularity == EarningsGranularity.week:
+        return start + timedelta(days=7)
+    if granularity == EarningsGranularity.month:
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def _empty_totals() -> dict:
+    return {"earnings": 0.0, "adjustments": 0.0, "pending_payouts": 0.0, "paid_out": 0.0, "transaction_count": 0}
+
+
+def _add_rollup(totals: dict, transaction_type: TransactionType, bucket: RollupBucket, amount: float, count: int) -> None:
+    if bucket == RollupBucket.void:
+        return
+    totals["transaction_count"] += count
+    if transaction_type == TransactionType.payout:
+        key = "paid_out" if bucket == RollupBucket.settled else "pending_payouts"
+        totals[key] += amount
+    elif bucket == RollupBucket.settled:
+        key = "earnings" if transaction_type == TransactionType.earning else "adjustments"
+        totals[key] += amount
+
+
+def earnings_report(
+    db: Session,
+    granularity: EarningsGranularity = EarningsGranularity.day,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    wallet_id: int | None = None,
+) -> dict:
+    """
+    Build an earnings chart from the daily rollups, for one wallet or the whole platform.
+    Only rollup rows in the requested range are read, so the cost depends on the range
+    and not on the size of the transaction ledger. Every period in the range is present,
+    with zeros where nothing happened; transactions are counted on the day they were
+    created, in the status they have now.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_REPORT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_REPORT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_REPORT_DAYS} days")
+
+    query = db.query(
+        WalletDailyRollup.day,
+        WalletDailyRollup.type,
+        WalletDailyRollup.bucket,
+        func.sum(WalletDailyRollup.amount),
+        func.sum(WalletDailyRollup.transaction_count),
+    ).filter(WalletDailyRollup.day >= date_from, WalletDailyRollup.day <= date_to)
+    if wallet_id is not None:
+        query = query.filter(WalletDailyRollup.wallet_id == wallet_id)
+    rows = query.group_by(WalletDailyRollup.day, WalletDailyRollup.type, WalletDailyRollup.bucket).all()
+
+    periods: dict[date, dict] = {}
+    start = period_start(date_from, granularity)
+    while start <= date_to:
+        periods[start] = _empty_totals()
+        start = _next_period(start, granularity)
+
+    totals = _empty_totals()
+    for day, transaction_type, bucket, amount, count in rows:
+        amount, count = float(amount or 0.0), int(count or 0)
+        _add_rollup(periods[period_start(day, granularity)], transaction_type, bucket, amount, count)
+        _add_rollup(totals, transaction_type, bucket, amount, count)
+
+    return {
+        "granularity": granularity,
+        "date_from": date_from,
+        "date_to": date_to,
+        "totals": totals,
+        "periods": [{"period_start": start, **values} for start, values in periods.items()],
+    }
@@ -0,0 +1,58 @@
+import math
+from typing import List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Tasks are bucketed into a fixed lat/lng grid. A cell id is ``row * GEO_CELL_COLUMNS +
+# column``, so the cells of one grid row are contiguous integers and a bounding box
+# becomes one B-tree range scan per row.
+GEO_CELL_DEGREES = 0.05
+GEO_CELL_ROWS = int(round(180 / GEO_CELL_DEGREES))
+GEO_CELL_COLUMNS = int(round(360 / GEO_CELL_DEGREES))
+
+
+def _row(lat: float) -> int:
+    return min(max(int(math.floor((lat + 90) / GEO_CELL_DEGREES)), 0), GEO_CELL_ROWS - 1)
+
+
+def _column(lng: float) -> int:
+    return min(max(int(math.floor((lng + 180) / GEO_CELL_DEGREES)), 0), GEO_CELL_COLUMNS - 1)
+
+
+def geo_cell(lat: Optional[float], lng: Optional[float]) -> Optional[int]:
+    """Grid cell id of a coordinate, or ``None`` when the coordinate is incomplete."""
+    if lat is None or lng is None:
+        return None
+    return _row(lat) * GEO_CELL_COLUMNS + _column(lng)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two coordinates in kilometers."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geo_cell_ranges(lat: float, lng: float, radius_km: float) -> List[Tuple[int, int]]:
+    """
+    Inclusive ``(first_cell, last_cell)`` ranges, one per grid row, that cover every
+    point within ``radius_km`` of the given coordinate.
+    """
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(lat - d_lat, -90.0), min(lat + d_lat, 90.0)
+
+    # Longitude degrees shrink towards the poles; size the box for the widest latitude.
+    widest = max(abs(min_lat), abs(max_lat))
+    cos_lat = math.cos(math.radians(widest))
+    if cos_lat < 1e-6:
+        d_lng = 180.0
+    else:
+        d_lng = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+
+    first_column, last_column = _column(lng - d_lng), _column(lng + d_lng)
+    return [
+        (row * GEO_CELL_COLUMNS + first_column, row * GEO_CELL_COLUMNS + last_column)
+        for row in range(_row(min_lat), _row(max_lat) + 1)
+    ]
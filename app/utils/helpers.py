@@ -1,9 +1,58 @@
+# Arabic and Persian variants of the same letter or digit, folded to one form so that
+# text typed on either keyboard matches. Zero-width joiners, tatweel and diacritics are
+# dropped. migrations/versions/26_* mirrors these tables in SQL for the backfill.
+DIGIT_FOLDS = {
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)},  # Persian digits
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},  # Arabic-Indic digits
+}
+
+LETTER_FOLDS = {
+    "ي": "ی",  # Arabic yeh -> Persian yeh
+    "ى": "ی",  # alef maksura -> Persian yeh
+    "ئ": "ی",  # yeh with hamza -> Persian yeh
+    "ك": "ک",  # Arabic kaf -> Persian kaf
+    "ة": "ه",  # teh marbuta -> heh
+    "ۀ": "ه",  # heh with yeh -> heh
+    "أ": "ا",  # alef with hamza above -> alef
+    "إ": "ا",  # alef with hamza below -> alef
+    "ٱ": "ا",  # alef wasla -> alef
+    "ؤ": "و",  # waw with hamza -> waw
+}
+
+REMOVED_CHARACTERS = (
+    "\u200c\u200d\u200e\u200f"  # zero-width non-joiner/joiner, direction marks
+    + "\u0640"  # tatweel
+    + "".join(chr(code) for code in range(0x064B, 0x0660))  # harakat
+    + "\u0670"  # superscript alef
+)
+
+_DIGIT_TABLE = str.maketrans(DIGIT_FOLDS)
+_SEARCH_TABLE = str.maketrans({**DIGIT_FOLDS, **LETTER_FOLDS, **{char: None for char in REMOVED_CHARACTERS}})
+
+
+def normalize_digits(value: str | None) -> str | None:
+    """Replaces Persian and Arabic-Indic digits with ASCII digits."""
+    if value is None:
+        return None
+    return value.translate(_DIGIT_TABLE)
+
+
+def normalize_search_text(value: str | None) -> str:
+    """
+    Folds text for searching: Arabic/Persian letter and digit variants become one form,
+    invisible joiners and diacritics are removed, case is lowered and whitespace collapsed.
+    """
+    if not value:
+        return ""
+    return " ".join(value.translate(_SEARCH_TABLE).lower().split())
+
+
 def normalize_phone_number(phone_number: str) -> str:
     """
     Normalizes a phone number to the +98 format.
     Handles numbers starting with 0, 9, or already in the correct format.
     """
-    phone_number = "".join(phone_number.split())
+    phone_number = "".join(normalize_digits(phone_number).split())
 
     if phone_number.startswith("0"):
         return "+98" + phone_number[1:]
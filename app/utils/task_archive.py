@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.task import Task, TaskStep, TaskStatus, TaskTombstone
+from app.models.task_archive import task_steps_archive, task_tag_link_archive, tasks_archive
+from app.models.task_meta import TaskMeta, task_tag_link
+
+ARCHIVE_BATCH_SIZE = 1000
+
+# Tasks in these statuses never change again and are moved to the archive tables.
+ARCHIVED_STATUSES = (TaskStatus.approved, TaskStatus.canceled, TaskStatus.rejected)
+
+
+def _copy(db: Session, source, target, key_column, task_ids: list) -> None:
+    # Only the archive's own columns: live-only columns (and archived_at) are left out.
+    columns = [column.name for column in target.columns if column.name in source.columns]
+    rows = select(*(source.columns[name] for name in columns)).where(key_column.in_(task_ids))
+    db.execute(insert(target).from_select(columns, rows))
+
+
+def archive_tasks(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Move approved, canceled and rejected tasks not updated for ``older_than_days``
+    (default ``TASK_ARCHIVE_AFTER_DAYS``) with their steps and tag links into the archive
+    tables, leaving a tombstone so the runner's change feed drops them. Each batch of
+    ``batch_size`` tasks is copied and deleted with set-based statements and committed on
+    its own, so locks are short and an interrupted run keeps its progress. Rows locked by
+    another run are skipped. Returns the number of tasks moved.
+    """
+    days = settings.TASK_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    candidates = (
+        select(Task.id)
+        .where(
+            Task.status.in_(ARCHIVED_STATUSES),
+            Task.updated_at < cutoff,
+            # task_meta rows still reference live tasks only.
+            ~exists().where(TaskMeta.task_id == Task.id),
+        )
+        .order_by(Task.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        task_ids = db.scalars(candidates).all()
+        if not task_ids:
+            break
+        # Parents are copied first and deleted last so foreign keys hold on both sides.
+        _copy(db, Task.__table__, tasks_archive, Task.id, task_ids)
+        _copy(db, TaskStep.__table__, task_steps_archive, TaskStep.task_id, task_ids)
+        _copy(db, task_tag_link, task_tag_link_archive, task_tag_link.c.task_id, task_ids)
+        # Archived tasks leave their runner's task list; tell the change feed.
+        db.execute(
+            insert(TaskTombstone).from_select(
+                ["user_id", "task_id"],
+                select(Task.assigned_user_id, Task.id).where(Task.id.in_(task_ids), Task.assigned_user_id.is_not(None)),
+            )
+        )
+        db.execute(delete(task_tag_link).where(task_tag_link.c.task_id.in_(task_ids)))
+        db.execute(delete(TaskStep).where(TaskStep.task_id.in_(task_ids)))
+        db.execute(delete(Task).where(Task.id.in_(task_ids)))
+        db.commit()
+        moved += len(task_ids)
+        batches += 1
+    return moved
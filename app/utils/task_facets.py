@@ -0,0 +1,101 @@
+from collections import defaultdict
+from typing import Optional
+
+from sqlalchemy import func, text, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.models.task import TaskStatus
+
+FACET_COLUMNS = ("status", "business_id", "task_kind_id", "category_id")
+
+
+def _facet_lists(counts: dict) -> dict:
+    facets = {
+        name: [
+            {"value": value, "count": count}
+            for value, count in sorted(values.items(), key=lambda item: (-item[1], str(item[0])))
+        ]
+        for name, values in counts.items()
+    }
+    return {"total": sum(counts["status"].values()), **facets}
+
+
+def count_task_facets(db: Session, *queries: Query) -> dict:
+    """
+    Task counts per facet for the rows of ``queries`` (over live or archived tasks), with
+    one aggregate query each. PostgreSQL computes every facet in a single pass with
+    ``GROUPING SETS``; other databases group by all facet columns at once and the
+    per-facet sums are folded here.
+    """
+    counts = {name: defaultdict(int) for name in FACET_COLUMNS}
+    for query in queries:
+        entity = query.column_descriptions[0]["entity"]
+        columns = [getattr(entity, name) for name in FACET_COLUMNS]
+
+        if db.get_bind().dialect.name == "postgresql":
+            # grouping() sets one bit per column, first column highest, for every column
+            # that is rolled up in the row's grouping set.
+            full_mask = (1 << len(columns)) - 1
+            facet_for_mask = {
+                full_mask ^ (1 << (len(columns) - 1 - index)): (index, name) for index, name in enumerate(FACET_COLUMNS)
+            }
+            rows = (
+                query.with_entities(*columns, func.grouping(*columns), func.count())
+                .group_by(func.grouping_sets(*(tuple_(column) for column in columns)))
+                .all()
+            )
+            for row in rows:
+                index, name = facet_for_mask[row[-2]]
+                counts[name][row[index]] += row[-1]
+            continue
+
+        for *values, count in query.with_entities(*columns, func.count()).group_by(*columns):
+            for name, value in zip(FACET_COLUMNS, values):
+                counts[name][value] += count
+    return _facet_lists(counts)
+
+
+def _parse_statistics_value(name: str, value: str):
+    if name == "status":
+        return TaskStatus[value]
+    return int(value)
+
+
+def approximate_task_facets(db: Session, tables=("tasks",)) -> Optional[dict]:
+    """
+    Unfiltered facet counts estimated from PostgreSQL's planner statistics: each table's
+    row estimate and, per column, the most common values with their frequencies. Only
+    values in the statistics' most-common list are reported. Returns ``None`` when the
+    database is not PostgreSQL or a table has not been analyzed yet.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+
+    total = 0
+    counts = {name: defaultdict(int) for name in FACET_COLUMNS}
+    for table in tables:
+        reltuples = db.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+        ).scalar()
+        if reltuples is None or reltuples < 0:
+            return None
+        total += round(reltuples)
+        rows = db.execute(
+            text(
+                """
+                SELECT attname, null_frac, most_common_vals::text::text[], most_common_freqs
+                FROM pg_stats
+                WHERE schemaname = current_schema() AND tablename = :table AND attname = ANY(:columns)
+                """
+            ),
+            {"table": table, "columns": list(FACET_COLUMNS)},
+        )
+        for name, null_frac, values, frequencies in rows:
+            if null_frac:
+                counts[name][None] += round(null_frac * reltuples)
+            for value, frequency in zip(values or [], frequencies or []):
+                counts[name][_parse_statistics_value(name, value)] += round(frequency * reltuples)
+
+    facets = _facet_lists(counts)
+    facets.update(total=total, approximate=True)
+    return facets
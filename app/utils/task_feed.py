@@ -0,0 +1,290 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import AsyncIterator, Hashable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.db import dialect_insert
+from app.models.task import Task, TaskFeedState, TaskStatus
+from app.schemas.task import Task as TaskSchema
+
+logger = logging.getLogger(__name__)
+
+TASK_LIST_ADAPTER = TypeAdapter(List[TaskSchema])
+
+STREAM_QUEUE_SIZE = 256
+STREAM_HEARTBEAT_SECONDS = 15.0
+
+TASK_FEED_STATE_ID = 1
+
+
+class TaskFeedCache:
+    """
+    Serialized pages of the open-task feed, keyed by page and filter. Every task mutation
+    bumps a version number and drops all entries; a page computed while the version
+    changed is not stored, so a response built from pre-mutation rows is never cached.
+    Entries also expire after ``ttl_seconds``, which bounds how stale a page can get in
+    other worker processes that did not see the mutation; bulk changes reach them sooner
+    through the polled ``task_feed_state`` version.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entries: "OrderedDict[Hashable, tuple[float, bytes]]" = OrderedDict()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: Hashable, version: int, body: bytes) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+
+def format_event(event: str, data: str, event_id: Optional[int] = None) -> str:
+    """Encode one Server-Sent Events message."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+class TaskFeedSubscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.lagging = False
+
+    def offer(self, message: str) -> None:
+        # Runs on the subscriber's event loop. A client that cannot keep up is told to
+        # resync instead of buffering without bound.
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.lagging = True
+
+
+class TaskFeedBroker:
+    """
+    Fans task events out to streaming clients. Each connection is an ``asyncio.Queue``
+    on the event loop, so idle connections cost no threads. ``publish`` can be called
+    from the worker threads that run sync endpoints; messages are handed to each event
+    loop with one ``call_soon_threadsafe`` per loop, not per subscriber.
+    """
+
+    def __init__(self, queue_size: int = STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: set[TaskFeedSubscriber] = set()
+        self._sequence = itertools.count(1)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> TaskFeedSubscriber:
+        subscriber = TaskFeedSubscriber(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: TaskFeedSubscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event: str, data: str) -> None:
+        if not self._subscribers:
+            return
+        message = format_event(event, data, next(self._sequence))
+        by_loop = defaultdict(list)
+        with self._lock:
+            for subscriber in self._subscribers:
+                by_loop[subscriber.loop].append(subscriber)
+        for loop, subscribers in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_fan_out, subscribers, message)
+            except RuntimeError:
+                # The loop is closed; its connections are gone.
+                with self._lock:
+                    self._subscribers.difference_update(subscribers)
+
+
+def _fan_out(subscribers: List[TaskFeedSubscriber], message: str) -> None:
+    for subscriber in subscribers:
+        subscriber.offer(message)
+
+
+task_feed_cache = TaskFeedCache(settings.TASK_FEED_CACHE_TTL_SECONDS)
+task_feed_broker = TaskFeedBroker()
+
+
+def open_tasks_query(db: Session):
+    return db.query(Task).filter(
+        Task.status == TaskStatus.issued,
+        Task.assigned_user_id.is_(None),
+        Task.accepted_at.is_(None),
+    )
+
+
+def is_open_task(task: Task) -> bool:
+    return task.status == TaskStatus.issued and task.assigned_user_id is None and task.accepted_at is None
+
+
+def open_task_page(db: Session, skip: int, limit: int) -> bytes:
+    """Serialized page of open tasks, served from the cache when possible."""
+    cache_key = (skip, limit)
+    body = task_feed_cache.get(cache_key)
+    if body is None:
+        version = task_feed_cache.version
+        tasks = (
+            open_tasks_query(db)
+            .options(joinedload(Task.steps))
+            .order_by(Task.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        body = TASK_LIST_ADAPTER.dump_json(TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True))
+        task_feed_cache.set(cache_key, version, body)
+    return body
+
+
+def invalidate_task_feed() -> None:
+    """
+    Call after committing a change that affects many open tasks at once. Streaming
+    clients are told to reload the feed instead of receiving one event per task. Only
+    reaches this process; pair it with :func:`bump_task_feed_version` for the others.
+    """
+    task_feed_cache.invalidate()
+    task_feed_broker.publish("feed.reset", "{}")
+
+
+def bump_task_feed_version(db: Session) -> None:
+    """
+    Record a change to many open tasks in the same transaction as the change, so every
+    API process resets its feed on its next poll, whichever process made the change.
+    """
+    statement = dialect_insert(db, TaskFeedState).values(id=TASK_FEED_STATE_ID, version=1)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[TaskFeedState.id],
+            set_={"version": TaskFeedState.version + 1},
+        )
+    )
+
+
+def poll_task_feed_version(db: Session, last_seen: Optional[int]) -> int:
+    """
+    Reset this process's feed when the shared version moved since ``last_seen``; returns
+    the current version for the next poll.
+    """
+    version = db.execute(select(TaskFeedState.version).where(TaskFeedState.id == TASK_FEED_STATE_ID)).scalar() or 0
+    if last_seen is not None and version != last_seen:
+        invalidate_task_feed()
+    return version
+
+
+async def run_task_feed_watcher(session_factory, interval_seconds: float) -> None:
+    """Run :func:`poll_task_feed_version` every ``interval_seconds`` until cancelled."""
+    last_seen = None
+
+    def poll_once(seen: Optional[int]) -> int:
+        db = session_factory()
+        try:
+            return poll_task_feed_version(db, seen)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            last_seen = await run_in_threadpool(poll_once, last_seen)
+        except Exception:
+            logger.exception("Task feed version poll failed")
+        await asyncio.sleep(interval_seconds)
+
+
+def publish_task_change(task: Task, created: bool = False) -> None:
+    """
+    Call after committing a change to one task. Streaming clients receive the task when it
+    is open, or its id in a ``task.removed`` event when it left the feed.
+    """
+    task_feed_cache.invalidate()
+    if not task_feed_broker.subscriber_count:
+        return
+    if is_open_task(task):
+        event = "task.created" if created else "task.updated"
+        task_feed_broker.publish(event, TaskSchema.model_validate(task).model_dump_json())
+    else:
+        publish_task_removed(task.id)
+
+
+def publish_task_removed(task_id: int) -> None:
+    task_feed_cache.invalidate()
+    task_feed_broker.publish("task.removed", json.dumps({"id": task_id}))
+
+
+async def stream_task_feed(
+    subscriber: TaskFeedSubscriber,
+    snapshot: bytes,
+    is_disconnected,
+    heartbeat_seconds: float = STREAM_HEARTBEAT_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one client: the open-task snapshot first, then deltas as they
+    are published, with a comment line as heartbeat while idle.
+    """
+    try:
+        yield format_event("snapshot", snapshot.decode())
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+            yield message
+            if subscriber.lagging:
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.lagging = False
+                yield format_event("feed.reset", "{}")
+    finally:
+        task_feed_broker.unsubscribe(subscriber)
@@ -0,0 +1,149 @@
+import csv
+import json
+from typing import Iterable, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.business import Business
+from app.models.task import Task, TaskStep, TaskStatus, StepStatus, task_search_text
+from app.schemas.task import TaskCreate, TaskImportFormat
+from app.utils.geo import geo_cell
+from app.utils.task_feed import bump_task_feed_version, invalidate_task_feed
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+def _ndjson_records(lines: Iterable[str]) -> Iterator[tuple[int, object]]:
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+
+
+def _csv_records(lines: Iterable[str]) -> Iterator[tuple[int, object]]:
+    """CSV rows use the ``TaskCreate`` field names; ``steps`` holds a JSON array."""
+    for line_number, row in enumerate(csv.DictReader(lines), start=2):
+        record = {key: value for key, value in row.items() if key and value not in (None, "")}
+        try:
+            record["steps"] = json.loads(record.get("steps") or "[]")
+        except ValueError as exc:
+            yield line_number, exc
+            continue
+        yield line_number, record
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'record'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def _insert_tasks(db: Session, items: list[tuple[int, TaskCreate]], created_by_admin_id: Optional[int]) -> int:
+    """Insert tasks and their steps with multi-row INSERTs; returns the number of steps."""
+    task_rows = []
+    for _, task in items:
+        row = task.model_dump(exclude={"steps"})
+        row.update(
+            status=TaskStatus.issued,
+            created_by_admin_id=created_by_admin_id,
+            geo_cell=geo_cell(task.lat, task.lng),
+            search_text=task_search_text(task.title, task.description),
+        )
+        task_rows.append(row)
+    task_ids = db.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), task_rows).all()
+
+    step_rows = [
+        {**step.model_dump(), "task_id": task_id, "status": StepStatus.pending}
+        for task_id, (_, task) in zip(task_ids, items)
+        for step in task.steps
+    ]
+    if step_rows:
+        db.execute(insert(TaskStep), step_rows)
+    return len(step_rows)
+
+
+def _import_batch(db: Session, batch: list[tuple[int, TaskCreate]], created_by_admin_id: Optional[int], summary: dict) -> None:
+    business_ids = {task.business_id for _, task in batch}
+    known = {business_id for (business_id,) in db.query(Business.id).filter(Business.id.in_(business_ids))}
+    valid = []
+    for line_number, task in batch:
+        if task.business_id in known:
+            valid.append((line_number, task))
+        else:
+            _report_error(summary, line_number, f"business_id: Business {task.business_id} does not exist")
+    if not valid:
+        return
+
+    try:
+        summary["steps"] += _insert_tasks(db, valid, created_by_admin_id)
+        bump_task_feed_version(db)
+        db.commit()
+        summary["imported"] += len(valid)
+        return
+    except SQLAlchemyError:
+        db.rollback()
+
+    # Something in the batch was rejected by the database; retry row by row so only the
+    # offending records fail.
+    for line_number, task in valid:
+        try:
+            with db.begin_nested():
+                steps = _insert_tasks(db, [(line_number, task)], created_by_admin_id)
+        except SQLAlchemyError as exc:
+            _report_error(summary, line_number, str(getattr(exc, "orig", None) or exc).splitlines()[0])
+            continue
+        summary["imported"] += 1
+        summary["steps"] += steps
+    bump_task_feed_version(db)
+    db.commit()
+
+
+def _report_error(summary: dict, line_number: int, detail: str) -> None:
+    summary["failed"] += 1
+    if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+        summary["errors"].append({"line": line_number, "detail": detail})
+
+
+def import_tasks(
+    db: Session,
+    lines: Iterable[str],
+    file_format: TaskImportFormat,
+    created_by_admin_id: Optional[int] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> dict:
+    """
+    Import tasks with nested steps from NDJSON or CSV. Every record is validated with
+    ``TaskCreate``; valid records are written ``batch_size`` at a time with one multi-row
+    INSERT for the tasks and one for their steps, and committed per batch. Invalid
+    records are reported by line number and do not stop the import.
+    """
+    records = _csv_records(lines) if file_format == TaskImportFormat.csv else _ndjson_records(lines)
+    summary = {"lines": 0, "imported": 0, "steps": 0, "failed": 0, "errors": []}
+    batch: list[tuple[int, TaskCreate]] = []
+
+    for line_number, record in records:
+        summary["lines"] += 1
+        if isinstance(record, Exception):
+            _report_error(summary, line_number, f"Malformed record: {record}")
+            continue
+        try:
+            batch.append((line_number, TaskCreate.model_validate(record)))
+        except ValidationError as exc:
+            _report_error(summary, line_number, _format_validation_error(exc))
+            continue
+        if len(batch) >= batch_size:
+            _import_batch(db, batch, created_by_admin_id, summary)
+            batch = []
+    if batch:
+        _import_batch(db, batch, created_by_admin_id, summary)
+
+    if summary["imported"]:
+        invalidate_task_feed()
+    return summary
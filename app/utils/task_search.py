@@ -0,0 +1,72 @@
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, column, func, literal_column, select, table, true
+from sqlalchemy.orm import Query, Session
+
+from app.models.task import Task
+from app.utils.helpers import normalize_search_text
+
+MAX_SEARCH_TERMS = 8
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# SQLite FTS5 table kept in sync with ``tasks`` by triggers (see app/models/task.py).
+task_search_table = table("task_search", column("rowid"))
+
+
+def search_terms(search: str) -> List[str]:
+    """
+    Word tokens of a search string, normalized the same way as ``Task.search_text``;
+    operators and punctuation are dropped.
+    """
+    return _TERM_PATTERN.findall(normalize_search_text(search))[:MAX_SEARCH_TERMS]
+
+
+def apply_task_search(db: Session, query: Query, search: str) -> Tuple[Query, Optional[object]]:
+    """
+    Restrict a task query to tasks matching every search term, each as a prefix so
+    results update while the admin is typing. Uses the full-text index of the current
+    database and returns the query together with an ``ORDER BY`` clause ranking the
+    best matches first (``None`` when there is nothing to rank).
+    """
+    terms = search_terms(search)
+    if not terms:
+        return query, None
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        search_vector = literal_column("tasks.search_vector")
+        matches = (
+            select(Task.id.label("task_id"), func.ts_rank_cd(search_vector, ts_query).label("rank"))
+            .where(search_vector.op("@@")(ts_query))
+            .subquery()
+        )
+        return query.join(matches, matches.c.task_id == Task.id), matches.c.rank.desc()
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        matches = (
+            select(
+                task_search_table.c.rowid.label("task_id"),
+                func.bm25(literal_column("task_search"), 10.0, 1.0).label("rank"),
+            )
+            .select_from(task_search_table)
+            .where(literal_column("task_search").op("MATCH")(match))
+            .subquery()
+        )
+        return query.join(matches, matches.c.task_id == Task.id), matches.c.rank.asc()
+
+    return query.filter(search_text_filter(Task.search_text, search)), None
+
+
+def search_text_filter(column, search: str):
+    """
+    Unindexed match of every search term anywhere in a normalized search column; used
+    where no full-text index exists, such as the task archive.
+    """
+    terms = search_terms(search)
+    if not terms:
+        return true()
+    return and_(*(column.contains(term, autoescape=True) for term in terms))
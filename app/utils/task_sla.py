@@ -0,0 +1,180 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, exists, func, literal, literal_column, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import dialect_insert
+from app.models.task import SlaBreachKind, Task, TaskSlaBreach, TaskStatus
+from app.utils.task_feed import bump_task_feed_version, invalidate_task_feed
+
+logger = logging.getLogger(__name__)
+
+SWEEP_BATCH_SIZE = 500
+
+
+def task_due_at(db: Session, accepted_at: datetime):
+    """
+    SQL expression for ``accepted_at + estimated_time`` minutes, evaluated in the same
+    statement that accepts the task. Tasks without an estimate have no due time.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        due_at = func.datetime(literal(accepted_at, Task.accepted_at.type), func.printf("+%d minutes", Task.estimated_time))
+        return case((Task.estimated_time.is_not(None), due_at), else_=None)
+    return literal(accepted_at, Task.accepted_at.type) + Task.estimated_time * literal_column("interval '1 minute'")
+
+
+def _record_breaches(db: Session, kind: SlaBreachKind, rows, now: datetime, resolved: bool = False) -> None:
+    values = [
+        {
+            "task_id": task_id,
+            "kind": kind,
+            "assigned_user_id": assigned_user_id,
+            "due_at": due_at,
+            "detected_at": now,
+            "resolved_at": now if resolved else None,
+        }
+        for task_id, assigned_user_id, due_at in rows
+    ]
+    if values:
+        db.execute(dialect_insert(db, TaskSlaBreach).values(values).on_conflict_do_nothing(index_elements=["task_id", "kind"]))
+
+
+def expire_tasks(db: Session, now: datetime, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """
+    Cancel issued tasks nobody accepted within ``TASK_EXPIRE_GRACE_MINUTES`` of their
+    start. Candidates come from the partial index on open tasks' ``start_datetime``; the
+    cancel is conditional on the task still being open, so a runner accepting it at the
+    same moment either wins outright or gets a 409.
+    """
+    cutoff = now - timedelta(minutes=settings.TASK_EXPIRE_GRACE_MINUTES)
+    candidates = (
+        select(Task.id)
+        .where(
+            Task.status == TaskStatus.issued,
+            Task.assigned_user_id.is_(None),
+            Task.accepted_at.is_(None),
+            Task.start_datetime < cutoff,
+        )
+        .order_by(Task.start_datetime)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+    expired = 0
+    while True:
+        task_ids = db.scalars(candidates).all()
+        if not task_ids:
+            break
+        rows = db.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids), Task.status == TaskStatus.issued, Task.assigned_user_id.is_(None))
+            .values(status=TaskStatus.canceled)
+            .returning(Task.id, Task.assigned_user_id, Task.start_datetime)
+            .execution_options(synchronize_session=False)
+        ).all()
+        _record_breaches(db, SlaBreachKind.expired, rows, now, resolved=True)
+        if rows:
+            bump_task_feed_version(db)
+        db.commit()
+        expired += len(rows)
+    if expired:
+        invalidate_task_feed()
+    return expired
+
+
+def flag_overdue_tasks(db: Session, now: datetime, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """
+    Record a breach for in-progress tasks more than ``TASK_OVERDUE_GRACE_MINUTES`` past
+    their ``due_at``. Tasks already flagged are skipped, so each batch makes progress and
+    the unique ``(task_id, kind)`` constraint absorbs any race between instances.
+    """
+    cutoff = now - timedelta(minutes=settings.TASK_OVERDUE_GRACE_MINUTES)
+    candidates = (
+        select(Task.id, Task.assigned_user_id, Task.due_at)
+        .where(
+            Task.status == TaskStatus.in_progress,
+            Task.due_at < cutoff,
+            ~exists().where(TaskSlaBreach.task_id == Task.id, TaskSlaBreach.kind == SlaBreachKind.overdue),
+        )
+        .order_by(Task.due_at)
+        .limit(batch_size)
+        .with_for_update(of=Task, skip_locked=True)
+    )
+
+    flagged = 0
+    while True:
+        rows = db.execute(candidates).all()
+        if not rows:
+            break
+        _record_breaches(db, SlaBreachKind.overdue, rows, now)
+        db.commit()
+        flagged += len(rows)
+    return flagged
+
+
+def resolve_overdue_breaches(db: Session, now: datetime, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """Close open overdue breaches whose task is no longer in progress, in batches."""
+    still_in_progress = exists().where(Task.id == TaskSlaBreach.task_id, Task.status == TaskStatus.in_progress)
+    candidates = (
+        select(TaskSlaBreach.id)
+        .where(
+            TaskSlaBreach.kind == SlaBreachKind.overdue,
+            TaskSlaBreach.resolved_at.is_(None),
+            ~still_in_progress,
+        )
+        .order_by(TaskSlaBreach.id)
+        .limit(batch_size)
+        .with_for_update(of=TaskSlaBreach, skip_locked=True)
+    )
+
+    resolved = 0
+    while True:
+        breach_ids = db.scalars(candidates).all()
+        if not breach_ids:
+            break
+        db.execute(
+            update(TaskSlaBreach)
+            .where(TaskSlaBreach.id.in_(breach_ids))
+            .values(resolved_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        resolved += len(breach_ids)
+    return resolved
+
+
+def sweep_tasks(db: Session, now: Optional[datetime] = None, batch_size: int = SWEEP_BATCH_SIZE) -> dict:
+    """
+    One pass of the SLA sweeper: expire stale issued tasks, flag overdue in-progress
+    ones and resolve breaches of tasks that have since finished. Every batch is a short
+    transaction whose candidate rows are locked with ``SKIP LOCKED``, so several
+    instances can sweep at once without blocking each other or acting on a task twice.
+    """
+    now = now or datetime.now(timezone.utc)
+    return {
+        "expired": expire_tasks(db, now, batch_size),
+        "overdue": flag_overdue_tasks(db, now, batch_size),
+        "resolved": resolve_overdue_breaches(db, now, batch_size),
+    }
+
+
+async def run_task_sweeper(session_factory, interval_seconds: float) -> None:
+    """Run ``sweep_tasks`` every ``interval_seconds`` until cancelled."""
+    def sweep_once() -> None:
+        db = session_factory()
+        try:
+            sweep_tasks(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            await run_in_threadpool(sweep_once)
+        except Exception:
+            logger.exception("Task SLA sweep failed")
+        await asyncio.sleep(interval_seconds)
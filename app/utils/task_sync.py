@@ -0,0 +1,67 @@
+from datetime import timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.models.task import Task, TaskStep, TaskTombstone
+from app.utils.pagination import decode_cursor, encode_cursor, parse_cursor_datetime
+
+
+def record_task_removed(db: Session, task: Task, step_id: Optional[int] = None) -> None:
+    """
+    Remember that a task, or one of its steps, left its runner's task list. Call in the
+    same transaction as the delete.
+    """
+    if task.assigned_user_id is not None:
+        db.add(TaskTombstone(user_id=task.assigned_user_id, task_id=task.id, step_id=step_id))
+
+
+def task_changes(db: Session, user_id: int, since: Optional[str]) -> dict:
+    """
+    Tasks and steps of a runner that changed after the sync token ``since``, plus the
+    ids of removed tasks and steps. Without a token every task is returned. The new token
+    is the database clock read before the queries; the next sync looks back a further
+    ``TASK_SYNC_SKEW_SECONDS`` from it, so rows written by transactions that started
+    before the token but committed after it are still picked up. Clients apply changes
+    as upserts, so rows that are sent twice are harmless.
+    """
+    now = db.execute(select(func.now())).scalar()
+    sync_token = encode_cursor(now)
+
+    tasks_query = db.query(Task).options(joinedload(Task.steps)).filter(Task.assigned_user_id == user_id)
+    if not since:
+        tasks = tasks_query.order_by(Task.id).all()
+        return {"tasks": tasks, "sync_token": sync_token, "full": True}
+
+    (token_time,) = decode_cursor(since, 1)
+    token_time = parse_cursor_datetime(token_time)
+    if token_time is None:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    changed_after = token_time - timedelta(seconds=settings.TASK_SYNC_SKEW_SECONDS)
+
+    tasks = tasks_query.filter(Task.updated_at > changed_after).order_by(Task.id).all()
+    task_ids = {task.id for task in tasks}
+    steps = [
+        step
+        for step in db.query(TaskStep)
+        .join(Task, Task.id == TaskStep.task_id)
+        .filter(Task.assigned_user_id == user_id, TaskStep.updated_at > changed_after)
+        .order_by(TaskStep.id)
+        if step.task_id not in task_ids
+    ]
+    tombstones = (
+        db.query(TaskTombstone.task_id, TaskTombstone.step_id)
+        .filter(TaskTombstone.user_id == user_id, TaskTombstone.removed_at > changed_after)
+        .all()
+    )
+    return {
+        "tasks": tasks,
+        "steps": steps,
+        "removed_task_ids": sorted({task_id for task_id, step_id in tombstones if step_id is None}),
+        "removed_step_ids": sorted({step_id for _, step_id in tombstones if step_id is not None}),
+        "sync_token": sync_token,
+        "full": False,
+    }
@@ -1,43 +1,408 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import case, func, or_, update
 from sqlalchemy.orm import Session
 
-from app.models.wallet import Wallet, WalletTransaction, TransactionStatus, TransactionType
+from app.db import dialect_insert
+from app.models.wallet import (
+    RollupBucket,
+    Wallet,
+    WalletBalanceCheckpoint,
+    WalletDailyRollup,
+    WalletTransaction,
+    TransactionStatus,
+    TransactionType,
+)
+
+
+# Transactions in these statuses count towards the wallet balance. Payouts are
+# deducted as soon as they are requested so the same funds cannot be requested twice.
+BALANCE_STATUSES = frozenset({
+    TransactionStatus.requested,
+    TransactionStatus.confirmed,
+    TransactionStatus.in_progress,
+    TransactionStatus.sent_to_bank,
+    TransactionStatus.paid,
+})
+
+CREDIT_TYPES = frozenset({TransactionType.earning, TransactionType.adjustment})
+
+# Statuses a transaction never leaves. Checkpoints only cover transactions in these
+# statuses, so a later status change can never invalidate a checkpointed balance.
+SETTLED_STATUSES = frozenset({
+    TransactionStatus.confirmed,
+    TransactionStatus.paid,
+    TransactionStatus.denied,
+    TransactionStatus.canceled,
+})
+
+# Recent rows are left out of checkpoints so transactions that were assigned an id but
+# had not committed yet when the checkpoint was taken are not skipped.
+CHECKPOINT_SETTLE_DELAY = timedelta(minutes=5)
+
+# Payout workflow: action -> (statuses it can be applied to, resulting status).
+PAYOUT_TRANSITIONS = {
+    "approve": (frozenset({TransactionStatus.requested}), TransactionStatus.sent_to_bank),
+    "complete": (frozenset({TransactionStatus.sent_to_bank}), TransactionStatus.paid),
+    "deny": (frozenset({TransactionStatus.requested, TransactionStatus.sent_to_bank}), TransactionStatus.denied),
+}
+
+# Status buckets used by the daily rollups. Days are UTC calendar days.
+ROLLUP_BUCKETS = {
+    TransactionStatus.requested: RollupBucket.pending,
+    TransactionStatus.pending: RollupBucket.pending,
+    TransactionStatus.in_progress: RollupBucket.pending,
+    TransactionStatus.sent_to_bank: RollupBucket.pending,
+    TransactionStatus.confirmed: RollupBucket.settled,
+    TransactionStatus.paid: RollupBucket.settled,
+    TransactionStatus.canceled: RollupBucket.void,
+    TransactionStatus.denied: RollupBucket.void,
+}
+
+RollupKey = tuple[int, date, TransactionType, RollupBucket]
+
+
+def balance_effect(transaction_type: TransactionType, status: TransactionStatus, amount: float | None) -> float:
+    """Signed amount a transaction contributes to its wallet balance."""
+    if status not in BALANCE_STATUSES or not amount:
+        return 0.0
+    if transaction_type in CREDIT_TYPES:
+        return amount
+    if transaction_type == TransactionType.payout:
+        return -amount
+    return 0.0
 
 
-def refresh_wallet_balance(db: Session, wallet: Wallet, commit: bool = True) -> Wallet:
+def apply_balance_delta(db: Session, wallet_id: int, delta: float) -> None:
     """
-    Recalculate a wallet's balance using confirmed transactions. Earnings and adjustments
-    increase the balance, while payouts decrease it. This keeps the balance tied to
-    relational transaction data so changes can be reversed by updating transactions.
+    Atomically shift a wallet balance by ``delta`` in the database. The update is a
+    single ``balance = balance + delta`` statement so concurrent writers never lose
+    each other's changes.
     """
+    if not delta:
+        return
+    db.execute(
+        update(Wallet)
+        .where(Wallet.id == wallet_id)
+        .values(balance=func.coalesce(Wallet.balance, 0.0) + delta)
+    )
 
-    confirmed_like_statuses = {
-        TransactionStatus.requested,
-        TransactionStatus.confirmed,
-        TransactionStatus.in_progress,
-        TransactionStatus.sent_to_bank,
-        TransactionStatus.paid,
-    }
 
-    transactions = (
-        db.query(WalletTransaction)
-        .filter(
-            WalletTransaction.wallet_id == wallet.id,
-            WalletTransaction.status.in_(confirmed_like_statuses),
+def rollup_day(created_at: datetime) -> date:
+    """UTC calendar day a transaction is rolled up under; naive datetimes are taken as UTC."""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+def rollup_key(transaction: WalletTransaction, status: TransactionStatus | None = None) -> RollupKey:
+    return (
+        transaction.wallet_id,
+        rollup_day(transaction.created_at),
+        transaction.type,
+        ROLLUP_BUCKETS[status or transaction.status],
+    )
+
+
+def apply_rollup_deltas(db: Session, deltas: dict[RollupKey, tuple[float, int]]) -> None:
+    """
+    Add ``(amount, count)`` deltas to the daily rollups with a single multi-row
+    ``INSERT ... ON CONFLICT DO UPDATE``, so concurrent writers add to the same row
+    without reading it first.
+    """
+    rows = [
+        {
+            "wallet_id": wallet_id,
+            "day": day,
+            "type": transaction_type,
+            "bucket": bucket,
+            "amount": amount,
+            "transaction_count": count,
+        }
+        for (wallet_id, day, transaction_type, bucket), (amount, count) in sorted(
+            deltas.items(), key=lambda item: (item[0][0], item[0][1], item[0][2].value, item[0][3].value)
+        )
+        if amount or count
+    ]
+    if not rows:
+        return
+    statement = dialect_insert(db, WalletDailyRollup).values(rows)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[
+                WalletDailyRollup.wallet_id,
+                WalletDailyRollup.day,
+                WalletDailyRollup.type,
+                WalletDailyRollup.bucket,
+            ],
+            set_={
+                "amount": WalletDailyRollup.amount + statement.excluded.amount,
+                "transaction_count": WalletDailyRollup.transaction_count + statement.excluded.transaction_count,
+            },
         )
-        .all()
     )
 
-    balance = 0.0
-    for transaction in transactions:
-        if transaction.type in {TransactionType.earning, TransactionType.adjustment}:
-            balance += transaction.amount
-        elif transaction.type == TransactionType.payout:
-            balance -= transaction.amount
 
-    wallet.balance = balance
+def _add_rollup_move(deltas: dict, transaction: WalletTransaction, status: TransactionStatus) -> None:
+    old_key = rollup_key(transaction)
+    new_key = rollup_key(transaction, status)
+    if old_key == new_key:
+        return
+    amount = transaction.amount or 0.0
+    old_amount, old_count = deltas.get(old_key, (0.0, 0))
+    deltas[old_key] = (old_amount - amount, old_count - 1)
+    new_amount, new_count = deltas.get(new_key, (0.0, 0))
+    deltas[new_key] = (new_amount + amount, new_count + 1)
 
-    if commit:
-        db.commit()
-        db.refresh(wallet)
 
+def get_or_create_wallet(db: Session, user_id: int) -> Wallet:
+    """
+    Return the user's wallet, creating it with ``INSERT ... ON CONFLICT DO NOTHING`` if
+    needed so concurrent callers never race on the unique ``user_id``. Does not commit.
+    """
+    wallet = db.query(Wallet).filter(Wallet.user_id == user_id).first()
+    if wallet is None:
+        db.execute(
+            dialect_insert(db, Wallet)
+            .values(user_id=user_id, balance=0.0)
+            .on_conflict_do_nothing(index_elements=[Wallet.user_id])
+        )
+        wallet = db.query(Wallet).filter(Wallet.user_id == user_id).one()
     return wallet
+
+
+def reserve_payout(db: Session, wallet_id: int, amount: float, description: str | None = None) -> WalletTransaction | None:
+    """
+    Deduct ``amount`` from a wallet only if the balance covers it and record the payout
+    request. The check and the deduction are one conditional ``UPDATE``, so concurrent
+    requests on the same wallet queue on its row lock and can never overdraw it, while
+    requests on different wallets never contend. Returns ``None`` when funds are short.
+    """
+    result = db.execute(
+        update(Wallet)
+        .where(Wallet.id == wallet_id, Wallet.balance >= amount)
+        .values(balance=Wallet.balance - amount)
+    )
+    if result.rowcount != 1:
+        return None
+
+    transaction = WalletTransaction(
+        wallet_id=wallet_id,
+        type=TransactionType.payout,
+        amount=amount,
+        status=TransactionStatus.requested,
+        description=description,
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(transaction)
+    db.flush()
+    apply_rollup_deltas(db, {rollup_key(transaction): (amount, 1)})
+    return transaction
+
+
+def get_or_create_wallets(db: Session, user_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Batch form of :func:`get_or_create_wallet`: make sure every user has a wallet with one
+    ``INSERT ... ON CONFLICT DO NOTHING`` and return a ``user_id -> wallet_id`` map.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return {}
+    db.execute(
+        dialect_insert(db, Wallet)
+        .values([{"user_id": user_id, "balance": 0.0} for user_id in user_ids])
+        .on_conflict_do_nothing(index_elements=[Wallet.user_id])
+    )
+    return dict(db.query(Wallet.user_id, Wallet.id).filter(Wallet.user_id.in_(user_ids)).all())
+
+
+def record_transactions(db: Session, transactions: list[WalletTransaction]) -> list[WalletTransaction]:
+    """
+    Insert wallet transactions in one batched flush, then apply their effects with one
+    balance update per wallet and one rollup upsert.
+    """
+    now = datetime.now(timezone.utc)
+    deltas: dict[int, float] = defaultdict(float)
+    rollup_deltas: dict[RollupKey, tuple[float, int]] = {}
+    for transaction in transactions:
+        if transaction.created_at is None:
+            transaction.created_at = now
+        deltas[transaction.wallet_id] += balance_effect(transaction.type, transaction.status, transaction.amount)
+        key = rollup_key(transaction)
+        amount, count = rollup_deltas.get(key, (0.0, 0))
+        rollup_deltas[key] = (amount + (transaction.amount or 0.0), count + 1)
+    db.add_all(transactions)
+    db.flush()
+    apply_balance_deltas(db, deltas)
+    apply_rollup_deltas(db, rollup_deltas)
+    return transactions
+
+
+def record_transaction(db: Session, transaction: WalletTransaction) -> WalletTransaction:
+    """Insert a wallet transaction and apply its effect to the stored balance and rollups."""
+    record_transactions(db, [transaction])
+    return transaction
+
+
+def set_transaction_status(db: Session, transaction: WalletTransaction, status: TransactionStatus) -> WalletTransaction:
+    """
+    Move a transaction locked with ``FOR UPDATE`` to a new status and apply the resulting
+    balance and rollup changes. The change is computed from the status read under the
+    lock, so concurrent transitions of the same row cannot apply it twice.
+    """
+    previous_effect = balance_effect(transaction.type, transaction.status, transaction.amount)
+    rollup_deltas: dict[RollupKey, tuple[float, int]] = {}
+    _add_rollup_move(rollup_deltas, transaction, status)
+    transaction.status = status
+    db.flush()
+    apply_balance_delta(
+        db,
+        transaction.wallet_id,
+        balance_effect(transaction.type, status, transaction.amount) - previous_effect,
+    )
+    apply_rollup_deltas(db, rollup_deltas)
+    return transaction
+
+
+def apply_balance_deltas(db: Session, deltas: dict[int, float]) -> None:
+    """Apply accumulated per-wallet deltas with one update per affected wallet."""
+    for wallet_id, delta in sorted(deltas.items()):
+        apply_balance_delta(db, wallet_id, delta)
+
+
+def transition_payouts(db: Session, transactions: Iterable[WalletTransaction], status: TransactionStatus) -> dict[int, float]:
+    """
+    Move already-locked payout transactions to ``status`` and update each affected
+    wallet and rollup row once. Returns the balance delta applied per wallet.
+    """
+    deltas: dict[int, float] = defaultdict(float)
+    rollup_deltas: dict[RollupKey, tuple[float, int]] = {}
+    for transaction in transactions:
+        _add_rollup_move(rollup_deltas, transaction, status)
+        deltas[transaction.wallet_id] += (
+            balance_effect(transaction.type, status, transaction.amount)
+            - balance_effect(transaction.type, transaction.status, transaction.amount)
+        )
+        transaction.status = status
+    db.flush()
+    apply_balance_deltas(db, deltas)
+    apply_rollup_deltas(db, rollup_deltas)
+    return deltas
+
+
+def signed_amount_expression():
+    """SQL expression mirroring :func:`balance_effect` for a single transaction row."""
+    return case(
+        (WalletTransaction.type.in_(CREDIT_TYPES), WalletTransaction.amount),
+        (WalletTransaction.type == TransactionType.payout, -WalletTransaction.amount),
+        else_=0.0,
+    )
+
+
+def latest_checkpoint(db: Session, wallet_id: int) -> WalletBalanceCheckpoint | None:
+    return (
+        db.query(WalletBalanceCheckpoint)
+        .filter(WalletBalanceCheckpoint.wallet_id == wallet_id)
+        .order_by(WalletBalanceCheckpoint.last_transaction_id.desc())
+        .first()
+    )
+
+
+def compute_wallet_balance(db: Session, wallet_id: int, use_checkpoint: bool = True) -> float:
+    """
+    Sum a wallet's transaction ledger in the database. By default the sum starts from
+    the latest checkpoint so only transactions newer than it are scanned; pass
+    ``use_checkpoint=False`` to audit the whole history.
+    """
+    checkpoint = latest_checkpoint(db, wallet_id) if use_checkpoint else None
+
+    query = db.query(func.coalesce(func.sum(signed_amount_expression()), 0.0)).filter(
+        WalletTransaction.wallet_id == wallet_id,
+        WalletTransaction.status.in_(BALANCE_STATUSES),
+    )
+    if checkpoint is not None:
+        query = query.filter(WalletTransaction.id > checkpoint.last_transaction_id)
+
+    balance = float(query.scalar() or 0.0)
+    if checkpoint is not None:
+        balance += checkpoint.balance
+    return balance
+
+
+def create_wallet_checkpoint(db: Session, wallet_id: int, now: datetime | None = None) -> WalletBalanceCheckpoint | None:
+    """
+    Record a checkpoint extending the previous one over the longest run of settled
+    transactions that follows it. Returns ``None`` when there is nothing new to cover.
+    """
+    now = now or datetime.now(timezone.utc)
+    previous = latest_checkpoint(db, wallet_id)
+    after_id = previous.last_transaction_id if previous else 0
+
+    tail = db.query(WalletTransaction).filter(
+        WalletTransaction.wallet_id == wallet_id,
+        WalletTransaction.id > after_id,
+    )
+
+    first_open_id = (
+        tail.with_entities(func.min(WalletTransaction.id))
+        .filter(
+            or_(
+                WalletTransaction.status.notin_(SETTLED_STATUSES),
+                WalletTransaction.created_at > now - CHECKPOINT_SETTLE_DELAY,
+            )
+        )
+        .scalar()
+    )
+    if first_open_id is not None:
+        tail = tail.filter(WalletTransaction.id < first_open_id)
+
+    last_id, covered_count, covered_sum = tail.with_entities(
+        func.max(WalletTransaction.id),
+        func.count(WalletTransaction.id),
+        func.coalesce(
+            func.sum(
+                case(
+                    (WalletTransaction.status.in_(BALANCE_STATUSES), signed_amount_expression()),
+                    else_=0.0,
+                )
+            ),
+            0.0,
+        ),
+    ).one()
+
+    if last_id is None:
+        return None
+
+    checkpoint = WalletBalanceCheckpoint(
+        wallet_id=wallet_id,
+        balance=(previous.balance if previous else 0.0) + float(covered_sum or 0.0),
+        last_transaction_id=last_id,
+        transaction_count=(previous.transaction_count if previous else 0) + covered_count,
+    )
+    db.add(checkpoint)
+    db.flush()
+    return checkpoint
+
+
+def checkpoint_wallets(db: Session, batch_size: int = 500) -> int:
+    """Create checkpoints for every wallet, committing per batch. Returns how many were written."""
+    created = 0
+    last_wallet_id = 0
+    while True:
+        wallet_ids = [
+            wallet_id
+            for (wallet_id,) in db.query(Wallet.id)
+            .filter(Wallet.id > last_wallet_id)
+            .order_by(Wallet.id)
+            .limit(batch_size)
+            .all()
+        ]
+        if not wallet_ids:
+            return created
+        for wallet_id in wallet_ids:
+            if create_wallet_checkpoint(db, wallet_id) is not None:
+                created += 1
+        db.commit()
+        last_wallet_id = wallet_ids[-1]
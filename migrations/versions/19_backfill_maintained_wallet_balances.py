@@ -0,0 +1,62 @@
+"""Backfill wallet balances from the ledger and make the column non-nullable
+
+Revision ID: 19
+Revises: 18
+Create Date: 2024-12-02 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "19"
+down_revision: Union[str, None] = "18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Balances were previously recomputed on every read, so stored values may be stale.
+    # Rebuild them once from the ledger; from now on they are maintained incrementally.
+    op.execute(
+        """
+        UPDATE wallets
+        SET balance = COALESCE(ledger.balance, 0)
+        FROM (
+            SELECT wallets.id AS wallet_id,
+                   SUM(
+                       CASE
+                           WHEN wallet_transactions.type IN ('earning', 'adjustment') THEN wallet_transactions.amount
+                           WHEN wallet_transactions.type = 'payout' THEN -wallet_transactions.amount
+                           ELSE 0
+                       END
+                   ) AS balance
+            FROM wallets
+            LEFT JOIN wallet_transactions
+                ON wallet_transactions.wallet_id = wallets.id
+               AND wallet_transactions.status IN ('requested', 'confirmed', 'in_progress', 'sent_to_bank', 'paid')
+            GROUP BY wallets.id
+        ) AS ledger
+        WHERE wallets.id = ledger.wallet_id
+        """
+    )
+
+    op.alter_column(
+        "wallets",
+        "balance",
+        existing_type=sa.Float(),
+        server_default=sa.text("0"),
+        nullable=False,
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "wallets",
+        "balance",
+        existing_type=sa.Float(),
+        server_default=None,
+        nullable=True,
+    )
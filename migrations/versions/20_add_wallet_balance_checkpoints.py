@@ -0,0 +1,51 @@
+"""Add wallet balance checkpoints
+
+Revision ID: 20
+Revises: 19
+Create Date: 2024-12-05 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20"
+down_revision: Union[str, None] = "19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "wallet_balance_checkpoints",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("wallet_id", sa.Integer(), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=False),
+        sa.Column("last_transaction_id", sa.Integer(), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallets.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_wallet_balance_checkpoints_id"), "wallet_balance_checkpoints", ["id"], unique=False)
+    op.create_index(
+        "ix_wallet_balance_checkpoints_wallet_id_last_transaction_id",
+        "wallet_balance_checkpoints",
+        ["wallet_id", "last_transaction_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_wallet_transactions_wallet_id_id",
+        "wallet_transactions",
+        ["wallet_id", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_wallet_transactions_wallet_id_id", table_name="wallet_transactions")
+    op.drop_index("ix_wallet_balance_checkpoints_wallet_id_last_transaction_id", table_name="wallet_balance_checkpoints")
+    op.drop_index(op.f("ix_wallet_balance_checkpoints_id"), table_name="wallet_balance_checkpoints")
+    op.drop_table("wallet_balance_checkpoints")
@@ -0,0 +1,29 @@
+"""Add composite index for keyset pagination of wallet transaction history
+
+Revision ID: 21
+Revises: 20
+Create Date: 2024-12-09 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "21"
+down_revision: Union[str, None] = "20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_wallet_transactions_wallet_id_created_at_id",
+        "wallet_transactions",
+        ["wallet_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_wallet_transactions_wallet_id_created_at_id", table_name="wallet_transactions")
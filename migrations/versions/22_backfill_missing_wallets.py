@@ -0,0 +1,35 @@
+"""Create a wallet for every user that does not have one
+
+Revision ID: 22
+Revises: 21
+Create Date: 2024-12-12 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "22"
+down_revision: Union[str, None] = "21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Wallets are now created together with their users, so wallet reads can stay
+    # read-only. Give existing users without a wallet one up front.
+    op.execute(
+        """
+        INSERT INTO wallets (user_id, balance)
+        SELECT users.id, 0
+        FROM users
+        WHERE NOT EXISTS (SELECT 1 FROM wallets WHERE wallets.user_id = users.id)
+        ON CONFLICT (user_id) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    # Wallets created here are indistinguishable from regular ones; nothing to undo.
+    pass
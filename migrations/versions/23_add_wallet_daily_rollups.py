@@ -0,0 +1,78 @@
+"""Add wallet daily rollups
+
+Revision ID: 23
+Revises: 22
+Create Date: 2024-12-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "23"
+down_revision: Union[str, None] = "22"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    rollup_bucket = postgresql.ENUM("pending", "settled", "void", name="rollupbucket")
+    rollup_bucket.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        "wallet_daily_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("wallet_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "type",
+            postgresql.ENUM("earning", "payout", "adjustment", name="transactiontype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "bucket",
+            postgresql.ENUM("pending", "settled", "void", name="rollupbucket", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("amount", sa.Float(), server_default="0", nullable=False),
+        sa.Column("transaction_count", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallets.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("wallet_id", "day", "type", "bucket", name="uq_wallet_daily_rollups_wallet_day_type_bucket"),
+    )
+    op.create_index(op.f("ix_wallet_daily_rollups_id"), "wallet_daily_rollups", ["id"], unique=False)
+    op.create_index("ix_wallet_daily_rollups_day", "wallet_daily_rollups", ["day"], unique=False)
+
+    # Seed the rollups from the existing ledger; from here on they are kept up to date
+    # by the wallet write paths. Days are UTC calendar days.
+    op.execute(
+        """
+        INSERT INTO wallet_daily_rollups (wallet_id, day, type, bucket, amount, transaction_count)
+        SELECT
+            wallet_id,
+            CAST(created_at AT TIME ZONE 'UTC' AS DATE),
+            type,
+            CAST(
+                CASE
+                    WHEN status IN ('confirmed', 'paid') THEN 'settled'
+                    WHEN status IN ('canceled', 'denied') THEN 'void'
+                    ELSE 'pending'
+                END AS rollupbucket
+            ),
+            COALESCE(SUM(amount), 0),
+            COUNT(*)
+        FROM wallet_transactions
+        WHERE wallet_id IS NOT NULL AND type IS NOT NULL AND status IS NOT NULL AND created_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_wallet_daily_rollups_day", table_name="wallet_daily_rollups")
+    op.drop_index(op.f("ix_wallet_daily_rollups_id"), table_name="wallet_daily_rollups")
+    op.drop_table("wallet_daily_rollups")
+    postgresql.ENUM(name="rollupbucket").drop(op.get_bind(), checkfirst=True)
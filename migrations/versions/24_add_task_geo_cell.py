@@ -0,0 +1,41 @@
+"""Add task geo grid cell for nearby searches
+
+Revision ID: 24
+Revises: 23
+Create Date: 2024-12-19 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "24"
+down_revision: Union[str, None] = "23"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match app.utils.geo.
+GEO_CELL_DEGREES = 0.05
+GEO_CELL_ROWS = 3600
+GEO_CELL_COLUMNS = 7200
+
+
+def upgrade() -> None:
+    op.add_column("tasks", sa.Column("geo_cell", sa.Integer(), nullable=True))
+    op.execute(
+        f"""
+        UPDATE tasks
+        SET geo_cell =
+            LEAST(GREATEST(CAST(FLOOR((lat + 90) / {GEO_CELL_DEGREES}) AS INTEGER), 0), {GEO_CELL_ROWS - 1}) * {GEO_CELL_COLUMNS}
+            + LEAST(GREATEST(CAST(FLOOR((lng + 180) / {GEO_CELL_DEGREES}) AS INTEGER), 0), {GEO_CELL_COLUMNS - 1})
+        WHERE lat IS NOT NULL AND lng IS NOT NULL
+        """
+    )
+    op.create_index("ix_tasks_status_geo_cell", "tasks", ["status", "geo_cell"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_status_geo_cell", table_name="tasks")
+    op.drop_column("tasks", "geo_cell")
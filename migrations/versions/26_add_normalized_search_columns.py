@@ -0,0 +1,109 @@
+"""Add normalized search columns for tasks and users
+
+Revision ID: 26
+Revises: 25
+Create Date: 2024-12-24 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "26"
+down_revision: Union[str, None] = "25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+# Mirrors DIGIT_FOLDS, LETTER_FOLDS and REMOVED_CHARACTERS in app/utils/helpers.py.
+# translate() deletes the characters of FOLD_FROM that have no counterpart in FOLD_TO.
+DIGITS_FROM = "".join(chr(0x06F0 + digit) for digit in range(10)) + "".join(chr(0x0660 + digit) for digit in range(10))
+DIGITS_TO = "0123456789" * 2
+FOLD_FROM = (
+    DIGITS_FROM
+    + "يىئكةۀأإٱؤ"
+    + "\u200c\u200d\u200e\u200f\u0640"
+    + "".join(chr(code) for code in range(0x064B, 0x0660))
+    + "\u0670"
+)
+FOLD_TO = DIGITS_TO + "ییی" + "ک" + "هه" + "ااا" + "و"
+
+
+def _normalize(expression: str) -> str:
+    return f"btrim(regexp_replace(lower(translate({expression}, :fold_from, :fold_to)), '\\s+', ' ', 'g'))"
+
+
+def _backfill(connection, table: str, assignments: str) -> None:
+    # One set-based UPDATE per id range; run inside autocommit_block() so each range
+    # commits on its own and its row locks are released right away.
+    max_id = connection.execute(sa.text(f"SELECT max(id) FROM {table}")).scalar() or 0
+    for start in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+        connection.execute(
+            sa.text(f"UPDATE {table} SET {assignments} WHERE id >= :start AND id < :stop"),
+            {
+                "start": start,
+                "stop": start + BACKFILL_BATCH_SIZE,
+                "fold_from": FOLD_FROM,
+                "fold_to": FOLD_TO,
+                "digits_from": DIGITS_FROM,
+                "digits_to": DIGITS_TO,
+            },
+        )
+
+
+def upgrade() -> None:
+    op.add_column("tasks", sa.Column("search_text", sa.String(), nullable=True))
+    op.add_column("users", sa.Column("search_name", sa.String(), nullable=True))
+
+    title = _normalize("coalesce(title, '')")
+    description = _normalize("coalesce(description, '')")
+    full_name = _normalize("coalesce(first_name, '') || ' ' || coalesce(last_name, '')")
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        _backfill(connection, "tasks", f"search_text = {title} || E'\\n' || {description}")
+        _backfill(
+            connection,
+            "users",
+            f"search_name = {full_name}, "
+            "phone_number = translate(phone_number, :digits_from, :digits_to), "
+            "national_id = translate(national_id, :digits_from, :digits_to), "
+            "shaba_number = translate(shaba_number, :digits_from, :digits_to)",
+        )
+
+    # Rebuild the search vector over the normalized text so that queries, which are
+    # normalized the same way, match regardless of the variant that was typed.
+    op.execute("DROP INDEX IF EXISTS ix_tasks_search_vector")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
+    op.execute(
+        """
+        ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', split_part(coalesce(search_text, ''), E'\\n', 1)), 'A')
+            || setweight(to_tsvector('simple', split_part(coalesce(search_text, ''), E'\\n', 2)), 'B')
+        ) STORED
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_search_name ON users (search_name text_pattern_ops)"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_users_search_name")
+    op.execute("DROP INDEX IF EXISTS ix_tasks_search_vector")
+    op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
+    op.execute(
+        """
+        ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)")
+    op.drop_column("users", "search_name")
+    op.drop_column("tasks", "search_text")
@@ -0,0 +1,42 @@
+"""Add composite and partial indexes for task queries
+
+Revision ID: 27
+Revises: 26
+Create Date: 2024-12-25 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "27"
+down_revision: Union[str, None] = "26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    # GET /tasks/ pages open tasks by id; the partial index only holds the open ones.
+    "ix_tasks_open_id": "ON tasks (id) WHERE status = 'issued' AND assigned_user_id IS NULL AND accepted_at IS NULL",
+    # GET /tasks/me and /tasks/me/ongoing.
+    "ix_tasks_assigned_user_id_status": "ON tasks (assigned_user_id, status)",
+    # GET /admin/tasks sorts by created_at by default, optionally after an equality filter.
+    "ix_tasks_created_at": "ON tasks (created_at)",
+    "ix_tasks_status_created_at": "ON tasks (status, created_at)",
+    "ix_tasks_business_id_created_at": "ON tasks (business_id, created_at)",
+    "ix_tasks_task_kind_id_created_at": "ON tasks (task_kind_id, created_at)",
+    "ix_tasks_start_datetime": "ON tasks (start_datetime)",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+        op.execute("ANALYZE tasks")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,73 @@
+"""Add task change feed: reliable updated_at and tombstones
+
+Revision ID: 28
+Revises: 27
+Create Date: 2024-12-26 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "28"
+down_revision: Union[str, None] = "27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def _backfill_updated_at(connection, table: str) -> None:
+    # Called inside autocommit_block(), so each id range commits on its own.
+    max_id = connection.execute(sa.text(f"SELECT max(id) FROM {table}")).scalar() or 0
+    for start in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+        connection.execute(
+            sa.text(
+                f"UPDATE {table} SET updated_at = coalesce(created_at, now()) "
+                "WHERE updated_at IS NULL AND id >= :start AND id < :stop"
+            ),
+            {"start": start, "stop": start + BACKFILL_BATCH_SIZE},
+        )
+
+
+def upgrade() -> None:
+    for table in ("tasks", "task_steps"):
+        op.alter_column(table, "updated_at", server_default=sa.text("now()"))
+        with op.get_context().autocommit_block():
+            _backfill_updated_at(op.get_bind(), table)
+        op.alter_column(table, "updated_at", nullable=False)
+
+    op.create_table(
+        "task_tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("step_id", sa.Integer(), nullable=True),
+        sa.Column("removed_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_task_tombstones_id"), "task_tombstones", ["id"], unique=False)
+    op.create_index("ix_task_tombstones_user_id_removed_at", "task_tombstones", ["user_id", "removed_at"], unique=False)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_assigned_user_id_updated_at "
+            "ON tasks (assigned_user_id, updated_at)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_steps_task_id_updated_at "
+            "ON task_steps (task_id, updated_at)"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_task_steps_task_id_updated_at")
+    op.execute("DROP INDEX IF EXISTS ix_tasks_assigned_user_id_updated_at")
+    op.drop_index("ix_task_tombstones_user_id_removed_at", table_name="task_tombstones")
+    op.drop_index(op.f("ix_task_tombstones_id"), table_name="task_tombstones")
+    op.drop_table("task_tombstones")
+    for table in ("tasks", "task_steps"):
+        op.alter_column(table, "updated_at", nullable=True, server_default=None)
@@ -0,0 +1,26 @@
+"""Add version counter to task steps
+
+Revision ID: 29
+Revises: 28
+Create Date: 2024-12-27 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "29"
+down_revision: Union[str, None] = "28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default fills existing rows without rewriting the table on PostgreSQL 11+.
+    op.add_column("task_steps", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("task_steps", "version")
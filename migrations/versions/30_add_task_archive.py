@@ -0,0 +1,74 @@
+"""Add archive tables for finished tasks
+
+Revision ID: 30
+Revises: 29
+Create Date: 2024-12-28 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "30"
+down_revision: Union[str, None] = "29"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARCHIVE_FOREIGN_KEYS = {
+    "tasks_archive": [
+        ("business_id", "businesses"),
+        ("assigned_user_id", "users"),
+        ("created_by_admin_id", "users"),
+        ("category_id", "task_categories"),
+        ("task_kind_id", "task_kinds"),
+        ("start_location_country_id", "countries"),
+        ("start_location_province_id", "provinces"),
+        ("start_location_city_id", "cities"),
+    ],
+    "task_steps_archive": [("task_id", "tasks_archive")],
+    "task_tag_link_archive": [("task_id", "tasks_archive"), ("tag_id", "task_tags")],
+}
+
+
+def upgrade() -> None:
+    # LIKE copies the live column types exactly (without defaults, so ids keep their
+    # original values); the generated search vector is not needed in the archive.
+    op.execute("CREATE TABLE tasks_archive (LIKE tasks)")
+    op.execute(
+        "ALTER TABLE tasks_archive DROP COLUMN IF EXISTS search_vector, "
+        "ADD COLUMN archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+        "ADD PRIMARY KEY (id)"
+    )
+    op.execute("CREATE TABLE task_steps_archive (LIKE task_steps)")
+    op.execute("ALTER TABLE task_steps_archive ADD PRIMARY KEY (id)")
+    op.execute("CREATE TABLE task_tag_link_archive (LIKE task_tag_link)")
+    op.execute("ALTER TABLE task_tag_link_archive ADD PRIMARY KEY (task_id, tag_id)")
+    for table, foreign_keys in ARCHIVE_FOREIGN_KEYS.items():
+        for column, target in foreign_keys:
+            op.create_foreign_key(f"{table}_{column}_fkey", table, target, [column], ["id"])
+
+    op.create_index("ix_tasks_archive_created_at", "tasks_archive", ["created_at"])
+    op.create_index("ix_tasks_archive_status_created_at", "tasks_archive", ["status", "created_at"])
+    op.create_index("ix_tasks_archive_business_id_created_at", "tasks_archive", ["business_id", "created_at"])
+    op.create_index("ix_tasks_archive_assigned_user_id_status", "tasks_archive", ["assigned_user_id", "status"])
+    op.create_index("ix_task_steps_archive_task_id", "task_steps_archive", ["task_id"])
+
+    # Wallet transactions keep pointing at tasks after they move to the archive.
+    op.execute("ALTER TABLE wallet_transactions DROP CONSTRAINT IF EXISTS wallet_transactions_related_task_id_fkey")
+
+    # The archiver looks for finished tasks by age.
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_status_updated_at ON tasks (status, updated_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tasks_status_updated_at")
+    # NOT VALID: transactions of tasks that were archived have no live task to point at.
+    op.execute(
+        "ALTER TABLE wallet_transactions ADD CONSTRAINT wallet_transactions_related_task_id_fkey "
+        "FOREIGN KEY (related_task_id) REFERENCES tasks (id) NOT VALID"
+    )
+    op.drop_table("task_tag_link_archive")
+    op.drop_table("task_steps_archive")
+    op.drop_table("tasks_archive")
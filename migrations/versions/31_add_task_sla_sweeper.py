@@ -0,0 +1,75 @@
+"""Add task due time and SLA breaches for the sweeper
+
+Revision ID: 31
+Revises: 30
+Create Date: 2024-12-29 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "31"
+down_revision: Union[str, None] = "30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+OPEN_TASK_PREDICATE = "status = 'issued' AND assigned_user_id IS NULL AND accepted_at IS NULL"
+
+sla_breach_kind = sa.Enum("expired", "overdue", name="slabreachkind")
+
+
+def upgrade() -> None:
+    op.add_column("tasks", sa.Column("due_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("tasks_archive", sa.Column("due_at", sa.DateTime(timezone=True), nullable=True))
+
+    # Each id range commits on its own, so row locks are held only for one batch.
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        max_id = connection.execute(sa.text("SELECT max(id) FROM tasks")).scalar() or 0
+        for start in range(0, max_id + 1, BACKFILL_BATCH_SIZE):
+            connection.execute(
+                sa.text(
+                    "UPDATE tasks SET due_at = accepted_at + estimated_time * interval '1 minute' "
+                    "WHERE accepted_at IS NOT NULL AND estimated_time IS NOT NULL AND id >= :start AND id < :stop"
+                ),
+                {"start": start, "stop": start + BACKFILL_BATCH_SIZE},
+            )
+
+    op.create_table(
+        "task_sla_breaches",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sla_breach_kind, nullable=False),
+        sa.Column("assigned_user_id", sa.Integer(), nullable=True),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("detected_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("resolved_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["assigned_user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("task_id", "kind", name="uq_task_sla_breaches_task_id_kind"),
+    )
+    op.create_index(op.f("ix_task_sla_breaches_id"), "task_sla_breaches", ["id"], unique=False)
+    op.create_index("ix_task_sla_breaches_detected_at", "task_sla_breaches", ["detected_at"], unique=False)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_open_start_datetime "
+            f"ON tasks (start_datetime) WHERE {OPEN_TASK_PREDICATE}"
+        )
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_status_due_at ON tasks (status, due_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tasks_status_due_at")
+    op.execute("DROP INDEX IF EXISTS ix_tasks_open_start_datetime")
+    op.drop_index("ix_task_sla_breaches_detected_at", table_name="task_sla_breaches")
+    op.drop_index(op.f("ix_task_sla_breaches_id"), table_name="task_sla_breaches")
+    op.drop_table("task_sla_breaches")
+    sla_breach_kind.drop(op.get_bind(), checkfirst=True)
+    op.drop_column("tasks_archive", "due_at")
+    op.drop_column("tasks", "due_at")
@@ -0,0 +1,31 @@
+"""Add the shared task feed version polled by API processes
+
+Revision ID: 32
+Revises: 31
+Create Date: 2024-12-30 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "32"
+down_revision: Union[str, None] = "31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_feed_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO task_feed_state (id, version) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    op.drop_table("task_feed_state")
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import SessionLocal
+import app.main  # noqa: F401  (registers every model)
+from app.core.config import settings
+from app.utils.task_archive import ARCHIVE_BATCH_SIZE, archive_tasks
+
+
+def main() -> None:
+    """
+    Moves approved, canceled and rejected tasks that have not changed for a while into the
+    archive tables. Safe to run from cron while the API is serving traffic.
+    Usage: python scripts/archive_tasks.py [--older-than-days 90] [--batch-size 1000]
+    """
+    parser = argparse.ArgumentParser(description="Archive finished tasks")
+    parser.add_argument("--older-than-days", type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        moved = archive_tasks(db, args.older_than_days, args.batch_size, args.max_batches)
+        print(f"✅ {moved} tasks archived in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
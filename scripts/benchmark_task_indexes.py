@@ -0,0 +1,159 @@
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import SessionLocal
+import app.main  # noqa: F401  (registers every model)
+from app.models.business import Business
+from app.models.task import Task, TaskStatus
+from app.models.user import User, VerificationStatus
+from app.routers.task import USER_TASK_STATUS_FILTERS
+from app.utils.task_feed import open_tasks_query
+
+BENCHMARK_PHONE_PREFIX = "+1998"
+SEED_BATCH_SIZE = 5000
+
+# Indexes added for the task query shapes below (migrations/versions/27_*).
+QUERY_INDEXES = (
+    "ix_tasks_open_id",
+    "ix_tasks_assigned_user_id_status",
+    "ix_tasks_created_at",
+    "ix_tasks_status_created_at",
+    "ix_tasks_business_id_created_at",
+    "ix_tasks_task_kind_id_created_at",
+    "ix_tasks_start_datetime",
+)
+
+
+def seed(db, task_count: int, runner_count: int) -> None:
+    """Add ``task_count`` tasks spread over ``runner_count`` runners and a year of history."""
+    phones = [f"{BENCHMARK_PHONE_PREFIX}{index:07d}" for index in range(runner_count)]
+    existing = {phone for (phone,) in db.query(User.phone_number).filter(User.phone_number.in_(phones))}
+    db.add_all(
+        User(phone_number=phone, verification_status=VerificationStatus.verified)
+        for phone in phones
+        if phone not in existing
+    )
+    businesses = [
+        Business(name=f"Benchmark {index}", contact_person="Benchmark", phone_number=BENCHMARK_PHONE_PREFIX, address="-")
+        for index in range(20)
+    ]
+    db.add_all(businesses)
+    db.flush()
+    runner_ids = [user_id for (user_id,) in db.query(User.id).filter(User.phone_number.in_(phones))]
+    business_ids = [business.id for business in businesses]
+
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    statuses = list(TaskStatus)
+    rows = []
+    for index in range(task_count):
+        status = TaskStatus.issued if rng.random() < 0.1 else rng.choice(statuses)
+        created_at = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+        assigned = status != TaskStatus.issued
+        rows.append(
+            {
+                "title": f"Benchmark task {index}",
+                "business_id": rng.choice(business_ids),
+                "assigned_user_id": rng.choice(runner_ids) if assigned else None,
+                "price": rng.randrange(10, 500),
+                "estimated_time": rng.randrange(5, 120),
+                "start_datetime": created_at + timedelta(hours=rng.randrange(1, 72)),
+                "status": status,
+                "created_at": created_at,
+                "accepted_at": created_at + timedelta(hours=1) if assigned else None,
+            }
+        )
+        if len(rows) == SEED_BATCH_SIZE:
+            db.execute(insert(Task), rows)
+            rows = []
+    if rows:
+        db.execute(insert(Task), rows)
+    db.commit()
+    db.execute(text("ANALYZE tasks"))
+
+
+def query_shapes(db) -> dict:
+    """The task queries behind the list endpoints, with representative parameters."""
+    runner_id = db.query(Task.assigned_user_id).filter(Task.assigned_user_id.isnot(None)).limit(1).scalar()
+    business_id = db.query(Task.business_id).limit(1).scalar()
+    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    return {
+        "GET /tasks/ (open feed)": open_tasks_query(db).order_by(Task.id).limit(100),
+        "GET /tasks/me?status=done": db.query(Task)
+        .filter(Task.assigned_user_id == runner_id, Task.status.in_(USER_TASK_STATUS_FILTERS["done"]))
+        .limit(100),
+        "GET /tasks/me/ongoing": db.query(Task)
+        .filter(Task.assigned_user_id == runner_id, Task.status.in_([TaskStatus.in_progress, TaskStatus.done]))
+        .limit(100),
+        "GET /admin/tasks": db.query(Task).order_by(Task.created_at.desc()).offset(1000).limit(100),
+        "GET /admin/tasks?status=done": db.query(Task)
+        .filter(Task.status.in_([TaskStatus.done]))
+        .order_by(Task.created_at.desc())
+        .limit(100),
+        "GET /admin/tasks?business_id=": db.query(Task)
+        .filter(Task.business_id == business_id)
+        .order_by(Task.created_at.desc())
+        .limit(100),
+        "GET /admin/tasks?start_from=": db.query(Task)
+        .filter(Task.start_datetime >= week_ago)
+        .order_by(Task.created_at.desc())
+        .limit(100),
+    }
+
+
+def explain(db, query) -> str:
+    sql = str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    return "\n".join(row[0] for row in db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")))
+
+
+def main() -> None:
+    """
+    Seeds a PostgreSQL database with tasks and prints EXPLAIN ANALYZE for each task list
+    query twice: with the query indexes temporarily dropped (inside a transaction that
+    is rolled back) and with them in place.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--tasks", type=int, default=200000)
+    parser.add_argument("--runners", type=int, default=2000)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse previously seeded data")
+    parser.add_argument("--output", help="Also write the plans to this file")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "postgresql":
+            print("❌ The benchmark needs PostgreSQL")
+            sys.exit(1)
+        if not args.skip_seed:
+            seed(db, args.tasks, args.runners)
+            print(f"✅ Seeded {args.tasks} tasks")
+
+        report = []
+        shapes = query_shapes(db)
+        for label, query in shapes.items():
+            db.execute(text("".join(f"DROP INDEX IF EXISTS {name};" for name in QUERY_INDEXES)))
+            before = explain(db, query)
+            db.rollback()
+            after = explain(db, query)
+            db.rollback()
+            report.append(f"=== {label}\n--- before\n{before}\n--- after\n{after}\n")
+
+        output = "\n".join(report)
+        print(output)
+        if args.output:
+            with open(args.output, "w") as handle:
+                handle.write(output)
+            print(f"✅ Plans written to {args.output}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import SessionLocal
+from app.utils.wallet import checkpoint_wallets
+
+
+def main() -> None:
+    """
+    Writes a balance checkpoint for every wallet with newly settled transactions.
+    Intended to run periodically (e.g. nightly from cron).
+    """
+    db = SessionLocal()
+    try:
+        created = checkpoint_wallets(db)
+        print(f"✅ Created {created} wallet checkpoints")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
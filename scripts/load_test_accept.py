@@ -0,0 +1,109 @@
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import SessionLocal
+import app.main  # noqa: F401  (registers every model)
+from app.models.business import Business
+from app.models.task import Task, TaskStatus
+from app.models.user import User, VerificationStatus
+from app.utils.token import create_access_token
+
+RUNNER_PHONE_PREFIX = "+1999"
+
+
+def seed(burst: int) -> tuple[int, list[str]]:
+    """Create one issued task and ``burst`` verified runners; return the task id and tokens."""
+    db = SessionLocal()
+    try:
+        phones = [f"{RUNNER_PHONE_PREFIX}{index:07d}" for index in range(burst)]
+        existing = {phone for (phone,) in db.query(User.phone_number).filter(User.phone_number.in_(phones))}
+        db.add_all(
+            User(phone_number=phone, verification_status=VerificationStatus.verified)
+            for phone in phones
+            if phone not in existing
+        )
+        business = Business(name="Load test", contact_person="Load test", phone_number=RUNNER_PHONE_PREFIX, address="-")
+        db.add(business)
+        db.flush()
+        task = Task(
+            title="Load test task",
+            business_id=business.id,
+            price=1.0,
+            estimated_time=1,
+            start_datetime=datetime.now(timezone.utc),
+            status=TaskStatus.issued,
+        )
+        db.add(task)
+        db.commit()
+        user_ids = [user_id for (user_id,) in db.query(User.id).filter(User.phone_number.in_(phones))]
+        return task.id, [create_access_token(data={"sub": str(user_id)}) for user_id in user_ids]
+    finally:
+        db.close()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> None:
+    """
+    Fires a burst of concurrent accept requests for a single fresh task against a running
+    API and reports how many runners won and the latency of the losing requests. Exactly
+    one 200 is expected; every other response should be a fast 409.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--burst", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    task_id, tokens = seed(args.burst)
+    start = threading.Barrier(min(args.concurrency, len(tokens)))
+
+    def accept(token: str) -> tuple[int, float]:
+        with httpx.Client(base_url=args.base_url, timeout=30) as client:
+            try:
+                start.wait(timeout=10)
+            except threading.BrokenBarrierError:
+                pass
+            began = time.perf_counter()
+            response = client.post(f"/tasks/{task_id}/accept", headers={"Authorization": f"Bearer {token}"})
+            return response.status_code, (time.perf_counter() - began) * 1000
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(accept, tokens))
+
+    statuses = [status for status, _ in results]
+    loser_latencies = [elapsed for status, elapsed in results if status == 409]
+    print(f"Task {task_id}: {len(results)} requests")
+    for status in sorted(set(statuses)):
+        print(f"  HTTP {status}: {statuses.count(status)}")
+    if loser_latencies:
+        print(
+            "  409 latency ms: "
+            f"median={statistics.median(loser_latencies):.1f} "
+            f"p95={percentile(loser_latencies, 0.95):.1f} "
+            f"p99={percentile(loser_latencies, 0.99):.1f} "
+            f"max={max(loser_latencies):.1f}"
+        )
+
+    if statuses.count(200) == 1 and statuses.count(409) == len(statuses) - 1:
+        print("✅ Exactly one runner accepted the task")
+    else:
+        print("❌ Expected exactly one 200 and only 409s for the rest")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
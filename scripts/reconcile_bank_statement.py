@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import SessionLocal
+from app.utils.bank import reconcile_bank_statement
+
+
+def main() -> None:
+    """
+    Settles payouts from a bank statement CSV (reference,amount,shaba_number,status).
+    Usage: python scripts/reconcile_bank_statement.py statement.csv
+    """
+    if len(sys.argv) != 2:
+        raise SystemExit("Usage: python scripts/reconcile_bank_statement.py <statement.csv>")
+
+    db = SessionLocal()
+    try:
+        with open(sys.argv[1], encoding="utf-8-sig", newline="") as statement:
+            summary = reconcile_bank_statement(db, statement)
+        print(f"✅ {summary['lines']} lines: {summary['paid']} paid, {summary['denied']} denied, {summary['unmatched_count']} unmatched")
+        for mismatch in summary["unmatched"]:
+            print(f"  line {mismatch['line']} ({mismatch['reference']}): {mismatch['reason']}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import SessionLocal
+import app.main  # noqa: F401  (registers every model)
+from app.utils.task_sla import SWEEP_BATCH_SIZE, sweep_tasks
+
+
+def main() -> None:
+    """
+    Cancels issued tasks nobody accepted in time and flags overdue in-progress tasks.
+    Safe to run from cron on several hosts at once.
+    Usage: python scripts/sweep_tasks.py [--batch-size 500]
+    """
+    parser = argparse.ArgumentParser(description="Expire stale tasks and flag overdue ones")
+    parser.add_argument("--batch-size", type=int, default=SWEEP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        counts = sweep_tasks(db, batch_size=args.batch_size)
+        print(
+            f"✅ {counts['expired']} tasks expired, {counts['overdue']} flagged overdue, "
+            f"{counts['resolved']} breaches resolved in {time.perf_counter() - started:.1f}s"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
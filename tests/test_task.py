@@ -0,0 +1,604 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db import Base, get_db
+from app.models.business import Business
+from app.models.task import SlaBreachKind, Task, TaskSlaBreach, TaskStatus, StepStatus
+from app.models.permission import Role
+from app.models.task import TaskStep
+from app.models.task_archive import ArchivedTask
+from app.models.task_meta import TaskTag
+from app.models.user import User, VerificationStatus
+from app.utils.task_archive import archive_tasks
+from app.utils.task_feed import bump_task_feed_version, invalidate_task_feed, poll_task_feed_version, stream_task_feed, task_feed_broker, task_feed_cache
+from app.utils.task_sla import sweep_tasks
+from app.utils.pagination import encode_cursor
+from app.utils.token import create_access_token
+import asyncio
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import os
+import pytest
+
+if os.path.exists("test_task.db"):
+    os.remove("test_task.db")
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_task.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(autouse=True)
+def use_task_test_db():
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+
+
+client = TestClient(app)
+
+
+def create_runner(phone_number):
+    db = TestingSessionLocal()
+    user = User(phone_number=phone_number, verification_status=VerificationStatus.verified)
+    db.add(user)
+    db.commit()
+    token = create_access_token(data={"sub": str(user.id)})
+    user_id = user.id
+    db.close()
+    return token, user_id
+
+
+def get_owner_id():
+    db = TestingSessionLocal()
+    role = db.query(Role).filter(Role.name == "owner").first()
+    if role is None:
+        role = Role(name="owner")
+        db.add(role)
+        db.commit()
+    owner = db.query(User).filter(User.phone_number == "+15550001001").first()
+    if owner is None:
+        owner = User(phone_number="+15550001001", role=role)
+        db.add(owner)
+        db.commit()
+    owner_id = owner.id
+    db.close()
+    return owner_id
+
+
+def get_owner_token():
+    return create_access_token(data={"sub": str(get_owner_id()), "role": "owner"})
+
+
+def get_business_id():
+    db = TestingSessionLocal()
+    business = db.query(Business).filter(Business.name == "Task Test Business").first()
+    if business is None:
+        business = Business(
+            name="Task Test Business",
+            contact_person="Ops",
+            phone_number="+15550001000",
+            address="1 Main St",
+            created_by_admin_id=get_owner_id(),
+        )
+        db.add(business)
+        db.commit()
+    business_id = business.id
+    db.close()
+    return business_id
+
+
+def make_task(title, **kwargs):
+    values = {
+        "business_id": get_business_id(),
+        "price": 10.0,
+        "estimated_time": 30,
+        "start_datetime": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        "status": TaskStatus.issued,
+    }
+    values.update(kwargs)
+    return Task(title=title, **values)
+
+
+def create_tasks(*tasks):
+    db = TestingSessionLocal()
+    db.add_all(tasks)
+    db.commit()
+    task_ids = [task.id for task in tasks]
+    db.close()
+    return task_ids
+
+
+def test_nearby_tasks_are_sorted_by_distance():
+    near, far, outside, taken = create_tasks(
+        make_task("Nearby near", lat=35.701, lng=51.401),
+        make_task("Nearby far", lat=35.73, lng=51.42),
+        make_task("Nearby outside", lat=36.5, lng=51.4),
+        make_task("Nearby taken", status=TaskStatus.in_progress, lat=35.7, lng=51.4),
+    )
+    # Crossing a grid cell boundary must keep the cell column in sync.
+    db = TestingSessionLocal()
+    task = db.get(Task, far)
+    task.lng = 51.45
+    db.commit()
+    db.close()
+
+    response = client.get("/tasks/nearby", params={"lat": 35.7, "lng": 51.4, "radius_km": 10})
+    assert response.status_code == 200
+    body = response.json()
+    assert [task["id"] for task in body] == [near, far]
+    assert body[0]["distance_km"] < body[1]["distance_km"] <= 10
+
+    response = client.get("/tasks/nearby", params={"lat": 35.7, "lng": 51.4, "radius_km": 1, "limit": 1})
+    assert [task["id"] for task in response.json()] == [near]
+
+    response = client.get("/tasks/nearby", params={"lat": 35.7, "lng": 51.4, "radius_km": 500})
+    assert response.status_code == 422
+
+
+def test_concurrent_accepts_have_exactly_one_winner():
+    (task_id,) = create_tasks(make_task("Contested task"))
+    tokens = [create_runner(f"+1555000110{index:02d}")[0] for index in range(20)]
+
+    def accept(token):
+        return client.post(f"/tasks/{task_id}/accept", headers={"Authorization": f"Bearer {token}"}).status_code
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        statuses = list(executor.map(accept, tokens))
+
+    assert statuses.count(200) == 1
+    assert statuses.count(409) == len(tokens) - 1
+
+    response = client.post("/tasks/999999/accept", headers={"Authorization": f"Bearer {tokens[0]}"})
+    assert response.status_code == 404
+
+
+def test_open_task_feed_is_cached_until_a_task_changes():
+    invalidate_task_feed()
+    (first,) = create_tasks(make_task("Feed first"))
+    token, _ = create_runner("+15550001200")
+
+    feed = client.get("/tasks/", params={"limit": 500}).json()
+    assert first in [task["id"] for task in feed]
+
+    # Rows written behind the API's back are not seen until the cache is invalidated.
+    (second,) = create_tasks(make_task("Feed second"))
+    assert client.get("/tasks/", params={"limit": 500}).json() == feed
+
+    response = client.post(f"/tasks/{first}/accept", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+    ids = [task["id"] for task in client.get("/tasks/", params={"limit": 500}).json()]
+    assert first not in ids
+    assert second in ids
+
+
+def test_bulk_changes_from_other_processes_reset_the_feed_on_poll():
+    db = TestingSessionLocal()
+    seen = poll_task_feed_version(db, None)
+    invalidate_task_feed()
+    (task_id,) = create_tasks(make_task("Feed bulk"))
+    assert task_id in [task["id"] for task in client.get("/tasks/", params={"limit": 500}).json()]
+
+    # What an import or sweep in another process commits: the change plus a version bump.
+    other = TestingSessionLocal()
+    other.query(Task).filter(Task.id == task_id).update({Task.status: TaskStatus.canceled})
+    bump_task_feed_version(other)
+    other.commit()
+    other.close()
+    assert task_id in [task["id"] for task in client.get("/tasks/", params={"limit": 500}).json()]
+
+    cache_version = task_feed_cache.version
+    seen = poll_task_feed_version(db, seen)
+    assert task_feed_cache.version == cache_version + 1
+    assert task_id not in [task["id"] for task in client.get("/tasks/", params={"limit": 500}).json()]
+    assert poll_task_feed_version(db, seen) == seen
+    assert task_feed_cache.version == cache_version + 1
+    db.close()
+
+
+def test_accepted_task_is_streamed_as_removed():
+    (task_id,) = create_tasks(make_task("Streamed task"))
+    token, _ = create_runner("+15550001300")
+
+    async def not_disconnected():
+        return False
+
+    async def scenario():
+        subscriber = task_feed_broker.subscribe()
+        stream = stream_task_feed(subscriber, b"[]", not_disconnected)
+        snapshot = await stream.__anext__()
+        response = await asyncio.to_thread(
+            client.post, f"/tasks/{task_id}/accept", headers={"Authorization": f"Bearer {token}"}
+        )
+        message = await asyncio.wait_for(stream.__anext__(), timeout=5)
+        await stream.aclose()
+        return snapshot, response.status_code, message
+
+    snapshot, status_code, message = asyncio.run(scenario())
+    assert snapshot == "event: snapshot\ndata: []\n\n"
+    assert status_code == 200
+    assert message.startswith("event: task.removed\n")
+    assert f'data: {{"id": {task_id}}}' in message
+    assert task_feed_broker.subscriber_count == 0
+
+
+def test_bulk_import_reports_row_errors_and_inserts_steps():
+    business_id = get_business_id()
+    step = {"title": "Pick up", "address": "1 Main St", "order": 1}
+    good = {
+        "title": "Imported",
+        "business_id": business_id,
+        "price": 12.5,
+        "estimated_time": 20,
+        "start_datetime": "2025-01-01T12:00:00Z",
+        "lat": 35.7,
+        "lng": 51.4,
+        "steps": [step, {**step, "order": 2}],
+    }
+    lines = [
+        json.dumps(good),
+        json.dumps({**good, "price": "free"}),
+        "{not json",
+        json.dumps({**good, "business_id": 987654}),
+        json.dumps({**good, "title": "Imported 2", "steps": []}),
+    ]
+
+    response = client.post(
+        "/admin/tasks/import",
+        headers={"Authorization": f"Bearer {get_owner_token()}"},
+        files={"file": ("tasks.ndjson", io.BytesIO("\n".join(lines).encode()), "application/x-ndjson")},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["lines"], body["imported"], body["steps"], body["failed"]) == (5, 2, 2, 3)
+    assert [error["line"] for error in body["errors"]] == [2, 3, 4]
+    assert body["errors"][0]["detail"].startswith("price:")
+
+    db = TestingSessionLocal()
+    task = db.query(Task).filter(Task.title == "Imported").one()
+    assert task.status == TaskStatus.issued
+    assert task.geo_cell is not None
+    assert db.query(TaskStep).filter(TaskStep.task_id == task.id).count() == 2
+    db.close()
+
+    csv_body = "title,business_id,price,estimated_time,start_datetime,steps\n"
+    csv_body += f'Imported CSV,{business_id},3,5,2025-01-01T12:00:00Z,"{json.dumps([step]).replace(chr(34), chr(34) * 2)}"\n'
+    response = client.post(
+        "/admin/tasks/import",
+        headers={"Authorization": f"Bearer {get_owner_token()}"},
+        files={"file": ("tasks.csv", io.BytesIO(csv_body.encode()), "text/csv")},
+    )
+    assert response.json()["imported"] == 1
+    assert response.json()["steps"] == 1
+
+    response = client.post(
+        "/admin/tasks/import",
+        headers={"Authorization": f"Bearer {get_owner_token()}"},
+        params={"format": "ndjson"},
+        files={"file": ("tasks.txt", io.BytesIO(b'{"title": "\xff\xfe"}\n'), "text/plain")},
+    )
+    assert response.status_code == 400
+
+
+def test_admin_search_uses_full_text_index_and_ranks_by_relevance():
+    title_match, description_match, _ = create_tasks(
+        make_task("Refrigerated courier run", description="Cold chain"),
+        make_task("Office pickup", description="Bring the refrigerated box back"),
+        make_task("Unrelated errand", description="Nothing to see"),
+    )
+    headers = {"Authorization": f"Bearer {get_owner_token()}"}
+
+    response = client.get("/admin/tasks", headers=headers, params={"search": "refriger"})
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()] == [title_match, description_match]
+
+    response = client.get("/admin/tasks", headers=headers, params={"search": "refrigerated box"})
+    assert [task["id"] for task in response.json()] == [description_match]
+
+    response = client.patch(f"/admin/tasks/{description_match}", headers=headers, json={"description": "Bring it back"})
+    assert response.status_code == 200
+    response = client.get("/admin/tasks", headers=headers, params={"search": "refrigerated"})
+    assert [task["id"] for task in response.json()] == [title_match]
+
+    response = client.get("/admin/tasks", headers=headers, params={"sort_by": "relevance"})
+    assert response.status_code == 400
+
+
+def test_search_folds_arabic_and_persian_variants():
+    (task_id,) = create_tasks(make_task("تحويل بسته كريمي‌ها ۱۲", description="Arabic yeh and kaf"))
+    headers = {"Authorization": f"Bearer {get_owner_token()}"}
+
+    for search in ("تحویل", "کریمیها", "12", "كريمي"):
+        response = client.get("/admin/tasks", headers=headers, params={"search": search})
+        assert [task["id"] for task in response.json()] == [task_id], search
+
+    db = TestingSessionLocal()
+    user = User(phone_number="+۹۸۹۱۲۰۰۰۱۸۰۱", first_name="علي", last_name="كاظمي", national_id="۰۰۱۲۳۴۵۶۷۸")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    assert user.phone_number == "+989120001801"
+    db.close()
+
+    for search in ("علی کاظ", "۰۹۱۲ ۰۰۰ ۱۸۰۱", "۰۰۱۲۳۴۵۶۷۸"):
+        response = client.get("/admin/users", headers=headers, params={"search": search})
+        assert response.status_code == 200
+        assert [user["id"] for user in response.json()] == [user_id], search
+
+
+def test_admin_task_list_cursor_pages_through_nullable_sort_columns():
+    _, runner_id = create_runner("+15550002000")
+    done_at = datetime(2025, 2, 1, tzinfo=timezone.utc)
+    task_ids = create_tasks(
+        *(
+            make_task(f"Paged {index}", assigned_user_id=runner_id, status=TaskStatus.done, done_at=value)
+            for index, value in enumerate([done_at, None, done_at, None, done_at.replace(day=2), None, done_at])
+        )
+    )
+    headers = {"Authorization": f"Bearer {get_owner_token()}"}
+
+    for sort_order in ("asc", "desc"):
+        params = {"assigned_user_id": runner_id, "sort_by": "done_at", "sort_order": sort_order, "limit": 2}
+        unpaged = client.get("/admin/tasks", headers=headers, params={**params, "limit": 100}).json()
+        pages, cursor = [], None
+        while True:
+            response = client.get("/admin/tasks", headers=headers, params={**params, "cursor": cursor} if cursor else params)
+            assert response.status_code == 200
+            pages.extend(task["id"] for task in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+        assert pages == [task["id"] for task in unpaged]
+        assert sorted(pages) == task_ids
+        nulls = [task["id"] for task in unpaged if task["done_at"] is None]
+        assert (pages[-3:] if sort_order == "asc" else pages[:3]) == nulls
+
+    response = client.get("/admin/tasks", headers=headers, params={"sort_by": "price", "cursor": cursor or "bogus"})
+    assert response.status_code == 400
+
+
+def test_admin_task_facets_share_the_list_filters():
+    _, runner_id = create_runner("+15550002100")
+    create_tasks(
+        make_task("Faceted one", assigned_user_id=runner_id, status=TaskStatus.done),
+        make_task("Faceted two", assigned_user_id=runner_id, status=TaskStatus.done),
+        make_task("Faceted three", assigned_user_id=runner_id, status=TaskStatus.in_progress),
+    )
+    headers = {"Authorization": f"Bearer {get_owner_token()}"}
+
+    response = client.get("/admin/tasks/facets", headers=headers, params={"assigned_user_id": runner_id})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert body["approximate"] is False
+    assert body["status"] == [{"value": "done", "count": 2}, {"value": "in_progress", "count": 1}]
+    assert body["business_id"] == [{"value": get_business_id(), "count": 3}]
+    assert body["task_kind_id"] == [{"value": None, "count": 3}]
+
+    params = {"assigned_user_id": runner_id, "status": "done", "search": "faceted"}
+    assert client.get("/admin/tasks/facets", headers=headers, params=params).json()["total"] == 2
+    assert len(client.get("/admin/tasks", headers=headers, params=params).json()) == 2
+
+    # Approximate counts need PostgreSQL statistics; other databases fall back to exact ones.
+    body = client.get("/admin/tasks/facets", headers=headers, params={"approximate": True}).json()
+    assert body["approximate"] is False
+    assert body["total"] == sum(facet["count"] for facet in body["status"])
+
+
+def test_runner_change_feed_returns_only_changes_and_removals():
+    token, runner_id = create_runner("+15550002200")
+    long_ago = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+    def step(order):
+        return TaskStep(title=f"Step {order}", address="1 Main St", order=order, updated_at=long_ago)
+
+    kept = make_task("Synced kept", assigned_user_id=runner_id, status=TaskStatus.in_progress, updated_at=long_ago)
+    kept.steps = [step(1), step(2)]
+    removed = make_task("Synced removed", assigned_user_id=runner_id, status=TaskStatus.in_progress, updated_at=long_ago)
+    kept_id, removed_id = create_tasks(kept, removed)
+    db = TestingSessionLocal()
+    first_step, second_step = [row.id for row in db.query(TaskStep).filter(TaskStep.task_id == kept_id).order_by(TaskStep.order)]
+    db.close()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/tasks/me/changes", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["full"] is True
+    assert [task["id"] for task in body["tasks"]] == [kept_id, removed_id]
+    sync_token = body["sync_token"]
+
+    response = client.patch(f"/tasks/{kept_id}/steps/{first_step}", headers=headers, json={"status": "done"})
+    assert response.status_code == 200
+    admin_headers = {"Authorization": f"Bearer {get_owner_token()}"}
+    assert client.delete(f"/admin/tasks/{kept_id}/steps/{second_step}", headers=admin_headers).status_code == 204
+    assert client.delete(f"/admin/tasks/{removed_id}", headers=admin_headers).status_code == 204
+
+    body = client.get("/tasks/me/changes", headers=headers, params={"since": sync_token}).json()
+    assert body["full"] is False
+    assert body["tasks"] == []
+    assert [(step["id"], step["status"]) for step in body["steps"]] == [(first_step, StepStatus.done.value)]
+    assert body["removed_task_ids"] == [removed_id]
+    assert body["removed_step_ids"] == [second_step]
+
+    for since in ["bogus", encode_cursor(None), encode_cursor(42)]:
+        response = client.get("/tasks/me/changes", headers=headers, params={"since": since})
+        assert response.status_code == 400
+
+
+def test_batch_step_updates_apply_in_one_request_and_report_conflicts():
+    token, runner_id = create_runner("+15550002300")
+    first = make_task("Batched one", assigned_user_id=runner_id, status=TaskStatus.in_progress)
+    first.steps = [TaskStep(title="Pick up", address="1 Main St", order=1), TaskStep(title="Drop off", address="2 Main St", order=2)]
+    second = make_task("Batched two", assigned_user_id=runner_id, status=TaskStatus.in_progress)
+    second.steps = [TaskStep(title="Pick up", address="3 Main St", order=1)]
+    first_id, second_id = create_tasks(first, second)
+    (foreign_id,) = create_tasks(make_task("Someone else's"))
+    db = TestingSessionLocal()
+    pick_up, drop_off, other = [row.id for row in db.query(TaskStep).filter(TaskStep.task_id.in_([first_id, second_id])).order_by(TaskStep.id)]
+    db.close()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Another device already edited the drop-off step.
+    client.patch(f"/tasks/{first_id}/steps/{drop_off}", headers=headers, json={"description": "Ring twice"})
+
+    changes = [
+        {"task_id": first_id, "step_id": pick_up, "version": 1, "update": {"status": "in_progress"}},
+        {"task_id": first_id, "step_id": pick_up, "version": 1, "update": {"status": "done"}},
+        {"task_id": first_id, "step_id": drop_off, "version": 1, "update": {"status": "done"}},
+        {"task_id": second_id, "step_id": other, "update": {"status": "done"}},
+        {"task_id": foreign_id, "step_id": other, "update": {"status": "done"}},
+    ]
+    response = client.post("/tasks/me/steps/batch", headers=headers, json={"changes": changes})
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == ["applied", "applied", "conflict", "applied", "not_found"]
+    assert body["results"][1]["version"] == 2
+    assert body["results"][2]["version"] == 2
+
+    assert [task["id"] for task in body["tasks"]] == [first_id, second_id]
+    steps = {step["id"]: step for task in body["tasks"] for step in task["steps"]}
+    assert steps[pick_up]["status"] == "done" and steps[pick_up]["done_at"] is not None
+    assert steps[drop_off]["status"] == "pending" and steps[drop_off]["description"] == "Ring twice"
+    assert steps[other]["status"] == "done"
+
+    # A writer holding a step read before another write still commits instead of failing.
+    db = TestingSessionLocal()
+    stale_step = db.get(TaskStep, other)
+    response = client.patch(f"/tasks/{second_id}/steps/{other}", headers=headers, json={"description": "Back door"})
+    assert response.status_code == 200
+    stale_step.title = "Collect"
+    db.commit()
+    assert db.get(TaskStep, other).version == steps[other]["version"] + 2
+    db.close()
+
+
+def test_finished_tasks_are_archived_in_batches_and_still_listed_for_admins():
+    runner_token, runner_id = create_runner("+15550002400")
+    long_ago = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+    def finished(title, day, status=TaskStatus.approved, updated_at=long_ago):
+        return make_task(
+            title,
+            assigned_user_id=runner_id,
+            status=status,
+            start_datetime=datetime(2025, 3, day, tzinfo=timezone.utc),
+            updated_at=updated_at,
+        )
+
+    old = finished("Archived delivery", 1)
+    old.steps = [TaskStep(title="Pick up", address="1 Main St", order=1)]
+    old.tags = [TaskTag(name="archive-test")]
+    old_canceled = finished("Archived canceled", 2, status=TaskStatus.canceled)
+    recent = finished("Recent delivery", 3, updated_at=datetime.now(timezone.utc))
+    running = finished("Running delivery", 4, status=TaskStatus.in_progress)
+    old_id, canceled_id, recent_id, running_id = create_tasks(old, old_canceled, recent, running)
+
+    sync_token = client.get("/tasks/me/changes", headers={"Authorization": f"Bearer {runner_token}"}).json()["sync_token"]
+    db = TestingSessionLocal()
+    assert archive_tasks(db, older_than_days=30, batch_size=1) >= 2
+    assert db.query(Task).filter(Task.id.in_([old_id, canceled_id])).count() == 0
+    assert db.query(ArchivedTask).filter(ArchivedTask.id.in_([old_id, canceled_id])).count() == 2
+    db.close()
+
+    headers = {"Authorization": f"Bearer {get_owner_token()}"}
+    params = {"assigned_user_id": runner_id, "sort_by": "start_datetime", "sort_order": "desc"}
+    expected = [running_id, recent_id, canceled_id, old_id]
+    body = client.get("/admin/tasks", headers=headers, params=params).json()
+    assert [task["id"] for task in body] == expected
+    assert body[-1]["tags"][0]["name"] == "archive-test"
+    assert [step["title"] for step in body[-1]["steps"]] == ["Pick up"]
+
+    paged, cursor = [], None
+    while True:
+        response = client.get("/admin/tasks", headers=headers, params={**params, "limit": 1, **({"cursor": cursor} if cursor else {})})
+        paged.extend(task["id"] for task in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert paged == expected
+    second_page = client.get("/admin/tasks", headers=headers, params={**params, "skip": 1, "limit": 2}).json()
+    assert [task["id"] for task in second_page] == expected[1:3]
+
+    body = client.get("/admin/tasks", headers=headers, params={**params, "status": "in_progress"}).json()
+    assert [task["id"] for task in body] == [running_id]
+    body = client.get("/admin/tasks", headers=headers, params={**params, "include_archived": False}).json()
+    assert [task["id"] for task in body] == [running_id, recent_id]
+    body = client.get("/admin/tasks", headers=headers, params={**params, "search": "archived deliv"}).json()
+    assert [task["id"] for task in body] == [old_id]
+
+    # Without sort_by a search ranks live tasks and then lists archived matches.
+    search = {"assigned_user_id": runner_id, "search": "delivery"}
+    body = client.get("/admin/tasks", headers=headers, params=search).json()
+    assert [task["id"] for task in body] == [running_id, recent_id, old_id]
+    body = client.get("/admin/tasks", headers=headers, params={**search, "skip": 2, "limit": 1}).json()
+    assert [task["id"] for task in body] == [old_id]
+    body = client.get("/admin/tasks", headers=headers, params={**search, "skip": 1, "limit": 1}).json()
+    assert [task["id"] for task in body] == [recent_id]
+
+    # The runner's change feed drops the archived tasks.
+    body = client.get("/tasks/me/changes", headers={"Authorization": f"Bearer {runner_token}"}, params={"since": sync_token}).json()
+    assert set(body["removed_task_ids"]) >= {old_id, canceled_id}
+
+    assert client.get(f"/admin/tasks/{old_id}", headers=headers).json()["title"] == "Archived delivery"
+    facets = client.get("/admin/tasks/facets", headers=headers, params={"assigned_user_id": runner_id}).json()
+    assert facets["total"] == 4
+    assert {"value": "approved", "count": 2} in facets["status"]
+
+
+def test_sla_sweep_expires_stale_tasks_and_flags_overdue_ones():
+    token, runner_id = create_runner("+15550002500")
+    (accepted_id,) = create_tasks(make_task("Timed delivery", estimated_time=45))
+    accepted = client.post(f"/tasks/{accepted_id}/accept", headers={"Authorization": f"Bearer {token}"}).json()
+    due_in = datetime.fromisoformat(accepted["due_at"]) - datetime.fromisoformat(accepted["accepted_at"])
+    assert abs(due_in.total_seconds() - 45 * 60) < 1
+
+    now = datetime(2020, 1, 2, tzinfo=timezone.utc)
+    stale_id, future_id, overdue_id, on_time_id = create_tasks(
+        make_task("Stale delivery", start_datetime=datetime(2020, 1, 1, tzinfo=timezone.utc)),
+        make_task("Future delivery", start_datetime=datetime(2020, 1, 3, tzinfo=timezone.utc)),
+        make_task("Late delivery", status=TaskStatus.in_progress, assigned_user_id=runner_id, due_at=datetime(2020, 1, 1, tzinfo=timezone.utc)),
+        make_task("On-time delivery", status=TaskStatus.in_progress, assigned_user_id=runner_id, due_at=datetime(2020, 1, 3, tzinfo=timezone.utc)),
+    )
+
+    db = TestingSessionLocal()
+    assert sweep_tasks(db, now=now, batch_size=1) == {"expired": 1, "overdue": 1, "resolved": 0}
+    assert sweep_tasks(db, now=now) == {"expired": 0, "overdue": 0, "resolved": 0}
+    statuses = dict(db.query(Task.id, Task.status).filter(Task.id.in_([stale_id, future_id, on_time_id])))
+    assert statuses == {stale_id: TaskStatus.canceled, future_id: TaskStatus.issued, on_time_id: TaskStatus.in_progress}
+    breaches = {breach.task_id: breach for breach in db.query(TaskSlaBreach)}
+    assert set(breaches) == {stale_id, overdue_id}
+    assert breaches[stale_id].kind == SlaBreachKind.expired and breaches[stale_id].resolved_at is not None
+    assert breaches[overdue_id].kind == SlaBreachKind.overdue and breaches[overdue_id].assigned_user_id == runner_id
+    db.close()
+
+    headers = {"Authorization": f"Bearer {get_owner_token()}"}
+    body = client.get("/admin/tasks/sla-breaches", headers=headers, params={"unresolved": True}).json()
+    assert [(breach["task_id"], breach["kind"]) for breach in body] == [(overdue_id, "overdue")]
+
+    db = TestingSessionLocal()
+    db.query(Task).filter(Task.id.in_([overdue_id, on_time_id])).update({Task.status: TaskStatus.done})
+    db.commit()
+    assert sweep_tasks(db, now=now, batch_size=1)["resolved"] == 1
+    db.close()
+    assert client.get("/admin/tasks/sla-breaches", headers=headers, params={"unresolved": True}).json() == []
+    body = client.get("/admin/tasks/sla-breaches", headers=headers, params={"kind": "expired"}).json()
+    assert [breach["task_id"] for breach in body] == [stale_id]
@@ -0,0 +1,645 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.db import Base, get_db
+from app.models.user import User
+from app.models.permission import Role
+from app.models.task import Task, TaskStatus
+from app.models.wallet import RollupBucket, Wallet, WalletDailyRollup, WalletTransaction, TransactionType, TransactionStatus
+from app.utils.pagination import encode_cursor
+from app.utils.token import create_access_token
+from app.utils.wallet import compute_wallet_balance, create_wallet_checkpoint, get_or_create_wallet, record_transaction
+from datetime import datetime, timedelta, timezone
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+if os.path.exists("test_wallet.db"):
+    os.remove("test_wallet.db")
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_wallet.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(autouse=True)
+def use_wallet_test_db():
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+
+
+client = TestClient(app)
+
+
+def get_admin_token():
+    db = TestingSessionLocal()
+    admin_role = db.query(Role).filter(Role.name == "admin").first()
+    if not admin_role:
+        admin_role = Role(name="admin")
+        db.add(admin_role)
+        db.commit()
+        db.refresh(admin_role)
+
+    admin = db.query(User).filter(User.phone_number == "+15550000001").first()
+    if not admin:
+        admin = User(phone_number="+15550000001", role=admin_role)
+        db.add(admin)
+        db.commit()
+        db.refresh(admin)
+
+    access_token = create_access_token(data={"sub": str(admin.id), "role": admin.role.name})
+    db.close()
+    return access_token
+
+
+def create_user_with_earnings(phone_number, earnings=()):
+    db = TestingSessionLocal()
+    user = User(phone_number=phone_number)
+    db.add(user)
+    db.commit()
+    wallet = Wallet(user_id=user.id, balance=sum(earnings))
+    db.add(wallet)
+    db.commit()
+    for amount in earnings:
+        db.add(
+            WalletTransaction(
+                wallet_id=wallet.id,
+                type=TransactionType.earning,
+                amount=amount,
+                status=TransactionStatus.confirmed,
+            )
+        )
+    db.commit()
+    token = create_access_token(data={"sub": str(user.id)})
+    wallet_id = wallet.id
+    db.close()
+    return token, wallet_id
+
+
+def test_checkout_and_denial_update_maintained_balance():
+    token, wallet_id = create_user_with_earnings("+15550000010", earnings=(100.0, 50.0))
+    admin_token = get_admin_token()
+
+    response = client.post(
+        "/wallet/me/checkout",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"amount": 120.0},
+    )
+    assert response.status_code == 200
+    transaction_id = response.json()["id"]
+
+    response = client.get("/wallet/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.json()["balance"] == 30.0
+
+    response = client.post(
+        f"/admin/wallets/checkout-requests/{transaction_id}/deny",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+
+    response = client.post(
+        f"/admin/wallets/checkout-requests/{transaction_id}/deny",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 400
+
+    response = client.get("/wallet/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.json()["balance"] == 150.0
+    assert "transactions" not in response.json()
+
+    response = client.post(
+        f"/admin/wallets/{wallet_id}/verify-balance",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["drift"] == 0
+    assert response.json()["ledger_balance"] == 150.0
+
+
+def test_verify_balance_repairs_drift():
+    _, wallet_id = create_user_with_earnings("+15550000011", earnings=(40.0,))
+    admin_token = get_admin_token()
+
+    db = TestingSessionLocal()
+    db.query(Wallet).filter(Wallet.id == wallet_id).update({"balance": 999.0})
+    db.commit()
+    db.close()
+
+    response = client.post(
+        f"/admin/wallets/{wallet_id}/verify-balance",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"repair": True},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["drift"] == 959.0
+    assert data["repaired"] is True
+
+    db = TestingSessionLocal()
+    assert db.query(Wallet).filter(Wallet.id == wallet_id).one().balance == 40.0
+    db.close()
+
+
+def test_checkpoint_covers_settled_prefix_and_rebuild_adds_newer_rows():
+    token, wallet_id = create_user_with_earnings("+15550000012", earnings=(10.0, 20.0))
+    admin_token = get_admin_token()
+
+    response = client.post(
+        "/wallet/me/checkout",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"amount": 5.0},
+    )
+    assert response.status_code == 200
+
+    db = TestingSessionLocal()
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    checkpoint = create_wallet_checkpoint(db, wallet_id, now=later)
+    db.commit()
+    # The requested payout is not settled yet, so only the two earnings are covered.
+    assert checkpoint.balance == 30.0
+    assert checkpoint.transaction_count == 2
+
+    db.add(
+        WalletTransaction(
+            wallet_id=wallet_id,
+            type=TransactionType.earning,
+            amount=7.0,
+            status=TransactionStatus.confirmed,
+        )
+    )
+    db.commit()
+    assert compute_wallet_balance(db, wallet_id) == 32.0
+    assert compute_wallet_balance(db, wallet_id, use_checkpoint=False) == 32.0
+    db.close()
+
+    response = client.post(
+        f"/admin/wallets/{wallet_id}/verify-balance",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.json()["checkpoint_transaction_id"] == checkpoint.last_transaction_id
+    assert response.json()["ledger_balance"] == 32.0
+
+
+def test_admin_wallet_list_uses_constant_number_of_queries():
+    admin_token = get_admin_token()
+    db = TestingSessionLocal()
+    for index in range(5):
+        user = User(phone_number=f"+1555000020{index}", shaba_number=f"IR0000000000000000000000020{index}")
+        db.add(user)
+        db.flush()
+        wallet = Wallet(user_id=user.id, balance=0.0)
+        db.add(wallet)
+        db.flush()
+        db.add(
+            WalletTransaction(
+                wallet_id=wallet.id,
+                type=TransactionType.payout,
+                amount=1.0,
+                status=TransactionStatus.sent_to_bank,
+            )
+        )
+    db.commit()
+    db.close()
+
+    def count_queries(limit):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            response = client.get(
+                "/admin/wallets",
+                headers={"Authorization": f"Bearer {admin_token}"},
+                params={"limit": limit},
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        assert response.status_code == 200
+        return len(statements), response.json()
+
+    small_count, _ = count_queries(1)
+    large_count, data = count_queries(100)
+    assert small_count == large_count
+    with_shaba = [wallet for wallet in data if wallet["shaba_number"]]
+    assert len(with_shaba) >= 5
+    assert all(len(wallet["active_cashouts"]) == 1 for wallet in with_shaba)
+
+
+def test_transaction_history_cursor_pagination_is_stable():
+    token, wallet_id = create_user_with_earnings("+15550000013")
+    db = TestingSessionLocal()
+    base = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    created = []
+    for index, moment in enumerate([base, base, base + timedelta(hours=1), base + timedelta(hours=2), base + timedelta(hours=2)]):
+        transaction = WalletTransaction(
+            wallet_id=wallet_id,
+            type=TransactionType.payout if index == 1 else TransactionType.earning,
+            amount=1.0,
+            status=TransactionStatus.confirmed,
+            created_at=moment,
+        )
+        db.add(transaction)
+        db.flush()
+        created.append((moment, transaction.id))
+    db.commit()
+    db.close()
+    expected = [transaction_id for _, transaction_id in sorted(created, reverse=True)]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/wallet/me/transactions", headers={"Authorization": f"Bearer {token}"}, params=params)
+        assert response.status_code == 200
+        seen.extend(transaction["id"] for transaction in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == expected
+
+    response = client.get(
+        "/wallet/me/transactions",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"type": "payout"},
+    )
+    assert [transaction["id"] for transaction in response.json()] == [created[1][1]]
+
+    response = client.get(
+        "/wallet/me/transactions",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+
+    for values in [("yesterday", created[0][1]), (created[0][0], "1"), (None, created[0][1])]:
+        response = client.get(
+            "/wallet/me/transactions",
+            headers={"Authorization": f"Bearer {token}"},
+            params={"cursor": encode_cursor(*values)},
+        )
+        assert response.status_code == 400
+
+
+def test_bulk_checkout_transitions_report_per_item_results():
+    admin_token = get_admin_token()
+    first_token, first_wallet_id = create_user_with_earnings("+15550000014", earnings=(100.0,))
+    second_token, second_wallet_id = create_user_with_earnings("+15550000015", earnings=(100.0,))
+
+    transaction_ids = []
+    for token, amount in [(first_token, 10.0), (first_token, 20.0), (second_token, 30.0)]:
+        response = client.post("/wallet/me/checkout", headers={"Authorization": f"Bearer {token}"}, json={"amount": amount})
+        transaction_ids.append(response.json()["id"])
+
+    for body in [{}, {"transaction_ids": []}, {"limit": 10}]:
+        response = client.post(
+            "/admin/wallets/checkout-requests/bulk/approve",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json=body,
+        )
+        assert response.status_code == 422
+
+    response = client.post(
+        "/admin/wallets/checkout-requests/bulk/approve",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"transaction_ids": transaction_ids + [999999]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["processed"] == 3
+    assert data["failed"] == 1
+    assert {item["transaction_id"] for item in data["results"] if item["success"]} == set(transaction_ids)
+    assert [item["detail"] for item in data["results"] if not item["success"]] == ["Checkout request not found"]
+
+    response = client.post(
+        "/admin/wallets/checkout-requests/bulk/deny",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"transaction_ids": transaction_ids[:2]},
+    )
+    assert response.json()["processed"] == 2
+
+    response = client.post(
+        "/admin/wallets/checkout-requests/bulk/complete",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"transaction_ids": transaction_ids},
+    )
+    data = response.json()
+    assert data["processed"] == 1
+    assert sorted(item["detail"] for item in data["results"] if not item["success"]) == [
+        "Transaction is not eligible to complete",
+        "Transaction is not eligible to complete",
+    ]
+
+    db = TestingSessionLocal()
+    assert db.query(Wallet).filter(Wallet.id == first_wallet_id).one().balance == 100.0
+    assert db.query(Wallet).filter(Wallet.id == second_wallet_id).one().balance == 70.0
+    db.close()
+
+
+def test_export_bank_payouts_streams_sent_to_bank_rows():
+    admin_token = get_admin_token()
+    token, _ = create_user_with_earnings("+15550000016", earnings=(500.0,))
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.phone_number == "+15550000016").one()
+    user.shaba_number = "IR820540102680020817909016"
+    user.first_name = "Sara"
+    db.commit()
+    db.close()
+
+    response = client.post("/wallet/me/checkout", headers={"Authorization": f"Bearer {token}"}, json={"amount": 250.0})
+    transaction_id = response.json()["id"]
+    client.post(
+        f"/admin/wallets/checkout-requests/{transaction_id}/approve",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+
+    response = client.get("/admin/wallets/payouts/export", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.strip().splitlines()
+    assert lines[0].startswith("reference,shaba_number,amount")
+    assert f"{transaction_id:012d},IR820540102680020817909016,250,Sara" in response.text
+
+    response = client.get(
+        "/admin/wallets/payouts/export",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"format": "fixed_width"},
+    )
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    record = next(line for line in lines if line.startswith("D" + f"{transaction_id:012d}"))
+    assert record[13:39] == "IR820540102680020817909016"
+    assert record[39:54] == "000000000000250"
+    assert lines[-1].startswith("T")
+
+
+def test_reconcile_bank_statement_settles_matching_payouts():
+    admin_token = get_admin_token()
+    token, wallet_id = create_user_with_earnings("+15550000017", earnings=(300.0,))
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.phone_number == "+15550000017").one()
+    user.shaba_number = "IR820540102680020817909017"
+    db.commit()
+    db.close()
+
+    transaction_ids = []
+    for amount in (100.0, 50.0, 25.0):
+        response = client.post("/wallet/me/checkout", headers={"Authorization": f"Bearer {token}"}, json={"amount": amount})
+        transaction_ids.append(response.json()["id"])
+    client.post(
+        "/admin/wallets/checkout-requests/bulk/approve",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"transaction_ids": transaction_ids},
+    )
+
+    statement = "\n".join([
+        "reference,amount,shaba_number,status",
+        f"{transaction_ids[0]:012d},100,IR820540102680020817909017,paid",
+        f"{transaction_ids[1]:012d},50,IR820540102680020817909017,failed",
+        f"{transaction_ids[2]:012d},99,IR820540102680020817909017,paid",
+        "000099999999,10,IR820540102680020817909017,paid",
+        "not-a-reference,,,",
+    ])
+    response = client.post(
+        "/admin/wallets/payouts/reconcile",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        files={"file": ("statement.csv", statement.encode(), "text/csv")},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["lines"] == 5
+    assert data["paid"] == 1
+    assert data["denied"] == 1
+    assert data["unmatched_count"] == 3
+    assert {mismatch["line"]: mismatch["reason"] for mismatch in data["unmatched"]}[4] == "Amount does not match payout"
+
+    db = TestingSessionLocal()
+    statuses = {
+        transaction.id: transaction.status
+        for transaction in db.query(WalletTransaction).filter(WalletTransaction.id.in_(transaction_ids))
+    }
+    assert statuses[transaction_ids[0]] == TransactionStatus.paid
+    assert statuses[transaction_ids[1]] == TransactionStatus.denied
+    assert statuses[transaction_ids[2]] == TransactionStatus.sent_to_bank
+    assert db.query(Wallet).filter(Wallet.id == wallet_id).one().balance == 175.0
+    db.close()
+
+
+def test_concurrent_checkouts_never_overdraw_wallet():
+    token, wallet_id = create_user_with_earnings("+15550000018", earnings=(50.0,))
+
+    def checkout(_):
+        return client.post(
+            "/wallet/me/checkout",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"amount": 10.0},
+        ).status_code
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        status_codes = list(executor.map(checkout, range(20)))
+
+    assert status_codes.count(200) == 5
+    assert status_codes.count(400) == 15
+
+    db = TestingSessionLocal()
+    assert db.query(Wallet).filter(Wallet.id == wallet_id).one().balance == 0.0
+    assert compute_wallet_balance(db, wallet_id, use_checkpoint=False) == 0.0
+    db.close()
+
+
+def test_wallet_reads_do_not_write():
+    token, _ = create_user_with_earnings("+15550000019", earnings=(12.0,))
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        wallet_response = client.get("/wallet/me", headers={"Authorization": f"Bearer {token}"})
+        transactions_response = client.get("/wallet/me/transactions", headers={"Authorization": f"Bearer {token}"})
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert wallet_response.status_code == 200
+    assert wallet_response.json()["balance"] == 12.0
+    assert transactions_response.status_code == 200
+    assert statements and set(statements) == {"SELECT"}
+
+
+def test_wallet_is_created_once_per_user():
+    db = TestingSessionLocal()
+    user = User(phone_number="+15550000020")
+    db.add(user)
+    db.commit()
+
+    first = get_or_create_wallet(db, user.id)
+    second = get_or_create_wallet(db, user.id)
+    db.commit()
+    assert first.id == second.id
+    assert db.query(Wallet).filter(Wallet.user_id == user.id).count() == 1
+    db.close()
+
+    token = create_access_token(data={"sub": str(user.id)})
+    response = client.get("/wallet/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["balance"] == 0.0
+
+
+def test_earnings_chart_is_served_from_rollups():
+    token, wallet_id = create_user_with_earnings("+15550000030")
+    admin_token = get_admin_token()
+    db = TestingSessionLocal()
+    for amount in (40.0, 60.0):
+        record_transaction(
+            db,
+            WalletTransaction(
+                wallet_id=wallet_id,
+                type=TransactionType.earning,
+                amount=amount,
+                status=TransactionStatus.confirmed,
+            ),
+        )
+    db.commit()
+    db.close()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    first = client.post("/wallet/me/checkout", headers=headers, json={"amount": 30.0}).json()["id"]
+    second = client.post("/wallet/me/checkout", headers=headers, json={"amount": 20.0}).json()["id"]
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    client.post(f"/admin/wallets/checkout-requests/{first}/approve", headers=admin_headers)
+    client.post(f"/admin/wallets/checkout-requests/{first}/complete", headers=admin_headers)
+    client.post(f"/admin/wallets/checkout-requests/{second}/deny", headers=admin_headers)
+
+    db = TestingSessionLocal()
+    rows = {
+        (row.type, row.bucket): (row.amount, row.transaction_count)
+        for row in db.query(WalletDailyRollup).filter(WalletDailyRollup.wallet_id == wallet_id)
+    }
+    db.close()
+    assert rows[(TransactionType.earning, RollupBucket.settled)] == (100.0, 2)
+    assert rows[(TransactionType.payout, RollupBucket.settled)] == (30.0, 1)
+    assert rows[(TransactionType.payout, RollupBucket.void)] == (20.0, 1)
+    assert rows[(TransactionType.payout, RollupBucket.pending)] == (0.0, 0)
+
+    response = client.get("/wallet/me/earnings", headers=headers, params={"granularity": "week"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["totals"]["earnings"] == 100.0
+    assert body["totals"]["paid_out"] == 30.0
+    assert body["totals"]["pending_payouts"] == 0.0
+    assert body["totals"]["transaction_count"] == 3
+    assert sum(period["earnings"] for period in body["periods"]) == 100.0
+
+    response = client.get(
+        "/admin/wallets/earnings",
+        headers=admin_headers,
+        params={"date_from": "2024-01-10", "date_to": "2024-01-01"},
+    )
+    assert response.status_code == 400
+
+    response = client.get("/admin/wallets/earnings", headers=admin_headers, params={"granularity": "month"})
+    assert response.status_code == 200
+    assert response.json()["totals"]["earnings"] >= 100.0
+
+
+def test_bulk_approve_tasks_credits_each_wallet_once():
+    token, wallet_id = create_user_with_earnings("+15550000040")
+    admin_token = get_admin_token()
+    db = TestingSessionLocal()
+    user_id = db.query(Wallet.user_id).filter(Wallet.id == wallet_id).scalar()
+    other = User(phone_number="+15550000041")
+    db.add(other)
+    db.commit()
+    tasks = [
+        Task(title="Bulk 1", price=10.0, status=TaskStatus.done, assigned_user_id=user_id),
+        Task(title="Bulk 2", price=15.0, status=TaskStatus.done, assigned_user_id=user_id),
+        Task(title="Bulk 3", price=7.0, status=TaskStatus.done, assigned_user_id=other.id),
+        Task(title="Bulk credited", price=5.0, status=TaskStatus.done, assigned_user_id=user_id),
+        Task(title="Bulk issued", price=9.0, status=TaskStatus.issued, assigned_user_id=user_id),
+    ]
+    db.add_all(tasks)
+    db.commit()
+    task_ids = [task.id for task in tasks]
+    record_transaction(
+        db,
+        WalletTransaction(
+            wallet_id=wallet_id,
+            type=TransactionType.earning,
+            amount=5.0,
+            status=TransactionStatus.confirmed,
+            related_task_id=task_ids[3],
+        ),
+    )
+    db.commit()
+    other_id = other.id
+    db.close()
+
+    for body in [{}, {"task_ids": []}, {"limit": 10}]:
+        response = client.post("/admin/tasks/bulk-approve", headers={"Authorization": f"Bearer {admin_token}"}, json=body)
+        assert response.status_code == 422
+
+    response = client.post(
+        "/admin/tasks/bulk-approve",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"task_ids": task_ids + [999999]},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["processed"] == 3
+    assert body["failed"] == 3
+    assert body["total_amount"] == 32.0
+    details = {item["task_id"]: item for item in body["results"]}
+    assert all(details[task_id]["success"] for task_id in task_ids[:3])
+    assert details[task_ids[3]]["detail"] == "Task earning already processed"
+    assert details[task_ids[4]]["detail"] == "Task is not marked as done"
+    assert details[999999]["detail"] == "Task not found"
+
+    db = TestingSessionLocal()
+    assert db.query(Wallet.balance).filter(Wallet.id == wallet_id).scalar() == 30.0
+    other_wallet_id = db.query(Wallet.id).filter(Wallet.user_id == other_id).scalar()
+    assert compute_wallet_balance(db, other_wallet_id) == 7.0
+    statuses = dict(db.query(Task.id, Task.status).filter(Task.id.in_(task_ids)).all())
+    db.close()
+    assert [statuses[task_id] for task_id in task_ids] == [
+        TaskStatus.approved,
+        TaskStatus.approved,
+        TaskStatus.approved,
+        TaskStatus.done,
+        TaskStatus.issued,
+    ]
+
+    response = client.post(
+        "/admin/tasks/bulk-approve",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"task_ids": task_ids[:1]},
+    )
+    assert response.json()["processed"] == 0
+    assert response.json()["results"][0]["detail"] == "Task is not marked as done"
+
+    response = client.post(f"/admin/tasks/{task_ids[0]}/approve", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 400
+    db = TestingSessionLocal()
+    assert db.query(Wallet.balance).filter(Wallet.id == wallet_id).scalar() == 30.0
+    db.close()